@@ -1,14 +1,39 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useApp } from '../context/AppContext';
+import { useAuth } from '../context/AuthContext';
+import { apiService } from '../services/api.service';
 
 export const ContinueWatchingSidebar: React.FC = () => {
     const { watchHistory } = useApp();
+    const { isAuthenticated } = useAuth();
     const navigate = useNavigate();
+    const [serverFeed, setServerFeed] = useState<any[] | null>(null);
 
-    // Get last 6 items that have been opened (even if 0 progress)
-    const recentHistory = [...watchHistory]
-        .sort((a, b) => b.timestamp - a.timestamp)
+    // Signed-in users get the server's precomputed in-progress feed
+    useEffect(() => {
+        if (!isAuthenticated) {
+            setServerFeed(null);
+            return;
+        }
+        apiService.getContinueWatching()
+            .then((items: any[]) => setServerFeed(items.map((h: any) => ({
+                imdb_id: h.movie,
+                title: h.title,
+                poster_url: h.poster_url,
+                contentType: h.content_type,
+                progress: h.progress,
+                currentTime: h.current_time,
+                season: h.season,
+                episode: h.episode,
+                timestamp: new Date(h.last_watched).getTime()
+            }))))
+            .catch(err => console.error("Failed to fetch continue watching", err));
+    }, [isAuthenticated, watchHistory.length]);
+
+    // Get last 7 items that have been opened (even if 0 progress)
+    const recentHistory = (serverFeed ?? [...watchHistory]
+        .sort((a, b) => b.timestamp - a.timestamp))
         .slice(0, 7);
 
     const formatTime = (seconds?: number) => {
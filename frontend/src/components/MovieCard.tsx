@@ -1,6 +1,6 @@
 // MovieCard component - Displays movie poster with hover effects
 
-import React from 'react';
+import React, { useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import type { Movie } from '../types';
 import { Badge } from './Badge';
@@ -20,7 +20,12 @@ export const MovieCard: React.FC<MovieCardProps> = ({
     progress = 0,
 }) => {
     const navigate = useNavigate();
-    const { addToList, removeFromList, isInList, toggleFavorite, isFavorite } = useApp();
+    const { addToList, removeFromList, isInList, toggleFavorite, isFavorite, requestStatus } = useApp();
+
+    // Batched by AppContext into one bulk status request for the whole grid
+    useEffect(() => {
+        requestStatus(movie.imdb_id);
+    }, [movie.imdb_id]);
 
     const handleClick = () => {
         navigate(`/watch/${movie.imdb_id}`);
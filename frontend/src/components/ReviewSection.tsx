@@ -1,6 +1,6 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { apiService } from '../services/api.service';
-import type { Review } from '../types';
+import type { Review, RatingSummary } from '../types';
 import { useAuth } from '../context/AuthContext';
 
 interface ReviewSectionProps {
@@ -9,12 +9,38 @@ interface ReviewSectionProps {
     onReviewAdded: () => void;
 }
 
-export const ReviewSection: React.FC<ReviewSectionProps> = ({ imdbId, reviews: initialReviews, onReviewAdded }) => {
+export const ReviewSection: React.FC<ReviewSectionProps> = ({ imdbId, reviews: embeddedReviews, onReviewAdded }) => {
     const { user } = useAuth();
     const [rating, setRating] = useState(5);
     const [comment, setComment] = useState('');
     const [submitting, setSubmitting] = useState(false);
     const [error, setError] = useState<string | null>(null);
+    const [initialReviews, setInitialReviews] = useState<Review[]>(embeddedReviews);
+    const [summary, setSummary] = useState<RatingSummary | null>(null);
+    const [page, setPage] = useState(1);
+    const [hasMore, setHasMore] = useState(false);
+
+    // Summary + first page in one request; more pages on demand
+    const loadReviews = async (pageToLoad: number = 1) => {
+        try {
+            const data = await apiService.getReviews(imdbId, pageToLoad);
+            setInitialReviews(prev => pageToLoad === 1 ? data.results : [...prev, ...data.results]);
+            if (data.summary) setSummary(data.summary);
+            setHasMore(!!data.next);
+            setPage(pageToLoad);
+        } catch (err) {
+            console.error("Failed to load reviews", err);
+        }
+    };
+
+    useEffect(() => {
+        loadReviews(1);
+    }, [imdbId]);
+
+    const reviewCount = summary ? summary.count : initialReviews.length;
+    const averageRating = summary
+        ? summary.average
+        : initialReviews.length > 0 ? initialReviews.reduce((acc, r) => acc + r.rating, 0) / initialReviews.length : 0;
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
@@ -32,6 +58,7 @@ export const ReviewSection: React.FC<ReviewSectionProps> = ({ imdbId, reviews: i
                 comment
             });
             setComment('');
+            loadReviews(1);
             onReviewAdded();
         } catch (err: any) {
             setError(err.message || 'Failed to post review');
@@ -46,25 +73,42 @@ export const ReviewSection: React.FC<ReviewSectionProps> = ({ imdbId, reviews: i
                 <span className="text-yellow-400">⭐</span>
                 <div className="flex flex-col">
                     <span>Community Reviews</span>
-                    {initialReviews.length > 0 && (
+                    {reviewCount > 0 && (
                         <div className="flex items-center gap-2 mt-1">
                             <div className="flex text-yellow-500 text-xs">
-                                {Array.from({ length: 5 }).map((_, i) => {
-                                    const avg = initialReviews.reduce((acc, r) => acc + r.rating, 0) / initialReviews.length;
-                                    return <span key={i} className={i < Math.round(avg) ? '' : 'text-dark-600'}>★</span>;
-                                })}
+                                {Array.from({ length: 5 }).map((_, i) => (
+                                    <span key={i} className={i < Math.round(averageRating) ? '' : 'text-dark-600'}>★</span>
+                                ))}
                             </div>
                             <span className="text-dark-400 text-xs font-medium">
-                                {(initialReviews.reduce((acc, r) => acc + r.rating, 0) / initialReviews.length).toFixed(1)} / 5.0
+                                {averageRating.toFixed(1)} / 5.0
                             </span>
                         </div>
                     )}
                 </div>
                 <span className="text-sm font-normal text-dark-400 ml-auto bg-white/5 px-4 py-1 rounded-full border border-white/5">
-                    {initialReviews.length} {initialReviews.length === 1 ? 'Review' : 'Reviews'}
+                    {reviewCount} {reviewCount === 1 ? 'Review' : 'Reviews'}
                 </span>
             </h2>
 
+            {/* Rating Histogram */}
+            {summary && summary.count > 0 && (
+                <div className="mb-8 space-y-1 max-w-sm">
+                    {[5, 4, 3, 2, 1].map((stars) => {
+                        const n = summary.histogram[String(stars)] || 0;
+                        return (
+                            <div key={stars} className="flex items-center gap-3 text-xs text-dark-400">
+                                <span className="w-6 text-right">{stars}★</span>
+                                <div className="flex-1 h-2 bg-white/5 rounded-full overflow-hidden">
+                                    <div className="h-full bg-yellow-400/80" style={{ width: `${(n / summary.count) * 100}%` }} />
+                                </div>
+                                <span className="w-8">{n}</span>
+                            </div>
+                        );
+                    })}
+                </div>
+            )}
+
             {/* Review Form */}
             {user ? (
                 <form onSubmit={handleSubmit} className="mb-12 bg-white/5 rounded-2xl p-6 border border-white/5">
@@ -163,6 +207,14 @@ export const ReviewSection: React.FC<ReviewSectionProps> = ({ imdbId, reviews: i
                         <p>No reviews yet. Be the first to share your thoughts!</p>
                     </div>
                 )}
+                {hasMore && (
+                    <button
+                        onClick={() => loadReviews(page + 1)}
+                        className="w-full py-3 border border-white/10 rounded-xl text-xs font-bold text-dark-300 hover:bg-white/5 hover:text-white transition-all uppercase tracking-widest"
+                    >
+                        Load More Reviews
+                    </button>
+                )}
             </div>
 
             <style dangerouslySetInnerHTML={{
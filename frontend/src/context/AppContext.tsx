@@ -1,6 +1,6 @@
 // Global application context for state management
 
-import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
+import React, { createContext, useContext, useState, useEffect, useRef, ReactNode } from 'react';
 import { useNavigate } from 'react-router-dom';
 import type { AppState, WatchProgress, Download, UserPreferences } from '../types';
 import { useAuth } from './AuthContext';
@@ -16,6 +16,9 @@ interface AppContextType extends AppState {
     removeFromList: (imdbId: string) => void;
     isInList: (imdbId: string) => boolean;
 
+    // Card state: batched into one bulk status request per rendered grid
+    requestStatus: (imdbId: string) => void;
+
     // Watch Progress
     setProgress: (imdbId: string, progress: number, title: string, posterUrl?: string, currentTime?: number, season?: number, episode?: number, contentType?: 'movie' | 'series') => void;
     getProgress: (imdbId: string) => number;
@@ -51,6 +54,9 @@ const defaultState: AppState = {
 
 const AppContext = createContext<AppContextType | undefined>(undefined);
 
+// Max imdb_ids per bulk status request (user_state.MAX_BULK_IDS)
+const STATUS_BATCH_SIZE = 100;
+
 export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
     const { isAuthenticated } = useAuth();
     const navigate = useNavigate();
@@ -113,6 +119,62 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
         }
     }, [isAuthenticated]);
 
+    // Bulk card status: ids requested by cards within one tick go out together
+    const pendingStatusIds = useRef<Set<string>>(new Set());
+    const syncedStatusIds = useRef<Set<string>>(new Set());
+    const statusTimer = useRef<number | null>(null);
+
+    useEffect(() => {
+        syncedStatusIds.current.clear();
+    }, [isAuthenticated]);
+
+    const applyStatuses = (statuses: Record<string, any>) => {
+        setState(prev => {
+            const ids = Object.keys(statuses);
+            const favorites = prev.favorites.filter(id => !(id in statuses));
+            const myList = prev.myList.filter(id => !(id in statuses));
+            const watchHistory = prev.watchHistory.map(w => {
+                const history = statuses[w.imdb_id]?.watch_history;
+                return history ? {
+                    ...w,
+                    progress: history.progress,
+                    currentTime: history.current_time,
+                    season: history.season,
+                    episode: history.episode,
+                } : w;
+            });
+            ids.forEach(id => {
+                if (statuses[id].is_favorite) favorites.push(id);
+                if (statuses[id].is_in_watchlist) myList.push(id);
+            });
+            return { ...prev, favorites, myList, watchHistory };
+        });
+    };
+
+    const flushStatusRequests = async () => {
+        statusTimer.current = null;
+        const ids = Array.from(pendingStatusIds.current);
+        pendingStatusIds.current.clear();
+        for (let i = 0; i < ids.length; i += STATUS_BATCH_SIZE) {
+            const chunk = ids.slice(i, i + STATUS_BATCH_SIZE);
+            try {
+                applyStatuses(await apiService.getUserStatusBulk(chunk));
+            } catch (err) {
+                console.error("Failed to fetch card status", err);
+                chunk.forEach(id => syncedStatusIds.current.delete(id));
+            }
+        }
+    };
+
+    const requestStatus = (imdbId: string) => {
+        if (!isAuthenticated || syncedStatusIds.current.has(imdbId)) return;
+        syncedStatusIds.current.add(imdbId);
+        pendingStatusIds.current.add(imdbId);
+        if (statusTimer.current === null) {
+            statusTimer.current = window.setTimeout(flushStatusRequests, 50);
+        }
+    };
+
     // Save to localStorage for guests
     useEffect(() => {
         if (!isAuthenticated) {
@@ -249,11 +311,7 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
 
         if (isAuthenticated) {
             try {
-                const hist = await apiService.getHistory();
-                const item = hist.find((h: any) => h.movie === imdbId);
-                if (item) {
-                    await apiService.deleteHistoryItem(item.id);
-                }
+                await apiService.deleteHistoryMovie(imdbId);
             } catch (err) {
                 console.error("Failed to remove from history", err);
                 setState(prev => ({ ...prev, watchHistory: originalHistory }));
@@ -318,6 +376,7 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
         addToList,
         removeFromList,
         isInList,
+        requestStatus,
         setProgress,
         getProgress,
         getWatchItem,
@@ -7,6 +7,7 @@ import { ContinueWatchingSidebar } from '../components/ContinueWatchingSidebar';
 import { SkeletonHero, SkeletonCarousel } from '../components/LoadingSpinner';
 import { apiService } from '../services/api.service';
 import { useApp } from '../context/AppContext';
+import { useAuth } from '../context/AuthContext';
 import type { Movie } from '../types';
 
 export const Home: React.FC = () => {
@@ -18,8 +19,21 @@ export const Home: React.FC = () => {
     const [popularSeries, setPopularSeries] = useState<Movie[]>([]);
     const [kidsMovies, setKidsMovies] = useState<Movie[]>([]);
     const [animationContent, setAnimationContent] = useState<Movie[]>([]);
+    const [recommended, setRecommended] = useState<Movie[]>([]);
 
     useApp();
+    const { isAuthenticated } = useAuth();
+
+    // Personalized row, only for signed-in users
+    useEffect(() => {
+        if (!isAuthenticated) {
+            setRecommended([]);
+            return;
+        }
+        apiService.getRecommended(20)
+            .then(data => setRecommended(data.results))
+            .catch(err => console.error('Error loading recommendations:', err));
+    }, [isAuthenticated]);
 
     useEffect(() => {
         loadContent();
@@ -29,57 +43,24 @@ export const Home: React.FC = () => {
         try {
             setLoading(true);
 
-            // STAGE 1: Top priority content (Hero + First 3 Carousels)
-            const [
-                heroData,
-                trendingData,
-                newReleasesData,
-                seriesData
-            ] = await Promise.all([
-                apiService.getMovies({ content_type: 'movie', year: 2025, limit: 30, ordering: 'random' }),
-                apiService.getMovies({ content_type: 'movie', year_min: 2023, year_max: 2025, limit: 20, ordering: 'random' }),
-                apiService.getMovies({ content_type: 'movie', year: 2025, limit: 20, ordering: 'random' }),
-                apiService.getMovies({ content_type: 'series', year_min: 2017, year_max: 2025, limit: 20, ordering: 'random' })
-            ]);
-
-            // Set Stage 1 State
-            setTrendingMovies(trendingData.results);
-            setNewReleases(newReleasesData.results);
-            setPopularSeries(seriesData.results);
-
-            // Set Hero Slider
-            const validHeroMovies = [
-                ...heroData.results.filter(m => m.poster_url).slice(0, 10),
-                ...seriesData.results.filter(m => m.poster_url).slice(0, 5)
-            ].sort(() => Math.random() - 0.5);
-
-            if (validHeroMovies.length > 0) {
-                setHeroMovie(validHeroMovies[0]);
-            } else if (heroData.results.length > 0) {
-                setHeroMovie(heroData.results[0]);
-            }
-
-            // Immediately show first stage
-            setLoading(false);
+            // All rails come from one precomputed snapshot
+            const { rails } = await apiService.getHome();
 
-            // STAGE 2: Secondary content (Lower carousels)
-            // We run this separately so the user can see the top content instantly
-            const [
-                popularData,
-                kidsData,
-                animationContentData
-            ] = await Promise.all([
-                apiService.getMovies({ content_type: 'movie', year_min: 2017, year_max: 2025, limit: 20, ordering: 'random' }),
-                apiService.getMovies({ is_kids: true, year_min: 2017, year_max: 2025, limit: 20, ordering: 'random' }),
-                apiService.getMovies({ genre: 'Animation', year_min: 2017, year_max: 2025, limit: 20, ordering: 'random' })
-            ]);
-
-            setPopularMovies(popularData.results);
-            setKidsMovies(kidsData.results);
-            setAnimationContent(animationContentData.results);
+            setNewReleases(rails.new_releases);
+            setTrendingMovies(rails.trending);
+            setPopularSeries(rails.popular_series);
+            setPopularMovies(rails.popular_movies);
+            setKidsMovies(rails.kids);
+            setAnimationContent(rails.animation);
 
+            // Set Hero Slider (already shuffled server side)
+            const heroCandidates = rails.hero.length > 0 ? rails.hero : rails.new_releases;
+            if (heroCandidates.length > 0) {
+                setHeroMovie(heroCandidates[0]);
+            }
         } catch (error) {
             console.error('Error loading home content:', error);
+        } finally {
             setLoading(false);
         }
     };
@@ -114,6 +95,14 @@ export const Home: React.FC = () => {
                 <div className="flex flex-col md:flex-row gap-8">
                     {/* Main Content (Carousels) */}
                     <div className="flex-1 space-y-12 min-w-0">
+                        {/* Recommended for You */}
+                        {recommended.length > 0 && (
+                            <MovieCarousel
+                                title="Recommended for You"
+                                movies={recommended}
+                            />
+                        )}
+
                         {/* New Releases */}
                         <MovieCarousel
                             title="New Releases"
@@ -69,8 +69,7 @@ export const Trending: React.FC = () => {
                 limit: ITEMS_PER_PAGE,
                 offset: offset,
                 search: currentSearch || undefined,
-                year_min: currentSearch ? undefined : 2011,
-                ordering: currentSearch ? '-year' : 'random'
+                ordering: currentSearch ? '-year' : 'trending'
             });
 
             if (isReset) {
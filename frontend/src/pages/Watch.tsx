@@ -101,7 +101,14 @@ export const Watch: React.FC = () => {
 
     const loadRecommendations = async (contentType: 'movie' | 'series', genres: string[] = []) => {
         try {
-            // Priority: Fetch items with matching genres
+            // Precomputed "more like this" list first - one cheap request
+            const similar = await apiService.getSimilar(imdbId!, 20).catch(() => null);
+            if (similar && similar.results.length > 0) {
+                setRelatedMovies(similar.results);
+                return;
+            }
+
+            // Fallback: Fetch items with matching genres
             let allRelated: Movie[] = [];
 
             if (genres.length > 0) {
@@ -1,6 +1,6 @@
 // API service for communicating with Django backend
 
-import type { Movie, ApiResponse, Stats, MovieFilters, Review } from '../types';
+import type { Movie, ApiResponse, Stats, MovieFilters, Review, ReviewPage, HomeSnapshot } from '../types';
 
 const API_BASE = '/api';
 
@@ -121,7 +121,7 @@ class ApiService {
      * User specific content methods
      */
     async getWatchlist() {
-        return this.request('/watchlist/', 'GET');
+        return this.requestAllPages('/watchlist/');
     }
 
     async addToWatchlist(movieId: string) {
@@ -133,7 +133,7 @@ class ApiService {
     }
 
     async getFavorites() {
-        return this.request('/favorites/', 'GET');
+        return this.requestAllPages('/favorites/');
     }
 
     async addToFavorites(movieId: string) {
@@ -145,23 +145,47 @@ class ApiService {
     }
 
     async getHistory() {
-        return this.request('/history/', 'GET');
+        return this.requestAllPages('/history/');
     }
 
     async updateHistory(data: any) {
         return this.request('/history/', 'POST', data);
     }
 
+    /**
+     * In-progress titles only (5-95%), newest first, already capped server side
+     */
+    async getContinueWatching() {
+        return this.request('/history/continue-watching/', 'GET');
+    }
+
+    /**
+     * Per-episode progress map for a series: { seasons: { "1": [100, 42, 0] }, next_episode }
+     */
+    async getEpisodeProgress(imdbId: string) {
+        return this.request(`/history/episodes/?movie=${imdbId}`, 'GET');
+    }
+
     async deleteHistoryItem(id: number) {
         return this.request(`/history/${id}/`, 'DELETE');
     }
 
+    /**
+     * Remove a title from history by IMDb id, also covering progress not yet flushed server side
+     */
+    async deleteHistoryMovie(imdbId: string) {
+        return this.request(`/history/by-movie/${imdbId}/`, 'DELETE');
+    }
+
     async clearAllHistory() {
         return this.request('/history/clear_all/', 'DELETE');
     }
 
-    async getReviews(imdbId: string): Promise<Review[]> {
-        return this.request(`/reviews/?movie=${imdbId}`, 'GET', null, false);
+    /**
+     * One page of a movie's reviews, newest first, plus its rating summary
+     */
+    async getReviews(imdbId: string, page: number = 1): Promise<ReviewPage> {
+        return this.request(`/reviews/?movie=${imdbId}&page=${page}`, 'GET', null, false);
     }
 
     async postReview(data: { movie: string; rating: number; comment: string }) {
@@ -169,11 +193,54 @@ class ApiService {
     }
 
 
+    /**
+     * Every home page rail in one request (server-side cached snapshot)
+     */
+    async getHome(): Promise<HomeSnapshot> {
+        return this.request('/home/', 'GET', null, false);
+    }
+
+    /**
+     * "More like this" titles for a movie, from precomputed metadata similarity
+     */
+    async getSimilar(imdbId: string, limit: number = 20): Promise<ApiResponse<Movie>> {
+        return this.request(`/movies/${imdbId}/similar/?limit=${limit}`, 'GET', null, false);
+    }
+
+    /**
+     * Personalized recommendations for the signed-in user (empty for guests)
+     */
+    async getRecommended(limit: number = 20): Promise<ApiResponse<Movie>> {
+        return this.request(`/movies/recommended/?limit=${limit}`, 'GET');
+    }
+
     async getUserStatus(imdbId: string) {
         const response = await this.request(`/movies/${imdbId}/user_status/`, 'GET');
         return response;
     }
 
+    /**
+     * Watchlist/favorite/progress state for many titles in one call (max 100),
+     * keyed by imdb_id
+     */
+    async getUserStatusBulk(imdbIds: string[]) {
+        if (imdbIds.length === 0) return {};
+        return this.request('/movies/user-status/', 'POST', { imdb_ids: imdbIds });
+    }
+
+    /**
+     * Follow a paginated list endpoint to the end and return all results as one array
+     */
+    private async requestAllPages(path: string, pageSize: number = 200) {
+        const results: any[] = [];
+        for (let page = 1; ; page++) {
+            const data = await this.request(`${path}?page=${page}&page_size=${pageSize}`, 'GET');
+            if (Array.isArray(data)) return data;
+            results.push(...(data?.results || []));
+            if (!data?.next) return results;
+        }
+    }
+
     /**
      * Helper for authenticated requests
      */
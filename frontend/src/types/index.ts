@@ -56,6 +56,20 @@ export interface Review {
     updated_at: string;
 }
 
+export interface RatingSummary {
+    count: number;
+    average: number;
+    histogram: Record<string, number>; // "1".."5" -> number of reviews
+}
+
+export interface ReviewPage {
+    count: number;
+    next: string | null;
+    previous: string | null;
+    results: Review[];
+    summary?: RatingSummary;
+}
+
 export interface WatchProgress {
     imdb_id: string;
     progress: number; // 0-100
@@ -126,3 +140,16 @@ export interface MovieFilters {
     year_min?: number;
     year_max?: number;
 }
+
+export interface HomeSnapshot {
+    generated_at: string;
+    rails: {
+        hero: Movie[];
+        new_releases: Movie[];
+        trending: Movie[];
+        popular_series: Movie[];
+        popular_movies: Movie[];
+        kids: Movie[];
+        animation: Movie[];
+    };
+}
@@ -180,3 +180,92 @@ DEFAULT_FROM_EMAIL = 'prajwaldhital851@gmail.com'
 CORS_ALLOW_ALL_ORIGINS = True # In production, set this to specific frontend URL
 CORS_ALLOW_CREDENTIALS = True
 
+
+# Video proxy - HLS segment cache (immutable .ts/.m4s segments, LRU evicted on disk)
+HLS_SEGMENT_CACHE_DIR = MEDIA_ROOT / 'hls_cache'
+HLS_SEGMENT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+
+# Video URL extraction cache (seconds). Signed URLs are cached until just before they expire.
+EXTRACT_VIDEO_CACHE_TTL = 30 * 60
+EXTRACT_VIDEO_NEGATIVE_TTL = 10 * 60  # embed-only fallbacks
+
+# Shared cache - proxy/extraction caches, warmer output and breaker state must be
+# visible to every worker process, so don't rely on the per-process default.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
+# Sanitized embed pages served by player_proxy (seconds)
+EMBED_PAGE_CACHE_TTL = 15 * 60
+EMBED_PAGE_NEGATIVE_TTL = 2 * 60
+
+# Stream warmer (python manage.py warm_streams)
+STREAM_WARMER = {
+    'TITLES': 50,            # most-watched + most-recent titles per run
+    'WORKERS': 4,            # concurrent upstream fetches
+    'FRESHNESS': 15 * 60,    # seconds a warmed embed page stays valid
+    'WATCH_WINDOW_DAYS': 7,  # WatchHistory window used to pick most-watched titles
+    'EPISODES_PER_SERIES': 3,  # next episodes warmed per series
+}
+
+# Per-domain circuit breaker for embed providers (see streaming/health.py)
+PROVIDER_CIRCUIT_BREAKER = {
+    'WINDOW_SECONDS': 300,
+    'MIN_CALLS': 5,
+    'FAILURE_RATE': 0.5,
+    'SLOW_CALL_SECONDS': 8,
+    'SLOW_CALL_RATE': 0.8,
+    'OPEN_SECONDS': 60,
+}
+
+# Cached VidSrc availability verdicts used by the TMDB spiders (see streaming/availability.py)
+PROVIDER_AVAILABILITY = {
+    'TTL': 7 * 24 * 3600,         # available titles are re-checked after a week
+    'NEGATIVE_TTL': 24 * 3600,    # unavailable ones after a day
+    'RANGE_BYTES': 32 * 1024,     # bytes of the embed page a check downloads
+}
+
+# Watch payload link ranking weights (see streaming/health.py rank_links)
+LINK_RANKING = {
+    'SUCCESS_WEIGHT': 0.6,
+    'LATENCY_WEIGHT': 0.25,
+    'QUALITY_WEIGHT': 0.15,
+    'TARGET_TTFB': 1.5,
+}
+
+# Cached per-user watchlist/favorite id sets (invalidated on write)
+USER_STATE_CACHE_TTL = 3600
+
+# Player progress is buffered in the cache and bulk-written to WatchHistory
+# at most this often (see streaming/progress.py and the flush_progress command)
+PROGRESS_FLUSH_INTERVAL = 30
+# Buffering needs a shared cache with an atomic cache.incr: None buffers only on
+# Redis/Memcached and writes every update directly on other caches (FileBasedCache);
+# True on the local-memory cache only works with a single process
+PROGRESS_BUFFERING = None
+
+# Per-user recommendation lists are reused for this long (see streaming/recommendations.py)
+RECOMMENDATIONS_CACHE_TTL = 600
+
+# Trending score (streaming/trending.py, compute_trending command)
+TRENDING = {
+    'FLUSH_INTERVAL': 60,
+    'HALF_LIFE_HOURS': 24,
+    'WINDOW_DAYS': 7,
+    'SESSION_HOURS': 4,
+}
+
+# Home page rails snapshot (streaming/home.py, rebuild_home command)
+HOME_SNAPSHOT_TTL = 30 * 60
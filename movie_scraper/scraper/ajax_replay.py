@@ -0,0 +1,191 @@
+# scraper/ajax_replay.py
+"""
+Capture-then-replay of the AJAX endpoints that streaming sites load their
+servers from.
+
+1flix and sflix render the server list and the player iframe with two XHR
+calls after the page loads:
+
+  servers   /ajax/episode/list/<movie id>       HTML fragment with one
+                                                a[data-id] per server
+  sources   /ajax/episode/sources/<server id>   JSON {"type": "iframe",
+                                                      "link": "<embed url>"}
+
+Once those are known, a title costs two small HTTP requests through plain
+Scrapy instead of a headless Chrome page load, click and iframe wait.
+
+Spiders run in one of three modes:
+
+  replay   (default) plain Scrapy requests against the known endpoints,
+           falling back to Selenium per page when replay finds nothing
+  browser  the old Selenium-only path
+  capture  Selenium path with Chrome performance logging; XHR calls seen
+           while loading a title are turned into endpoint templates and
+           saved to ENDPOINTS_FILE, so a site that moves its API is
+           re-learned by running one capture crawl
+
+Goojara has no server API: its server links are in the static HTML and
+go.php answers with a plain HTTP redirect, so replay there means parsing
+the downloaded page and reading the Location header (see
+resolve_redirect_meta()).
+"""
+import json
+import logging
+import os
+import re
+from urllib.parse import urljoin, urlparse
+
+from scrapy.http import HtmlResponse
+
+logger = logging.getLogger(__name__)
+
+MODES = ('replay', 'browser', 'capture')
+
+ENDPOINTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ajax_endpoints.json')
+
+# Known endpoint templates; captured ones in ENDPOINTS_FILE take precedence
+SITE_ENDPOINTS = {
+    '1flix': {
+        'servers': '/ajax/episode/list/{id}',
+        'sources': '/ajax/episode/sources/{id}',
+    },
+    'sflix': {
+        'servers': '/ajax/episode/list/{id}',
+        'sources': '/ajax/episode/sources/{id}',
+    },
+}
+
+REDIRECT_CODES = [301, 302, 303, 307, 308]
+
+CONTENT_ID_RE = re.compile(r'-(\d+)/?$')
+
+
+def content_id(url):
+    """Numeric id at the end of a 1flix/sflix title URL (watch-name-12345), or None."""
+    match = CONTENT_ID_RE.search(urlparse(url).path)
+    return match.group(1) if match else None
+
+
+def load_endpoints(site, path=ENDPOINTS_FILE):
+    """Endpoint templates for site: defaults overlaid with captured ones."""
+    endpoints = dict(SITE_ENDPOINTS.get(site, {}))
+    try:
+        with open(path, encoding='utf-8') as f:
+            endpoints.update(json.load(f).get(site, {}))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f'Could not read captured endpoints from {path}: {e}')
+    return endpoints
+
+
+def save_endpoints(site, endpoints, path=ENDPOINTS_FILE):
+    """Merge newly captured templates for site into ENDPOINTS_FILE."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            recorded = json.load(f)
+    except (OSError, ValueError):
+        recorded = {}
+    recorded.setdefault(site, {}).update(endpoints)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(recorded, f, indent=2, sort_keys=True)
+
+
+def endpoint_url(page_url, template, value):
+    """Absolute endpoint URL on page_url's host for one id."""
+    return urljoin(page_url, template.format(id=value))
+
+
+def ajax_headers(referer):
+    """Headers the sites check before answering an XHR endpoint."""
+    return {
+        'X-Requested-With': 'XMLHttpRequest',
+        'Accept': 'application/json, text/javascript, */*; q=0.01',
+        'Referer': referer,
+    }
+
+
+def capture_xhr(driver):
+    """
+    URLs of the XHR/fetch requests in the driver's performance log since the
+    last call (the log is drained). Needs goog:loggingPrefs performance=ALL.
+    """
+    urls = []
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if message.get('method') != 'Network.requestWillBeSent':
+            continue
+        params = message.get('params', {})
+        if params.get('type') in ('XHR', 'Fetch'):
+            urls.append(params['request']['url'])
+    return urls
+
+
+def learn_endpoints(xhr_urls, title_id, server_ids=()):
+    """
+    Turn captured XHR URLs into {'servers': template, 'sources': template}.
+
+    The servers call is the one whose path ends in the title id; the sources
+    call is the one ending in one of the server ids (or, without those, the
+    next ajax call ending in a number). Either may be missing.
+    """
+    learned = {}
+    server_ids = {str(server_id) for server_id in server_ids}
+    for url in xhr_urls:
+        path = urlparse(url).path.rstrip('/')
+        head, _, last = path.rpartition('/')
+        if not head or not last:
+            continue
+        if 'servers' not in learned and last == str(title_id):
+            learned['servers'] = f'{head}/{{id}}'
+        elif 'sources' not in learned and 'servers' in learned and (
+            last in server_ids or (not server_ids and last.isdigit() and 'ajax' in head)
+        ):
+            learned['sources'] = f'{head}/{{id}}'
+    return learned
+
+
+def parse_servers(response):
+    """[(server name, server id), ...] from a servers endpoint response (HTML or {"html": ...})."""
+    body = response.body
+    if body.lstrip()[:1] == b'{':
+        try:
+            body = (json.loads(body).get('html') or '').encode('utf-8')
+        except ValueError:
+            return []
+    selector = HtmlResponse(url=response.url, body=body, encoding='utf-8')
+
+    servers = []
+    for link in selector.css('a[data-id], a[data-linkid]'):
+        server_id = link.attrib.get('data-id') or link.attrib.get('data-linkid')
+        name = link.attrib.get('title') or ' '.join(t.strip() for t in link.css('::text').getall() if t.strip())
+        name = re.sub(r'^Server\s+', '', name or '', flags=re.IGNORECASE).strip()
+        if server_id:
+            servers.append((name or server_id, server_id))
+    return servers
+
+
+def parse_source_link(response):
+    """Embed URL from a sources endpoint response, or None."""
+    try:
+        data = json.loads(response.body)
+    except ValueError:
+        return None
+    link = data.get('link') if isinstance(data, dict) else None
+    return link if link and link.startswith('http') else None
+
+
+def resolve_redirect_meta(meta=None):
+    """Request meta that hands 30x responses to the callback instead of following them."""
+    return {**(meta or {}), 'dont_redirect': True, 'handle_httpstatus_list': REDIRECT_CODES}
+
+
+def redirect_target(response):
+    """Absolute Location of a 30x response, or None (e.g. a 200 page doing a JS redirect)."""
+    if response.status not in REDIRECT_CODES:
+        return None
+    location = response.headers.get('Location')
+    return response.urljoin(location.decode('latin-1')) if location else None
@@ -0,0 +1,89 @@
+# scraper/checkpoint.py
+"""
+Crawl checkpoints, so a long run interrupted by a crash, a dead Chrome or
+Ctrl-C continues where it stopped (run_improved_scraper --resume).
+
+Two layers:
+
+  JOBDIR       Scrapy's own job directory: pending requests and the
+               request fingerprints already seen survive the process
+  checkpoint   what only lives in the spider: counters, the current
+               listing page and URL of a Selenium loop, the position in a
+               shuffled discovery pool; JSON next to the JOBDIR files
+
+Spiders call Checkpoint.save() at natural points (after a listing page,
+after each discovery request); writes are throttled to one every
+CHECKPOINT_INTERVAL seconds and replace the file atomically, so a process
+killed mid-write leaves the previous checkpoint. spider_closed saves a
+final one with finished=True when the crawl ended normally, which tells
+--resume to start over next time.
+
+Without a JOBDIR (a plain scrapy crawl) every method is a no-op and load()
+returns {}.
+"""
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+FILENAME = 'checkpoint.json'
+
+
+def read_checkpoint(jobdir):
+    """The checkpoint stored in jobdir, or {}."""
+    try:
+        with open(os.path.join(jobdir, FILENAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f'Could not read checkpoint in {jobdir}: {e}')
+        return {}
+
+
+class Checkpoint:
+    """Periodically persisted spider state inside the spider's JOBDIR."""
+
+    def __init__(self, jobdir=None, interval=30, log=None):
+        self.jobdir = jobdir
+        self.interval = interval
+        self.log = log or logger
+        self._last_save = 0
+
+    @classmethod
+    def for_spider(cls, spider):
+        settings = spider.settings
+        return cls(settings.get('JOBDIR'), settings.getfloat('CHECKPOINT_INTERVAL', 30), spider.logger)
+
+    @property
+    def enabled(self):
+        return bool(self.jobdir)
+
+    def load(self):
+        """Saved state of an unfinished run, or {} (no JOBDIR, nothing saved, or the last run finished)."""
+        if not self.enabled:
+            return {}
+        state = read_checkpoint(self.jobdir)
+        if state.get('finished'):
+            return {}
+        if state:
+            self.log.info(f'♻️  Resuming from checkpoint saved {time.ctime(state.get("saved_at", 0))}')
+        return state.get('state', {})
+
+    def save(self, state, force=False, finished=False):
+        if not self.enabled:
+            return
+        now = time.time()
+        if not force and now - self._last_save < self.interval:
+            return
+        self._last_save = now
+        os.makedirs(self.jobdir, exist_ok=True)
+        path = os.path.join(self.jobdir, FILENAME)
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'saved_at': now, 'finished': finished, 'state': state}, f)
+            os.replace(path + '.tmp', path)
+        except (OSError, TypeError) as e:
+            self.log.warning(f'⚠️  Could not save checkpoint: {e}')
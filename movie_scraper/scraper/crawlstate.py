@@ -0,0 +1,203 @@
+# scraper/crawlstate.py
+"""
+Crawl state shared by the worker processes of one sharded run.
+
+run_improved_scraper --shards N starts N Scrapy processes for the same
+spider; each gets a shard index and crawls only its part of the discovery
+space (shard_owns()). They coordinate through one SQLite file (stdlib
+sqlite3, WAL mode, so no extra service is needed):
+
+  claims     first shard to claim a key (e.g. "movie:603") handles it, so
+             titles listed under several shards' pages are fetched once
+  counters   run-wide counters; take() only increments below a limit, so
+             --limit holds for the whole run, not per process
+  shards     per-shard progress rows the parent command prints while the
+             workers run
+
+Everything is keyed by run id, so old runs never interfere with new ones;
+prune() drops runs older than a few days. ShardedSpiderMixin wires this
+into a spider.
+"""
+import os
+import sqlite3
+import time
+import zlib
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawlstate.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    run TEXT NOT NULL,
+    key TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (run, key)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    run TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run, name)
+);
+CREATE TABLE IF NOT EXISTS shards (
+    run TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    shards INTEGER NOT NULL,
+    tasks_total INTEGER NOT NULL DEFAULT 0,
+    tasks_done INTEGER NOT NULL DEFAULT 0,
+    details INTEGER NOT NULL DEFAULT 0,
+    items INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'running',
+    updated REAL NOT NULL,
+    PRIMARY KEY (run, shard)
+);
+"""
+
+
+def shard_owns(value, shard, shards):
+    """Whether a partition key (a year, an id, a string) belongs to this shard."""
+    if shards <= 1:
+        return True
+    if not isinstance(value, int):
+        value = zlib.crc32(str(value).encode('utf-8'))
+    return value % shards == shard
+
+
+class CrawlState:
+    """One run's shared state; each process opens its own instance on the same file."""
+
+    def __init__(self, run_id, shard=0, shards=1, path=DEFAULT_PATH):
+        self.run_id = run_id
+        self.shard = int(shard)
+        self.shards = int(shards)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def owns(self, value):
+        return shard_owns(value, self.shard, self.shards)
+
+    def claim(self, key):
+        """True for the first process to claim key in this run, False for everyone after."""
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO claims (run, key, shard, created) VALUES (?, ?, ?, ?)',
+            (self.run_id, key, self.shard, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def take(self, name, limit):
+        """Increment counter name if it is still below limit; False once the run-wide limit is used up."""
+        self.conn.execute('INSERT OR IGNORE INTO counters (run, name, value) VALUES (?, ?, 0)', (self.run_id, name))
+        cursor = self.conn.execute(
+            'UPDATE counters SET value = value + 1 WHERE run = ? AND name = ? AND value < ?',
+            (self.run_id, name, limit),
+        )
+        return cursor.rowcount == 1
+
+    def count(self, name):
+        row = self.conn.execute(
+            'SELECT value FROM counters WHERE run = ? AND name = ?', (self.run_id, name)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def report(self, tasks_total=None, tasks_done=None, details=None, items=None, status=None):
+        """Upsert this shard's progress row (only the given fields change)."""
+        self.conn.execute(
+            'INSERT OR IGNORE INTO shards (run, shard, shards, updated) VALUES (?, ?, ?, ?)',
+            (self.run_id, self.shard, self.shards, time.time()),
+        )
+        fields = {
+            'tasks_total': tasks_total, 'tasks_done': tasks_done,
+            'details': details, 'items': items, 'status': status,
+        }
+        changes = {name: value for name, value in fields.items() if value is not None}
+        assignments = ''.join(f', {name} = ?' for name in changes)
+        self.conn.execute(
+            f'UPDATE shards SET updated = ?{assignments} WHERE run = ? AND shard = ?',
+            (time.time(), *changes.values(), self.run_id, self.shard),
+        )
+
+    def progress(self):
+        """Progress rows of every shard in this run, ordered by shard."""
+        cursor = self.conn.execute(
+            'SELECT shard, shards, tasks_total, tasks_done, details, items, status, updated '
+            'FROM shards WHERE run = ? ORDER BY shard',
+            (self.run_id,),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def prune(self, older_than_days=3):
+        """Drop claims, counters and progress of runs last updated before the cutoff."""
+        cutoff = time.time() - older_than_days * 86400
+        stale = [row[0] for row in self.conn.execute(
+            'SELECT run FROM shards GROUP BY run HAVING MAX(updated) < ?', (cutoff,)
+        )]
+        for run in stale:
+            for table in ('claims', 'counters', 'shards'):
+                self.conn.execute(f'DELETE FROM {table} WHERE run = ?', (run,))
+        return len(stale)
+
+
+class ShardedSpiderMixin:
+    """
+    Sharding hooks for the TMDB discovery spiders. The spider sets
+    self.shard / self.shards / self.run_id in __init__, calls
+    open_crawl_state(crawler) from from_crawler and uses the helpers below;
+    without a run id (a plain single-process crawl) they fall back to the
+    spider's own counters and nothing touches the database.
+    """
+
+    progress_interval = 5
+
+    def open_crawl_state(self, crawler):
+        self.crawl_state = None
+        self.tasks_total = 0
+        self.tasks_done = 0
+        self._last_report = 0
+        if not self.run_id:
+            return
+        path = crawler.settings.get('CRAWL_STATE_DB') or DEFAULT_PATH
+        self.crawl_state = CrawlState(self.run_id, self.shard, self.shards, path)
+        self.logger.info(f'🧩 Shard {self.shard + 1}/{self.shards} of run {self.run_id} ({path})')
+
+    def owns(self, value):
+        return shard_owns(value, self.shard, self.shards)
+
+    def claim(self, key):
+        """False if another shard (or this one) already requested key in this run."""
+        return self.crawl_state.claim(key) if self.crawl_state else True
+
+    def limit_reached(self, limit=None):
+        limit = self.limit if limit is None else limit
+        count = self.crawl_state.count('items') if self.crawl_state else self.count
+        return count >= limit
+
+    def take_item(self):
+        """Count one validated title against the run-wide limit; False once it is used up."""
+        if self.crawl_state:
+            return self.crawl_state.take('items', self.limit)
+        return True
+
+    def report_progress(self, status=None, force=False):
+        if not self.crawl_state:
+            return
+        now = time.time()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        self.crawl_state.report(
+            tasks_total=self.tasks_total, tasks_done=self.tasks_done,
+            details=self.stats['attempted'], items=self.stats['successful'], status=status,
+        )
+
+    def close_crawl_state(self, reason='finished'):
+        if not self.crawl_state:
+            return
+        self.report_progress(status=reason, force=True)
+        self.crawl_state.close()
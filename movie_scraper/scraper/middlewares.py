@@ -3,11 +3,20 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from urllib.parse import urlparse
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from scraper import ratelimit
+from scraper.crawlstate import DEFAULT_PATH as CRAWL_STATE_PATH
+
 
 class ScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -98,3 +107,85 @@ class ScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class HostTokenBucketMiddleware:
+    """
+    Rate-limits requests per upstream host with token buckets shared by all
+    spiders (see scraper/ratelimit.py). Hosts come from HOST_RATE_LIMITS:
+
+        HOST_RATE_LIMITS = {'api.themoviedb.org': {'rate': 40, 'burst': 20}}
+
+    A host entry also covers its subdomains. Requests to other hosts are
+    left alone unless HOST_RATE_LIMIT_DEFAULT gives a rate for them.
+    Requests answered from HTTPCACHE never reach this middleware, so it is
+    ordered after HttpCacheMiddleware (900).
+    """
+
+    def __init__(self, limits, default, buckets, penalty, stats):
+        self.limits = limits
+        self.default = default
+        self.buckets = buckets
+        self.penalty = penalty
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        limits = settings.getdict('HOST_RATE_LIMITS')
+        default = settings.getdict('HOST_RATE_LIMIT_DEFAULT') or None
+        if not limits and not default:
+            raise NotConfigured
+        backend = settings.get('HOST_RATE_LIMIT_BACKEND', 'memory')
+        path = settings.get('HOST_RATE_LIMIT_DB') or settings.get('CRAWL_STATE_DB') or CRAWL_STATE_PATH
+        middleware = cls(
+            limits, default, ratelimit.open_buckets(backend, path),
+            settings.getfloat('HOST_RATE_LIMIT_PENALTY', 10), crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def _limit(self, url):
+        """(bucket host, rate, burst) for url, or None if the host is not limited."""
+        host = (urlparse(url).hostname or '').lower()
+        for name, limit in self.limits.items():
+            if host == name or host.endswith('.' + name):
+                return name, float(limit['rate']), float(limit.get('burst', 1))
+        if self.default and host:
+            return host, float(self.default['rate']), float(self.default.get('burst', 1))
+        return None
+
+    async def process_request(self, request, spider):
+        limit = self._limit(request.url)
+        if not limit:
+            return None
+        host, rate, burst = limit
+        wait = self.buckets.update(host, rate, burst, lambda state, now: ratelimit.take(state, rate, burst, now))
+        if wait > 0:
+            self.stats.inc_value('ratelimit/delayed')
+            self.stats.inc_value('ratelimit/wait_seconds', round(wait, 3))
+            await maybe_deferred_to_future(deferLater(reactor, wait, lambda: None))
+        return None
+
+    def process_response(self, request, response, spider):
+        limit = self._limit(request.url)
+        if not limit or 'cached' in response.flags:
+            return response
+        host, rate, burst = limit
+
+        retry_after = ratelimit.parse_retry_after(response.headers.get('Retry-After'))
+        if response.status == 429 or (retry_after is not None and response.status in (503, 429)):
+            pause = retry_after if retry_after is not None else self.penalty
+            self.buckets.update(host, rate, burst, lambda state, now: ratelimit.penalize(state, rate, pause, now))
+            self.stats.inc_value(f'ratelimit/{response.status}')
+            spider.logger.warning(f'🐢 {host} answered {response.status}, pausing {pause:.0f}s and slowing down')
+        elif response.status < 400:
+            self.buckets.update(host, rate, burst, lambda state, now: ratelimit.recover(state, rate))
+        return response
+
+    def spider_closed(self, spider):
+        delayed = self.stats.get_value('ratelimit/delayed', 0)
+        if delayed:
+            waited = self.stats.get_value('ratelimit/wait_seconds', 0)
+            spider.logger.info(f'🪣 Rate limiter delayed {delayed} requests for {waited:.1f}s in total')
+        self.buckets.close()
@@ -0,0 +1,167 @@
+# scraper/ratelimit.py
+"""
+Per-host token buckets for HostTokenBucketMiddleware (scraper/middlewares.py).
+
+DOWNLOAD_DELAY and CONCURRENT_REQUESTS throttle one spider. Several spiders
+hitting api.themoviedb.org or vidsrc.to together either add up to more than
+the host allows or, tuned down to be safe, leave budget unused. A bucket per
+host, shared by everything that sends requests to it, fixes both:
+
+  rate     tokens added per second (the host's sustained limit)
+  burst    bucket size, requests that may go out back to back
+
+Taking a token never fails: the caller gets how long to wait for it, and
+the bucket goes into debt so the next caller waits behind it. A 429 or a
+Retry-After header pauses the host until the given time and halves its rate;
+each successful response adds back a small share of the configured rate
+(additive increase, multiplicative decrease), so the rate settles just
+under the point where the host starts refusing.
+
+Where the bucket state lives (setting HOST_RATE_LIMIT_BACKEND):
+
+  memory   module-level dict, shared by all crawlers of one process
+  sqlite   a table in the crawl-state SQLite file, shared across processes
+           (e.g. the workers of run_improved_scraper --shards)
+  cache    Django's default cache (Redis in production), shared across
+           processes and hosts
+"""
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+MIN_RATE_FRACTION = 0.05   # never slow a host below 5% of its configured rate
+BACKOFF = 0.5              # rate multiplier on 429
+RECOVERY = 0.02            # share of the configured rate regained per good response
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date), or None."""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+
+def new_state(rate, burst, now):
+    return {'tokens': float(burst), 'updated': now, 'rate': float(rate)}
+
+
+def take(state, rate, burst, now):
+    """Reserve one token; returns seconds to wait before sending."""
+    elapsed = now - state['updated']
+    if elapsed > 0:
+        state['tokens'] = min(float(burst), state['tokens'] + elapsed * state['rate'])
+        state['updated'] = now
+    state['tokens'] -= 1
+    return max(0.0, state['updated'] - now) + max(0.0, -state['tokens']) / state['rate']
+
+
+def penalize(state, rate, pause, now):
+    """Pause the host for pause seconds and halve its rate."""
+    state['updated'] = max(state['updated'], now + pause)
+    state['tokens'] = min(state['tokens'], 0.0)
+    state['rate'] = max(rate * MIN_RATE_FRACTION, state['rate'] * BACKOFF)
+
+
+def recover(state, rate):
+    state['rate'] = min(float(rate), state['rate'] + rate * RECOVERY)
+
+
+class MemoryBuckets:
+    """Buckets in this process only; every crawler of a CrawlerProcess shares them."""
+
+    _states = {}
+    _lock = threading.Lock()
+
+    def update(self, host, rate, burst, change):
+        """Apply change(state, now) to host's bucket atomically and return its result."""
+        with self._lock:
+            now = time.time()
+            state = self._states.setdefault(host, new_state(rate, burst, now))
+            return change(state, now)
+
+    def close(self):
+        pass
+
+
+class SqliteBuckets:
+    """Buckets in a SQLite table, so separate processes draw from the same budget."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_buckets ('
+            'host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, rate REAL NOT NULL)'
+        )
+
+    def update(self, host, rate, burst, change):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = self.conn.execute(
+                'SELECT tokens, updated, rate FROM rate_buckets WHERE host = ?', (host,)
+            ).fetchone()
+            if row:
+                state = {'tokens': row[0], 'updated': row[1], 'rate': row[2]}
+            else:
+                state = new_state(rate, burst, now)
+            result = change(state, now)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (host, tokens, updated, rate) VALUES (?, ?, ?, ?)',
+                (host, state['tokens'], state['updated'], state['rate']),
+            )
+            self.conn.execute('COMMIT')
+            return result
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+class CacheBuckets:
+    """Buckets in Django's default cache, guarded by a short cache.add() lock per host."""
+
+    lock_timeout = 5
+    state_timeout = 3600
+
+    def __init__(self):
+        from django.core.cache import cache
+        self.cache = cache
+
+    def update(self, host, rate, burst, change):
+        lock_key = f'ratelimit:lock:{host}'
+        deadline = time.monotonic() + self.lock_timeout
+        # cache.add is atomic on Redis; past the deadline a stale lock is ignored
+        while not self.cache.add(lock_key, 1, self.lock_timeout) and time.monotonic() < deadline:
+            time.sleep(0.005)
+        try:
+            now = time.time()
+            state = self.cache.get(f'ratelimit:{host}') or new_state(rate, burst, now)
+            result = change(state, now)
+            self.cache.set(f'ratelimit:{host}', state, self.state_timeout)
+            return result
+        finally:
+            self.cache.delete(lock_key)
+
+    def close(self):
+        pass
+
+
+def open_buckets(backend, path=None):
+    if backend == 'sqlite':
+        return SqliteBuckets(path)
+    if backend == 'cache':
+        return CacheBuckets()
+    return MemoryBuckets()
@@ -39,8 +39,22 @@ SPIDER_MIDDLEWARES = {
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'scrapy.downloadermiddlewares.retry.RetryMiddleware': 90,
+    'scraper.middlewares.HostTokenBucketMiddleware': 950,
 }
 
+# Per-host token buckets shared by every spider (scraper/ratelimit.py).
+# rate = requests/second, burst = requests allowed back to back. 429s and
+# Retry-After pause the host and halve its rate until responses succeed again.
+HOST_RATE_LIMITS = {
+    'api.themoviedb.org': {'rate': 40, 'burst': 20},
+    'vidsrc.to': {'rate': 5, 'burst': 5},
+    'vidsrc.me': {'rate': 5, 'burst': 5},
+}
+HOST_RATE_LIMIT_DEFAULT = {}      # e.g. {'rate': 2, 'burst': 2} to limit every other host too
+HOST_RATE_LIMIT_BACKEND = 'memory'  # 'sqlite' or 'cache' to share the buckets across processes
+HOST_RATE_LIMIT_DB = ''           # sqlite backend file; empty uses CRAWL_STATE_DB
+HOST_RATE_LIMIT_PENALTY = 10      # pause in seconds after a 429 without Retry-After
+
 # Configure item pipelines
 ITEM_PIPELINES = {
    'scraper.pipelines.DjangoItemPipeline': 300,
@@ -59,6 +73,19 @@ LOG_LEVEL = 'INFO'
 RETRY_TIMES = 3
 RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429]
 
+# Headless Chrome profile for the Selenium spiders (see scraper/browser.py):
+# 'lite' blocks ads, images, fonts and media; 'full' loads everything (baseline)
+BROWSER_PROFILE = 'lite'
+BROWSER_BLOCKED_URLS = []
+
+# SQLite file shared by the worker processes of a sharded run (scraper/crawlstate.py);
+# empty uses movie_scraper/crawlstate.sqlite3
+CRAWL_STATE_DB = ''
+
+# Seconds between checkpoint writes of resumable spiders (scraper/checkpoint.py);
+# checkpoints are only kept when JOBDIR is set (run_improved_scraper does that)
+CHECKPOINT_INTERVAL = 30
+
 
 
 
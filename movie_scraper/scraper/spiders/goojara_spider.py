@@ -5,14 +5,11 @@ Spider for Goojara.to - scrapes movies and streaming links using Selenium
 import scrapy
 from scrapy import signals
 from scrapy.http import HtmlResponse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException
+from scraper import browser
 from scraper.items import MovieItem
 import time
 import re
@@ -61,25 +58,9 @@ class GoojaraSpider(scrapy.Spider):
         """Setup Selenium WebDriver"""
         self.logger.info('Initializing Selenium WebDriver...')
         
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-plugins')
-        chrome_options.add_argument('--disable-images')
-        # Enable JavaScript for series pages to load dynamic content
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(30)
+            # JavaScript stays enabled for series pages to load dynamic content
+            self.driver = browser.start_chrome_for(self)
             self.logger.info('✓ Selenium WebDriver initialized')
         except Exception as e:
             self.logger.error(f'Failed to initialize Selenium: {e}')
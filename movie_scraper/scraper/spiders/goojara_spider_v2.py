@@ -5,13 +5,12 @@ FIXED VERSION - Corrects pagination, duplicate checking, and URL pattern matchin
 import scrapy
 from scrapy import signals
 from scrapy.http import HtmlResponse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from scraper import ajax_replay, browser
+from scraper.checkpoint import Checkpoint
 from scraper.items import MovieItem  # Assuming MovieItem is defined in scraper.items
+from scraper.waits import AnchorStream, PageWaiter
 import time
 import re
 import os
@@ -23,6 +22,12 @@ django.setup()
 
 from streaming.models import Movie, StreamingLink  # Assuming these are your Django models
 
+# Movie URLs: /m followed by 5-6 alphanumeric characters, relative or absolute
+MOVIE_PATH_RE = re.compile(r'^/m[a-zA-Z0-9]{5,6}$')
+MOVIE_URL_RE = re.compile(r'goojara\.to(/m[a-zA-Z0-9]{5,6})(?:[/?#]|$)')
+# Same filter in the page (JavaScript regex) for the incremental anchor stream
+MOVIE_HREF_JS = r'^/m[a-zA-Z0-9]{5,6}([?#]|$)|goojara\.to/m[a-zA-Z0-9]{5,6}([/?#]|$)'
+
 class GoojaraSpiderFixed(scrapy.Spider):
     name = 'goojara_fixed'
     allowed_domains = ['goojara.to', 'ww1.goojara.to', 'supernova.to']
@@ -46,6 +51,13 @@ class GoojaraSpiderFixed(scrapy.Spider):
         # Connect spider lifecycle signals
         crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+
+        # Resumed run (JOBDIR): counters and the listing cursor of the scroll loop
+        spider.checkpoint = Checkpoint.for_spider(spider)
+        spider.resume_state = spider.checkpoint.load()
+        if spider.resume_state:
+            spider.count = spider.resume_state.get('count', 0)
+            spider.seen_urls = set(spider.resume_state.get('seen_urls', []))
         return spider
 
     def spider_opened(self, spider):
@@ -55,40 +67,30 @@ class GoojaraSpiderFixed(scrapy.Spider):
         """
         self.logger.info('Initializing Selenium WebDriver...')
 
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')  # Run Chrome in headless mode
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        # Bypass automation detection
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-
         try:
-            # Install and use ChromeDriverManager for automatic driver management
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            # Further bypass automation detection
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.set_page_load_timeout(30)  # Set page load timeout
+            self.driver = browser.start_chrome_for(self)
+            self.waits = PageWaiter(self.driver, 'goojara', self.logger)
+            self.anchors = AnchorStream(self.driver, MOVIE_HREF_JS, self.logger)
             self.logger.info('✓ Selenium WebDriver initialized')
         except Exception as e:
             self.logger.error(f'Failed to initialize Selenium: {e}')
             raise
 
-    def spider_closed(self, spider):
+    def spider_closed(self, spider, reason='finished'):
         """
         Close the Selenium WebDriver when the spider closes.
         This method is connected to the `signals.spider_closed` signal.
         """
+        if hasattr(self, 'checkpoint'):
+            self._save_checkpoint(force=True, finished=reason not in ('shutdown', 'cancelled'))
+        if hasattr(self, 'waits'):
+            self.waits.log_report()
         if hasattr(self, 'driver'):
             self.driver.quit()
             self.logger.info('Selenium WebDriver closed')
 
-    def __init__(self, limit=200, max_pages=50, rescrape_broken=True, scroll_attempts=10, *args, **kwargs):
+    def __init__(self, limit=200, max_pages=50, rescrape_broken=True, scroll_attempts=10, mode='replay',
+                 scroll_extraction='incremental', *args, **kwargs):
         """
         Initialize the spider with custom parameters.
 
@@ -97,14 +99,20 @@ class GoojaraSpiderFixed(scrapy.Spider):
             max_pages (int): Maximum number of pages to crawl.
             rescrape_broken (bool): Whether to re-scrape movies with previously broken links.
             scroll_attempts (int): Number of times to scroll down to load content.
+            mode (str): 'replay' resolves detail pages over plain HTTP, 'browser' uses Selenium only.
+            scroll_extraction (str): 'incremental' streams only newly added links after each scroll,
+                'full' re-parses the whole page source every scroll (the old behaviour).
         """
         super().__init__(*args, **kwargs)
         self.limit = int(limit)
         self.max_pages = int(max_pages)
         self.scroll_attempts = int(scroll_attempts)
+        self.scroll_extraction = scroll_extraction if scroll_extraction in ('incremental', 'full') else 'incremental'
+        self.mode = mode if mode in ajax_replay.MODES else 'replay'
         self.rescrape_broken = rescrape_broken
         self.count = 0  # Counter for scraped movies
         self.seen_urls = set()  # To track URLs processed in the current scrape session
+        self.resume_state = {}  # Checkpoint of an interrupted run (see from_crawler)
 
         # Duplicate checking logic: Load existing movies from the database
         self.existing_movie_urls = set()  # Stores URLs of movies already in the DB
@@ -146,16 +154,20 @@ class GoojaraSpiderFixed(scrapy.Spider):
         self.logger.info(f'{"="*70}')
 
         try:
-            # Use Selenium to load the page as it uses JavaScript for content loading
-            self.driver.get(response.url)
-            time.sleep(5)  # Give the page time to load initially
+            # Use Selenium to load the page as it uses JavaScript for content loading;
+            # a resumed run goes straight back to the listing page it was on
+            listing_url = self.resume_state.get('listing_url') or response.url
+            self.driver.get(listing_url)
+            self.waits.ready('listing')  # Wait for the first movie links to render
 
             # Check for common blocking patterns
             if '403' in self.driver.title or 'Access Denied' in self.driver.page_source:
                 self.logger.error('⚠ Access Denied or blocked by server. Stopping scrape.')
                 return
 
-            page_number = 1
+            page_number = self.resume_state.get('page_number', 1)
+            if listing_url != response.url:
+                self.logger.info(f'♻️  Resuming at page {page_number}: {listing_url} ({self.count} movies already queued)')
             consecutive_empty_pages = 0  # Track consecutive pages with no NEW movies to scrape
 
             # Infinite scroll and pagination loop
@@ -182,6 +194,7 @@ class GoojaraSpiderFixed(scrapy.Spider):
                         self.logger.info(f'Could not navigate to next page. Stopping.')
                         break
                     page_number += 1
+                    self._save_checkpoint(page_number, force=True)
                     continue
 
                 # Reset consecutive empty pages counter since we found movies
@@ -248,6 +261,7 @@ class GoojaraSpiderFixed(scrapy.Spider):
                     break
 
                 page_number += 1
+                self._save_checkpoint(page_number, force=True)
                 time.sleep(3)  # Wait between page navigations
 
             self.logger.info(f'\n{"="*70}')
@@ -259,6 +273,16 @@ class GoojaraSpiderFixed(scrapy.Spider):
             import traceback
             self.logger.error(traceback.format_exc())
 
+    def _save_checkpoint(self, page_number=None, force=False, finished=False):
+        """Listing cursor (page number and URL) and what was queued so far, for --resume"""
+        state = {'count': self.count, 'seen_urls': sorted(self.seen_urls)}
+        if page_number is not None:
+            state.update(page_number=page_number, listing_url=self.driver.current_url)
+        elif self.resume_state.get('listing_url'):
+            state.update(page_number=self.resume_state['page_number'], listing_url=self.resume_state['listing_url'])
+        self.resume_state = state
+        self.checkpoint.save(state, force=force, finished=finished)
+
     def _extract_all_movies_with_scroll(self):
         """
         Infinite scroll detection: Scrolls the page multiple times to load all
@@ -269,44 +293,33 @@ class GoojaraSpiderFixed(scrapy.Spider):
         """
         all_movie_links = set()
         all_found_links = []  # For debugging
+        incremental = self.scroll_extraction == 'incremental'
+        counter = None
+
+        if incremental:
+            # Seed the stream with what is on the page; after this, each scroll
+            # only transfers and matches the links it added
+            self.anchors.start()
+            counter = self.anchors.total
 
         # Attempt to scroll multiple times to ensure all content is loaded
         for scroll_num in range(self.scroll_attempts):
-            # Get current page source after scrolling
-            html = self.driver.page_source
-            sel_response = HtmlResponse(
-                url=self.driver.current_url,
-                body=html.encode('utf-8'),
-                encoding='utf-8'
-            )
-
-            # Extract all potential links from the current page source
-            current_page_links = sel_response.css('a::attr(href)').getall()
+            if incremental:
+                current_page_links = self.anchors.drain()
+            else:
+                current_page_links = self._all_page_links()
 
-            # FIXED: More flexible movie link pattern matching
-            # Movie URLs follow the pattern: /m followed by 5-6 alphanumeric characters
-            # Examples: /mMG6zJ, /mDJXjL, /mdne8R, /mllenX
             before_count = len(all_movie_links)
-            
+
             for link in current_page_links:
                 if link:
                     # Store for debugging
                     if scroll_num == 0 and len(all_found_links) < 20:
                         all_found_links.append(link)
-                    
-                    # Clean the link (remove query parameters and fragments)
-                    clean_link = link.split('?')[0].split('#')[0].strip()
-                    
-                    # Match movie links: /m followed by 5-6 alphanumeric characters
-                    # Using a more flexible pattern
-                    if re.match(r'^/m[a-zA-Z0-9]{5,6}$', clean_link):
-                        all_movie_links.add(clean_link)
-                    # Also try matching full URLs
-                    elif 'goojara.to/m' in clean_link:
-                        # Extract just the path part
-                        match = re.search(r'goojara\.to(/m[a-zA-Z0-9]{5,6})(?:[/?#]|$)', clean_link)
-                        if match:
-                            all_movie_links.add(match.group(1))
+
+                    movie_path = self._movie_path(link)
+                    if movie_path:
+                        all_movie_links.add(movie_path)
 
             after_count = len(all_movie_links)
             new_links_found = after_count - before_count
@@ -320,27 +333,56 @@ class GoojaraSpiderFixed(scrapy.Spider):
                 else:
                     # Debug: Show what links were actually found (for troubleshooting)
                     self.logger.warning(f'⚠ No movie links matched pattern!')
-                    self.logger.warning(f'Sample of all links found on page: {all_found_links[:10]}')
+                    self.logger.warning(f'Sample of all links found on page: {(all_found_links or self._all_page_links())[:10]}')
                     # Show pattern we're looking for
                     self.logger.info(f'Looking for pattern: /m[a-zA-Z0-9]{{5,6}}')
             elif new_links_found > 0:
                 self.logger.info(f'Scroll {scroll_num}/{self.scroll_attempts}: Found {new_links_found} new links (Total: {after_count}).')
 
-            # Perform the scroll action
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Pause to allow new content to load
+            # Perform the scroll action and wait until new content actually loads
+            if not self.waits.scroll_to_bottom(item_selector='a[href^="/m"]', counter=counter):
+                self.logger.info(f'Page stopped growing after {scroll_num + 1} scrolls. Stopping scroll attempts.')
+                break
 
             # Optimization: If no new links are found after a few scrolls, stop scrolling.
             if new_links_found == 0 and scroll_num >= 3:
                 self.logger.info(f'No new content detected after {scroll_num} scrolls. Stopping scroll attempts.')
                 break
 
+        if incremental:
+            # Links loaded by the last scroll
+            for link in self.anchors.drain():
+                movie_path = self._movie_path(link)
+                if movie_path:
+                    all_movie_links.add(movie_path)
+
         # Scroll back to the top of the page after finishing scrolls
         self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
 
         return list(all_movie_links)
 
+    def _all_page_links(self):
+        """Every href in the current page source (full re-parse)."""
+        sel_response = HtmlResponse(
+            url=self.driver.current_url,
+            body=self.driver.page_source.encode('utf-8'),
+            encoding='utf-8'
+        )
+        return sel_response.css('a::attr(href)').getall()
+
+    @staticmethod
+    def _movie_path(link):
+        """'/mXXXXX' path of a movie link (relative or absolute), or None."""
+        # Clean the link (remove query parameters and fragments)
+        clean_link = link.split('?')[0].split('#')[0].strip()
+        if MOVIE_PATH_RE.match(clean_link):
+            return clean_link
+        if 'goojara.to/m' in clean_link:
+            match = MOVIE_URL_RE.search(clean_link)
+            if match:
+                return match.group(1)
+        return None
+
     def _navigate_to_next_page(self):
         """
         Pagination logic: Attempts to find and click the "Next" page button.
@@ -366,7 +408,7 @@ class GoojaraSpiderFixed(scrapy.Spider):
 
             self.logger.info(f'Attempting direct navigation to: {next_page_url}')
             self.driver.get(next_page_url)
-            time.sleep(4)  # Increased wait time
+            self.waits.ready('listing')
 
             new_url = self.driver.current_url
             
@@ -419,11 +461,11 @@ class GoojaraSpiderFixed(scrapy.Spider):
 
                         # Scroll the button into view for better interaction
                         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
-                        time.sleep(1)
 
                         current_url_before_click = self.driver.current_url
                         next_btn.click()  # Click the next page button
-                        time.sleep(4)  # Wait for the new page to load
+                        if self.waits.left(current_url_before_click, label='next_page'):
+                            self.waits.ready('listing')
 
                         # Check if the URL has actually changed
                         new_url = self.driver.current_url
@@ -446,13 +488,207 @@ class GoojaraSpiderFixed(scrapy.Spider):
         """
         Parses an individual movie detail page to extract movie information
         and streaming links.
+
+        In replay mode the server links are read from the page Scrapy already
+        downloaded and each go.php redirect is resolved from its Location
+        header; Chrome is only used for pages without links in the static
+        HTML and for go.php links that redirect with JavaScript.
+        """
+        if self.mode == 'replay' and response.css('a[href*="/go.php"]'):
+            yield from self.parse_movie_replay(response)
+            return
+        yield from self.parse_movie_browser(response)
+
+    def _movie_fields(self, sel_response, url):
+        """
+        Extracts basic movie information (id, title, year, synopsis, poster)
+        from a movie detail page.
+        """
+        movie_id_from_url = url.split('/')[-1] if url.split('/')[-1] else ''
+        imdb_id = f'goojara_{movie_id_from_url}' # Create a unique ID for this source
+
+        title_element = sel_response.css('h1')
+        title_text = title_element.css('::text').get()
+
+        title = 'Unknown Title'
+        year = None
+        if title_text:
+            # Try to parse title and year (e.g., "Movie Title (2023)")
+            title_match = re.match(r'(.+?)\s*\((\d{4})\)', title_text.strip())
+            if title_match:
+                title = title_match.group(1).strip()
+                year = int(title_match.group(2))
+            else:
+                title = title_text.strip()
+
+        # Extract synopsis - assuming it's the text immediately following the h1 tag
+        synopsis = title_element.xpath('./following-sibling::text()').get()
+        synopsis = synopsis.strip() if synopsis else ''
+
+        # Extract poster URL
+        poster_img_tag = sel_response.css('img')
+        poster_src = poster_img_tag.css('::attr(src)').get()
+        poster_url = sel_response.urljoin(poster_src) if poster_src else ''
+
+        return {
+            'source_url': url,
+            'imdb_id': imdb_id,
+            'title': title,
+            'year': year,
+            'synopsis': synopsis,
+            'poster_url': poster_url,
+        }
+
+    def _server_links(self, sel_response):
+        """
+        Organize the go.php links of a detail page by server type.
+
+        Returns:
+            list: (link_href, link_text, server_name) tuples, Wootly first, then Dood, then others.
+        """
+        # The selector 'a[href*="/go.php"]' targets links that likely lead to streaming endpoints.
+        server_links_map = {'wootly': [], 'dood': [], 'other': []} # Example servers, adjust based on actual site
+
+        for link_elem in sel_response.css('a[href*="/go.php"]'):
+            link_text = link_elem.css('::text').get()
+            link_href = link_elem.css('::attr(href)').get()
+
+            if not link_text or not link_href:
+                continue
+
+            text_lower = link_text.lower()
+
+            if 'dood' in text_lower:
+                server_links_map['dood'].append((link_href, link_text, 'Dood'))
+            elif 'wootly' in text_lower:
+                server_links_map['wootly'].append((link_href, link_text, 'Wootly'))
+            else:
+                # Catch other servers
+                server_links_map['other'].append((link_href, link_text, 'Other'))
+
+        return [link for links_data in server_links_map.values() for link in links_data]
+
+    def _is_valid_stream_url(self, final_stream_url):
+        """
+        Validate the final URL to ensure it's a valid stream link.
+        This checks for common indicators of error pages or non-stream URLs.
+        """
+        invalid_patterns = ['goojara.to', '404', 'error', 'ads'] # Add any other known invalid patterns
+        return bool(
+            final_stream_url and
+            len(final_stream_url) > 20 and # Basic length check
+            not any(p in final_stream_url.lower() for p in invalid_patterns)
+        )
+
+    def _movie_items(self, fields, streaming_links):
+        """
+        Yield a MovieItem per valid streaming link, or a single item without
+        a stream URL so the movie is still saved.
+        """
+        if not streaming_links:
+            self.logger.warning(f'No valid streaming links found for movie: "{fields["title"]}" ({fields["source_url"]})')
+            streaming_links = [{'url': '', 'server': 'Unknown', 'quality': 'Unknown', 'language': 'EN'}]
+
+        for stream_link in streaming_links:
+            item = MovieItem()
+            item['source_site'] = 'goojara.to'
+            item['source_url'] = fields['source_url'] # The URL of the movie detail page on Goojara
+            item['imdb_id'] = fields['imdb_id']
+            item['title'] = fields['title']
+            item['year'] = fields['year']
+            item['synopsis'] = fields['synopsis']
+            item['poster_url'] = fields['poster_url']
+            item['stream_url'] = stream_link['url']
+            item['server_name'] = stream_link['server']
+            item['quality'] = stream_link['quality']
+            item['language'] = stream_link['language']
+
+            if stream_link['url']:
+                self.logger.info(f'✓ Yielding movie: "{fields["title"]}" ({stream_link["server"]} - {stream_link["quality"]})')
+            yield item
+
+    def parse_movie_replay(self, response):
+        """
+        Resolve the go.php links of a plain-HTTP detail page one after another
+        (the chain carries the pending and resolved links in meta), then
+        yield the items.
+        """
+        self.logger.info(f'Parsing movie detail page (replay): {response.url}')
+        fields = self._movie_fields(response, response.url)
+        pending = [(response.urljoin(href), text, server) for href, text, server in self._server_links(response)]
+        if not pending:
+            yield from self._movie_items(fields, [])
+            return
+        yield self._go_request(fields, pending, [])
+
+    def _go_request(self, fields, pending, resolved):
+        full_redirect_url, link_text, server_name = pending[0]
+        return scrapy.Request(
+            url=full_redirect_url,
+            callback=self.parse_go_redirect,
+            errback=self.go_redirect_failed,
+            meta=ajax_replay.resolve_redirect_meta({'fields': fields, 'pending': pending, 'resolved': resolved}),
+            dont_filter=True,
+        )
+
+    def parse_go_redirect(self, response):
+        """Read where go.php sends us; JavaScript redirects are followed in Chrome."""
+        fields = response.meta['fields']
+        pending = response.meta['pending']
+        full_redirect_url, link_text, server_name = pending[0]
+
+        final_stream_url = ajax_replay.redirect_target(response)
+        if final_stream_url is None:
+            final_stream_url = self._resolve_in_browser(full_redirect_url)
+
+        yield from self._next_go_link(fields, pending, response.meta['resolved'], final_stream_url)
+
+    def go_redirect_failed(self, failure):
+        meta = failure.request.meta
+        self.logger.warning(f'Failed to resolve {meta["pending"][0][0]}: {failure.value!r}')
+        yield from self._next_go_link(meta['fields'], meta['pending'], meta['resolved'], None)
+
+    def _next_go_link(self, fields, pending, resolved, final_stream_url):
+        full_redirect_url, link_text, server_name = pending[0]
+        if self._is_valid_stream_url(final_stream_url):
+            resolved = resolved + [{
+                'url': final_stream_url,
+                'server': server_name,
+                'quality': self._extract_quality(link_text), # Helper to get video quality
+                'language': 'EN' # Assuming English, can be determined if available
+            }]
+        elif final_stream_url:
+            self.logger.warning(f'Invalid stream URL found for {server_name} ({fields["title"]}): {final_stream_url}')
+
+        if len(pending) > 1:
+            yield self._go_request(fields, pending[1:], resolved)
+        else:
+            yield from self._movie_items(fields, resolved)
+
+    def _resolve_in_browser(self, full_redirect_url):
+        """Final URL of a go.php link after Chrome follows its redirect, or None."""
+        try:
+            self.driver.get(full_redirect_url)
+            # Wait for the redirect off goojara and the player page to settle
+            if self.waits.until(lambda driver: 'goojara.to' not in driver.current_url, 'redirect',
+                                timeout=self.waits.profile['redirect_timeout']):
+                self.waits.settle(label='redirect:settle')
+            return self.driver.current_url
+        except Exception as e:
+            self.logger.warning(f'Failed to follow {full_redirect_url} in browser: {e}')
+            return None
+
+    def parse_movie_browser(self, response):
+        """
+        Parses an individual movie detail page with Selenium, following every
+        streaming link in the browser.
         """
         self.logger.info(f'Parsing movie detail page: {response.url}')
 
         try:
             # Use Selenium to get the most up-to-date page source, as it might redirect or load dynamic elements
             self.driver.get(response.url)
-            time.sleep(3)
+            self.waits.ready('detail')
 
             html = self.driver.page_source
             sel_response = HtmlResponse(
@@ -461,157 +697,53 @@ class GoojaraSpiderFixed(scrapy.Spider):
                 encoding='utf-8'
             )
 
-            # Extract basic movie information
-            movie_id_from_url = response.url.split('/')[-1] if response.url.split('/')[-1] else ''
-            imdb_id = f'goojara_{movie_id_from_url}' # Create a unique ID for this source
-
-            title_element = sel_response.css('h1')
-            title_text = title_element.css('::text').get()
-
-            title = 'Unknown Title'
-            year = None
-            if title_text:
-                # Try to parse title and year (e.g., "Movie Title (2023)")
-                title_match = re.match(r'(.+?)\s*\((\d{4})\)', title_text.strip())
-                if title_match:
-                    title = title_match.group(1).strip()
-                    year = int(title_match.group(2))
-                else:
-                    title = title_text.strip()
-
-            # Extract synopsis - assuming it's the text immediately following the h1 tag
-            synopsis = title_element.xpath('./following-sibling::text()').get()
-            synopsis = synopsis.strip() if synopsis else ''
-
-            # Extract poster URL
-            poster_img_tag = sel_response.css('img')
-            poster_src = poster_img_tag.css('::attr(src)').get()
-            poster_url = response.urljoin(poster_src) if poster_src else ''
+            fields = self._movie_fields(sel_response, response.url)
+            title = fields['title']
+            server_links = self._server_links(sel_response)
 
-            # Find streaming link elements
-            # The selector 'a[href*="/go.php"]' targets links that likely lead to streaming endpoints.
-            stream_links_elements = sel_response.css('a[href*="/go.php"]')
-
-            if not stream_links_elements:
+            if not server_links:
                 self.logger.warning(f'No streaming link elements found for movie: "{title}" ({response.url})')
                 # Still yield the movie even without streaming links
-                item = MovieItem()
-                item['source_site'] = 'goojara.to'
-                item['source_url'] = response.url
-                item['imdb_id'] = imdb_id
-                item['title'] = title
-                item['year'] = year
-                item['synopsis'] = synopsis
-                item['poster_url'] = poster_url
-                item['stream_url'] = ''
-                item['server_name'] = 'Unknown'
-                item['quality'] = 'Unknown'
-                item['language'] = 'EN'
-                yield item
+                yield from self._movie_items(fields, [])
                 return
 
-            # Organize links by server type (e.g., 'wootly', 'dood')
-            server_links_map = {'wootly': [], 'dood': [], 'other': []} # Example servers, adjust based on actual site
-
-            for link_elem in stream_links_elements:
-                link_text = link_elem.css('::text').get()
-                link_href = link_elem.css('::attr(href)').get()
-
-                if not link_text or not link_href:
-                    continue
-
-                text_lower = link_text.lower()
-
-                if 'dood' in text_lower:
-                    server_links_map['dood'].append((link_href, link_text, 'Dood'))
-                elif 'wootly' in text_lower:
-                    server_links_map['wootly'].append((link_href, link_text, 'Wootly'))
-                else:
-                    # Catch other servers
-                    server_links_map['other'].append((link_href, link_text, 'Other'))
-
             # Process each found streaming link
             all_valid_streaming_links = []
             movie_detail_page_url = self.driver.current_url # Store current URL to return later
 
-            for server_type, links_data in server_links_map.items():
-                for link_href, link_text, server_name in links_data:
+            for link_href, link_text, server_name in server_links:
+                try:
+                    quality = self._extract_quality(link_text) # Helper to get video quality
+                    full_redirect_url = response.urljoin(link_href)
+
+                    # Navigate to the redirect URL to get the final stream URL
+                    final_stream_url = self._resolve_in_browser(full_redirect_url)
+
+                    if self._is_valid_stream_url(final_stream_url):
+                        all_valid_streaming_links.append({
+                            'url': final_stream_url,
+                            'server': server_name,
+                            'quality': quality,
+                            'language': 'EN' # Assuming English, can be determined if available
+                        })
+                    else:
+                        self.logger.warning(f'Invalid stream URL found for {server_name} ({title}): {final_stream_url}')
+
+                    # Return to the movie detail page to process the next link
+                    self.driver.get(movie_detail_page_url)
+                    self.waits.ready('detail')
+
+                except Exception as e:
+                    self.logger.warning(f'Failed to process link for {server_name} ({title}): {e}')
+                    # Attempt to return to the movie detail page even if an error occurred
                     try:
-                        quality = self._extract_quality(link_text) # Helper to get video quality
-                        full_redirect_url = response.urljoin(link_href)
-
-                        # Navigate to the redirect URL to get the final stream URL
-                        self.driver.get(full_redirect_url)
-                        time.sleep(5) # Wait for the redirect and potential ad/player load
-
-                        final_stream_url = self.driver.current_url
-
-                        # Validate the final URL to ensure it's a valid stream link
-                        # This checks for common indicators of error pages or non-stream URLs
-                        invalid_patterns = ['goojara.to', '404', 'error', 'ads'] # Add any other known invalid patterns
-                        is_valid = (
-                            final_stream_url and
-                            len(final_stream_url) > 20 and # Basic length check
-                            not any(p in final_stream_url.lower() for p in invalid_patterns)
-                        )
-
-                        if is_valid:
-                            all_valid_streaming_links.append({
-                                'url': final_stream_url,
-                                'server': server_name,
-                                'quality': quality,
-                                'language': 'EN' # Assuming English, can be determined if available
-                            })
-                        else:
-                            self.logger.warning(f'Invalid stream URL found for {server_name} ({title}): {final_stream_url}')
-
-                        # Return to the movie detail page to process the next link
                         self.driver.get(movie_detail_page_url)
-                        time.sleep(2)
-
-                    except Exception as e:
-                        self.logger.warning(f'Failed to process link for {server_name} ({title}): {e}')
-                        # Attempt to return to the movie detail page even if an error occurred
-                        try:
-                            self.driver.get(movie_detail_page_url)
-                            time.sleep(2)
-                        except:
-                            pass # If returning fails, just log and continue
+                        self.waits.ready('detail')
+                    except:
+                        pass # If returning fails, just log and continue
 
             # Yield MovieItem for each valid streaming link found
-            if all_valid_streaming_links:
-                for stream_link in all_valid_streaming_links:
-                    item = MovieItem()
-                    item['source_site'] = 'goojara.to'
-                    item['source_url'] = response.url # The URL of the movie detail page on Goojara
-                    item['imdb_id'] = imdb_id
-                    item['title'] = title
-                    item['year'] = year
-                    item['synopsis'] = synopsis
-                    item['poster_url'] = poster_url
-                    item['stream_url'] = stream_link['url']
-                    item['server_name'] = stream_link['server']
-                    item['quality'] = stream_link['quality']
-                    item['language'] = stream_link['language']
-
-                    self.logger.info(f'✓ Yielding movie: "{title}" ({stream_link["server"]} - {stream_link["quality"]})')
-                    yield item
-            else:
-                self.logger.warning(f'No valid streaming links found for movie: "{title}" ({response.url})')
-                # Still yield the movie even without valid streaming links
-                item = MovieItem()
-                item['source_site'] = 'goojara.to'
-                item['source_url'] = response.url
-                item['imdb_id'] = imdb_id
-                item['title'] = title
-                item['year'] = year
-                item['synopsis'] = synopsis
-                item['poster_url'] = poster_url
-                item['stream_url'] = ''
-                item['server_name'] = 'Unknown'
-                item['quality'] = 'Unknown'
-                item['language'] = 'EN'
-                yield item
+            yield from self._movie_items(fields, all_valid_streaming_links)
 
         except Exception as e:
             self.logger.error(f'Error parsing movie page {response.url}: {e}')
@@ -6,14 +6,10 @@ Uses Chrome DevTools Protocol to intercept network requests and capture complete
 import scrapy
 from scrapy import signals
 from scrapy.http import HtmlResponse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from webdriver_manager.chrome import ChromeDriverManager
+from scraper import browser
 from scraper.items import MovieItem
 import time
 import re
@@ -72,27 +68,10 @@ class OneflixNetworkCaptureSpider(scrapy.Spider):
         """Setup Selenium with network logging enabled"""
         self.logger.info('🚀 Initializing Network Capture Spider...')
         
-        # Enable performance logging to capture network requests
-        capabilities = DesiredCapabilities.CHROME
-        capabilities['goog:loggingPrefs'] = {'performance': 'ALL'}
-        
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Enable performance logging
-        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-        
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(30)
+            # Performance logging exposes the embed requests to capture; the player
+            # profile keeps iframes loading fully (only ads are blocked)
+            self.driver = browser.start_chrome_for(self, profile='player', performance_log=True)
             self.logger.info('✓ Selenium with Network Logging initialized')
         except Exception as e:
             self.logger.error(f'❌ Failed to initialize Selenium: {e}')
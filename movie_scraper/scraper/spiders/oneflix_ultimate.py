@@ -10,15 +10,11 @@ ULTIMATE 1Flix Spider - Best of all solutions combined
 import scrapy
 from scrapy import signals
 from scrapy.http import HtmlResponse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from scraper import ajax_replay, browser
+from scraper.checkpoint import Checkpoint
 from scraper.items import MovieItem
-import time
+from scraper.waits import PageWaiter
 import re
 import os
 import django
@@ -46,10 +42,16 @@ class OneFlixUltimateSpider(scrapy.Spider):
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
 
-    def __init__(self, limit=100, max_pages=5, *args, **kwargs):
+    # Servers are tried in this order: UpCloud > MegaCloud > VidCloud
+    SERVER_PRIORITY = {'upcloud': 0, 'megacloud': 1, 'vidcloud': 2}
+
+    def __init__(self, limit=100, max_pages=5, mode='replay', *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.limit = int(limit)
         self.max_pages = int(max_pages)
+        self.mode = mode if mode in ajax_replay.MODES else 'replay'
+        self.endpoints = ajax_replay.load_endpoints('1flix')
+        self.endpoints_captured = False
         self.count = 0
         self.seen_urls = set()
         self.pages_scraped = {}
@@ -61,7 +63,9 @@ class OneFlixUltimateSpider(scrapy.Spider):
             'successful': 0,
             'failed': 0,
             'broken_links': 0,
-            'working_links': 0
+            'working_links': 0,
+            'replayed': 0,
+            'browser': 0
         }
         
         self._load_existing_movies()
@@ -71,37 +75,45 @@ class OneFlixUltimateSpider(scrapy.Spider):
         spider = super().from_crawler(crawler, *args, **kwargs)
         crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+
+        # Resumed run (JOBDIR): pending pages are in the job queue, counters here
+        spider.checkpoint = Checkpoint.for_spider(spider)
+        saved = spider.checkpoint.load()
+        if saved:
+            spider.count = saved.get('count', 0)
+            spider.seen_urls = set(saved.get('seen_urls', []))
+            spider.pages_scraped = saved.get('pages_scraped', {})
+            spider.stats.update(saved.get('stats', {}))
         return spider
 
     def spider_opened(self, spider):
+        """Start Chrome up front unless replay mode may never need it"""
+        self.logger.info(f'🚀 Initializing Ultimate 1Flix Spider ({self.mode} mode)...')
+        if self.mode != 'replay':
+            self._start_browser()
+
+    def _browser(self):
+        """Selenium driver, started on first use"""
+        if not hasattr(self, 'driver'):
+            self._start_browser()
+        return self.driver
+
+    def _start_browser(self):
         """Setup Selenium WebDriver with optimized settings"""
-        self.logger.info('🚀 Initializing Ultimate 1Flix Spider...')
-        
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-images')  # Faster loading
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(30)
+            # Performance log exposes the XHR calls to learn endpoints from (capture mode)
+            self.driver = browser.start_chrome_for(self, performance_log=self.mode == 'capture')
+            self.waits = PageWaiter(self.driver, '1flix', self.logger)
             self.logger.info('✓ Selenium WebDriver initialized')
         except Exception as e:
             self.logger.error(f'❌ Failed to initialize Selenium: {e}')
             raise
 
-    def spider_closed(self, spider):
+    def spider_closed(self, spider, reason='finished'):
         """Cleanup and show final statistics"""
         if hasattr(self, 'driver'):
             self.driver.quit()
+        self._save_checkpoint(force=True, finished=reason not in ('shutdown', 'cancelled'))
         
         self.logger.info('\n' + '='*70)
         self.logger.info('🎬 SCRAPING SUMMARY - 1FLIX ULTIMATE SPIDER')
@@ -111,8 +123,20 @@ class OneFlixUltimateSpider(scrapy.Spider):
         self.logger.info(f'✗ Failed:            {self.stats["failed"]} ({self._percent(self.stats["failed"], self.stats["attempted"])})')
         self.logger.info(f'📊 Working Links:    {self.stats["working_links"]}')
         self.logger.info(f'🚫 Broken Links:     {self.stats["broken_links"]} (filtered out)')
+        self.logger.info(f'⚡ Via AJAX replay:  {self.stats["replayed"]}')
+        self.logger.info(f'🌐 Via browser:      {self.stats["browser"]}')
+        if hasattr(self, 'waits'):
+            self.waits.log_report()
         self.logger.info('='*70 + '\n')
 
+    def _save_checkpoint(self, force=False, finished=False):
+        self.checkpoint.save({
+            'count': self.count,
+            'seen_urls': sorted(self.seen_urls),
+            'pages_scraped': self.pages_scraped,
+            'stats': self.stats,
+        }, force=force, finished=finished)
+
     def _percent(self, part, total):
         """Calculate percentage"""
         return f'{(part/max(total,1)*100):.1f}%'
@@ -213,20 +237,50 @@ class OneFlixUltimateSpider(scrapy.Spider):
         except Exception as e:
             return False, "Validation error"
 
+    def _embed_src(self, selector):
+        """WebDriverWait condition: src of an iframe matching selector once JavaScript has filled it in"""
+        def condition(driver):
+            for iframe in driver.find_elements(By.CSS_SELECTOR, selector):
+                iframe_src = iframe.get_attribute('src') or ''
+                # For videostr, check if z= has a value
+                if 'videostr.net' in iframe_src:
+                    if '?z=' in iframe_src and len(iframe_src.split('?z=')[1]) > 5:
+                        return iframe_src
+                # For other servers, just check if URL looks reasonable
+                elif len(iframe_src) > 30:
+                    return iframe_src
+            return False
+        return condition
+
+    def _player_src(self):
+        """
+        Src of the player iframe after a server click. The generic selectors
+        also match ad and tracker iframes, so they are only tried once the
+        player's own iframe#iframe-embed never showed up.
+        """
+        iframe_src = self.waits.until(self._embed_src("iframe#iframe-embed"), 'server:iframe', timeout=12)
+        for selector in ["iframe[src*='embed']", "iframe[src]"]:
+            if iframe_src:
+                break
+            iframe_src = self.waits.until(self._embed_src(selector), 'server:iframe-fallback', timeout=3)
+        return iframe_src
+
     def parse(self, response):
         """Parse movie listing pages"""
         self.logger.info(f'📄 Loading page: {response.url}')
         
         try:
-            self.driver.get(response.url)
-            time.sleep(4)
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            html = self.driver.page_source
-            sel_response = HtmlResponse(url=response.url, body=html.encode('utf-8'), encoding='utf-8')
-            
-            all_links = sel_response.css('a::attr(href)').getall()
+            # Listings are server-rendered; only render them when the plain response has no titles
+            all_links = response.css('a::attr(href)').getall()
+            if self.mode != 'replay' or not any(re.match(r'^/movie/watch-[\w-]+-\d+', link) for link in all_links):
+                driver = self._browser()
+                driver.get(response.url)
+                self.waits.ready('listing')
+                self.waits.scroll_to_bottom()
+                
+                html = driver.page_source
+                sel_response = HtmlResponse(url=response.url, body=html.encode('utf-8'), encoding='utf-8')
+                all_links = sel_response.css('a::attr(href)').getall()
             
             movies_found = 0
             for link in all_links:
@@ -257,57 +311,185 @@ class OneFlixUltimateSpider(scrapy.Spider):
                     next_url = f"{base_url}?page={next_page}"
                     self.pages_scraped[base_url] = next_page
                     yield scrapy.Request(url=next_url, callback=self.parse, dont_filter=True)
+
+            self._save_checkpoint()
             
         except Exception as e:
             self.logger.error(f'❌ Error parsing page: {e}')
 
+    def _movie_item(self, sel_response, url):
+        """MovieItem with the title metadata from a movie page, or None without a title"""
+        item = MovieItem()
+        item['source_site'] = '1flix.to'
+        item['source_url'] = url
+        
+        movie_id = ajax_replay.content_id(url) or url.split('/')[-1]
+        item['imdb_id'] = f'1flix_{movie_id}'
+        
+        # Title and year
+        title_elem = sel_response.css('h2.heading-name a::text, .film-name::text').get()
+        if not title_elem:
+            return None
+        
+        title_text = re.sub(r'^Watch\s+', '', title_elem.strip(), flags=re.IGNORECASE)
+        title_text = re.sub(r'\s+Online\s+free$', '', title_text, flags=re.IGNORECASE)
+        
+        title_match = re.search(r'(.+?)\s+(\d{4})', title_text)
+        if title_match:
+            item['title'] = title_match.group(1).strip()
+            item['year'] = int(title_match.group(2))
+        else:
+            item['title'] = title_text
+            item['year'] = None
+        
+        # Synopsis and poster
+        synopsis = sel_response.css('.description::text').get()
+        item['synopsis'] = synopsis.strip() if synopsis else ''
+        
+        poster = sel_response.css('.film-poster-img::attr(data-src), .film-poster-img::attr(src)').get()
+        item['poster_url'] = sel_response.urljoin(poster) if poster else ''
+        return item
+
+    def _validated(self, item, iframe_src, srv_name):
+        """Run both validations on an extracted URL; fills and returns item when it works"""
+        self.logger.info(f'      📎 Extracted URL: {iframe_src[:80]}...')
+        
+        # QUICK VALIDATION (instant)
+        quick_valid, quick_reason = self.quick_validate_url(iframe_src)
+        if not quick_valid:
+            self.logger.warning(f'      ❌ Quick check failed: {quick_reason}')
+            self.stats['broken_links'] += 1
+            return None
+        
+        # DEEP VALIDATION (checks if actually works)
+        self.logger.info(f'      ⏳ Deep validating...')
+        deep_valid, deep_reason = self.deep_validate_url(iframe_src)
+        if not deep_valid:
+            self.logger.warning(f'      ❌ Link broken: {deep_reason}')
+            self.stats['broken_links'] += 1
+            return None
+        
+        item['stream_url'] = iframe_src
+        item['server_name'] = srv_name
+        item['quality'] = 'HD'
+        item['language'] = 'EN'
+        
+        self.logger.info(f'      ✅ WORKING LINK! ({deep_reason})')
+        self.stats['successful'] += 1
+        self.stats['working_links'] += 1
+        return item
+
     def parse_movie(self, response):
-        """Parse individual movie with smart validation"""
+        """Parse individual movie: replay the server/source AJAX calls, or render it in Chrome"""
         self.stats['attempted'] += 1
         
+        movie_id = ajax_replay.content_id(response.url)
+        if self.mode != 'replay' or not movie_id or 'servers' not in self.endpoints:
+            yield from self.parse_movie_browser(response)
+            return
+        
+        item = self._movie_item(response, response.url)
+        if not item:
+            # Title block is rendered client side after all
+            yield from self.parse_movie_browser(response)
+            return
+        
+        self.logger.info(f'\n🎬 Processing: {item["title"]} ({item["year"]}) via AJAX')
+        yield scrapy.Request(
+            url=ajax_replay.endpoint_url(response.url, self.endpoints['servers'], movie_id),
+            headers=ajax_replay.ajax_headers(response.url),
+            callback=self.parse_servers,
+            errback=self.replay_failed,
+            meta={'item': item, 'movie_url': response.url},
+            dont_filter=True,
+        )
+
+    def parse_servers(self, response):
+        """Server list from the AJAX endpoint; ask for the sources of the best one"""
+        servers = ajax_replay.parse_servers(response)
+        if not servers or 'sources' not in self.endpoints:
+            self.logger.warning(f'   ⚠️  No servers from AJAX, falling back to browser')
+            yield self._browser_request(response.meta['movie_url'])
+            return
+        
+        servers.sort(key=lambda server: self.SERVER_PRIORITY.get(server[0].lower(), 3))
+        for srv_name, _ in servers:
+            self.logger.info(f'   📡 Found server: {srv_name}')
+        yield self._sources_request(response.meta, servers[:3])
+
+    def _sources_request(self, meta, servers):
+        srv_name, srv_id = servers[0]
+        self.logger.info(f'   🔍 Testing {srv_name}...')
+        return scrapy.Request(
+            url=ajax_replay.endpoint_url(meta['movie_url'], self.endpoints['sources'], srv_id),
+            headers=ajax_replay.ajax_headers(meta['movie_url']),
+            callback=self.parse_sources,
+            errback=self.replay_failed,
+            meta={'item': meta['item'], 'movie_url': meta['movie_url'], 'servers': servers},
+            dont_filter=True,
+        )
+
+    def parse_sources(self, response):
+        """Embed link for one server; validate it or move on to the next server"""
+        item = response.meta['item']
+        servers = response.meta['servers']
+        srv_name = servers[0][0]
+        
+        iframe_src = ajax_replay.parse_source_link(response)
+        if iframe_src and self._validated(item, iframe_src, srv_name):
+            self.stats['replayed'] += 1
+            yield item
+            return
+        if not iframe_src:
+            self.logger.warning(f'      ⚠️  No link in sources response for {srv_name}')
+        
+        if len(servers) > 1:
+            yield self._sources_request(response.meta, servers[1:])
+            return
+        
+        self.logger.warning(f'   ❌ No working links found for: {item["title"]}')
+        self.stats['failed'] += 1
+
+    def replay_failed(self, failure):
+        """AJAX endpoint errored (blocked, moved, 5xx): render the page instead"""
+        meta = failure.request.meta
+        self.logger.warning(f'   ⚠️  AJAX replay failed ({failure.value!r}), falling back to browser')
+        yield self._browser_request(meta['movie_url'])
+
+    def _browser_request(self, movie_url):
+        return scrapy.Request(url=movie_url, callback=self.parse_movie_browser, dont_filter=True)
+
+    def _capture_endpoints(self, movie_id, server_ids):
+        """Learn the server/source endpoints from the XHR calls this title made (capture mode)"""
+        learned = ajax_replay.learn_endpoints(ajax_replay.capture_xhr(self.driver), movie_id, server_ids)
+        if learned:
+            ajax_replay.save_endpoints('1flix', learned)
+            self.endpoints.update(learned)
+            self.endpoints_captured = True
+            self.logger.info(f'   🎯 Captured endpoints: {learned}')
+
+    def parse_movie_browser(self, response):
+        """Parse individual movie in Chrome with smart validation"""
         try:
-            self.driver.get(response.url)
-            time.sleep(5)
+            driver = self._browser()
+            if self.mode == 'capture':
+                ajax_replay.capture_xhr(driver)  # drain log entries from earlier pages
+            driver.get(response.url)
+            self.waits.ready('detail')
+            self.stats['browser'] += 1
             
-            html = self.driver.page_source
+            html = driver.page_source
             sel_response = HtmlResponse(url=response.url, body=html.encode('utf-8'), encoding='utf-8')
             
             # Extract movie metadata
-            item = MovieItem()
-            item['source_site'] = '1flix.to'
-            item['source_url'] = response.url
-            
-            movie_id_match = re.search(r'-(\d+)$', response.url)
-            movie_id = movie_id_match.group(1) if movie_id_match else response.url.split('/')[-1]
-            item['imdb_id'] = f'1flix_{movie_id}'
-            
-            # Title and year
-            title_elem = sel_response.css('h2.heading-name a::text, .film-name::text').get()
-            if not title_elem:
+            item = self._movie_item(sel_response, response.url)
+            if not item:
                 self.logger.warning(f'⚠️  No title found, skipping: {response.url}')
                 self.stats['failed'] += 1
                 return
             
-            title_text = re.sub(r'^Watch\s+', '', title_elem.strip(), flags=re.IGNORECASE)
-            title_text = re.sub(r'\s+Online\s+free$', '', title_text, flags=re.IGNORECASE)
-            
-            title_match = re.search(r'(.+?)\s+(\d{4})', title_text)
-            if title_match:
-                item['title'] = title_match.group(1).strip()
-                item['year'] = int(title_match.group(2))
-            else:
-                item['title'] = title_text
-                item['year'] = None
-            
             self.logger.info(f'\n🎬 Processing: {item["title"]} ({item["year"]})')
             
-            # Synopsis and poster
-            synopsis = sel_response.css('.description::text').get()
-            item['synopsis'] = synopsis.strip() if synopsis else ''
-            
-            poster = sel_response.css('.film-poster-img::attr(data-src), .film-poster-img::attr(src)').get()
-            item['poster_url'] = response.urljoin(poster) if poster else ''
-            
             # Get server buttons
             movie_page_url = self.driver.current_url
             server_buttons = self.driver.find_elements(By.CSS_SELECTOR, "a[data-id].link-item")
@@ -318,7 +500,6 @@ class OneFlixUltimateSpider(scrapy.Spider):
                 return
             
             # Prioritize servers: UpCloud > MegaCloud > VidCloud
-            server_priority = {'upcloud': 0, 'megacloud': 1, 'vidcloud': 2}
             servers_info = []
             
             for button in server_buttons:
@@ -326,7 +507,7 @@ class OneFlixUltimateSpider(scrapy.Spider):
                     server_name = button.text.strip()
                     server_id = button.get_attribute('data-id')
                     if server_name and server_id:
-                        priority = server_priority.get(server_name.lower(), 3)
+                        priority = self.SERVER_PRIORITY.get(server_name.lower(), 3)
                         servers_info.append((priority, server_name, server_id, button))
                         self.logger.info(f'   📡 Found server: {server_name}')
                 except:
@@ -348,80 +529,28 @@ class OneFlixUltimateSpider(scrapy.Spider):
                     
                     # Click server button
                     self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button_elem)
-                    time.sleep(1)
                     self.driver.execute_script("arguments[0].click();", button_elem)
-                    time.sleep(5)
                     
-                    # Find iframe and wait for it to fully load
-                    iframe = None
-                    for selector in ["iframe#iframe-embed", "iframe[src*='embed']", "iframe[src]"]:
-                        try:
-                            iframe = WebDriverWait(self.driver, 8).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                            )
-                            if iframe:
-                                break
-                        except:
-                            continue
+                    # Wait until the player iframe has its full src
+                    iframe_src = self._player_src()
                     
-                    if not iframe:
-                        self.logger.warning(f'      ⚠️  No iframe found')
+                    if not iframe_src:
+                        self.logger.warning(f'      ⚠️  No iframe with a valid src found')
                         continue
                     
-                    # Wait additional time for JavaScript to populate the iframe src fully
-                    time.sleep(3)
-                    
-                    # Get iframe src - try multiple times as it may be dynamically loaded
-                    iframe_src = None
-                    for attempt in range(3):
-                        iframe_src = iframe.get_attribute('src')
-                        # For videostr, check if z= has a value
-                        if iframe_src and 'videostr.net' in iframe_src:
-                            if '?z=' in iframe_src and len(iframe_src.split('?z=')[1]) > 5:
-                                break
-                        # For other servers, just check if URL looks reasonable
-                        elif iframe_src and len(iframe_src) > 30:
-                            break
-                        time.sleep(2)
+                    if self.mode == 'capture' and not self.endpoints_captured:
+                        self._capture_endpoints(ajax_replay.content_id(response.url), [info[2] for info in servers_info])
                     
-                    if not iframe_src or len(iframe_src) < 20:
-                        self.logger.warning(f'      ⚠️  Invalid iframe src')
-                        continue
-                    
-                    self.logger.info(f'      📎 Extracted URL: {iframe_src[:80]}...')
-                    
-                    # QUICK VALIDATION (instant)
-                    quick_valid, quick_reason = self.quick_validate_url(iframe_src)
-                    if not quick_valid:
-                        self.logger.warning(f'      ❌ Quick check failed: {quick_reason}')
-                        self.stats['broken_links'] += 1
-                        continue
-                    
-                    # DEEP VALIDATION (checks if actually works)
-                    self.logger.info(f'      ⏳ Deep validating...')
-                    deep_valid, deep_reason = self.deep_validate_url(iframe_src)
-                    
-                    if deep_valid:
-                        item['stream_url'] = iframe_src
-                        item['server_name'] = srv_name
-                        item['quality'] = 'HD'
-                        item['language'] = 'EN'
-                        
-                        self.logger.info(f'      ✅ WORKING LINK! ({deep_reason})')
-                        self.stats['successful'] += 1
-                        self.stats['working_links'] += 1
+                    if self._validated(item, iframe_src, srv_name):
                         yield item
                         return
-                    else:
-                        self.logger.warning(f'      ❌ Link broken: {deep_reason}')
-                        self.stats['broken_links'] += 1
                         
                 except Exception as e:
                     self.logger.warning(f'      ⚠️  Error with {srv_name}: {str(e)[:100]}')
                 finally:
                     try:
                         self.driver.get(movie_page_url)
-                        time.sleep(2)
+                        self.waits.ready('detail')
                     except:
                         pass
             
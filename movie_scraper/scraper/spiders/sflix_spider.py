@@ -1,19 +1,16 @@
 # scraper/spiders/sflix_spider.py
 import scrapy
 from scrapy import signals
-import time
 import re
 import os
 import django
 
 from scrapy.http import HtmlResponse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 
+from scraper import ajax_replay, browser
 from scraper.items import MovieItem
+from scraper.waits import PageWaiter
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_scrape.settings")
 django.setup()
@@ -32,71 +29,92 @@ class SflixSpider(scrapy.Spider):
         "CONCURRENT_REQUESTS": 1,
     }
 
+    # replay (AJAX endpoints, Chrome only as fallback), browser or capture - see scraper/ajax_replay.py
+    mode = "replay"
+
     @classmethod
     def from_crawler(cls, crawler, *args, **kwargs):
         spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.mode not in ajax_replay.MODES:
+            spider.mode = "replay"
+        spider.endpoints = ajax_replay.load_endpoints('sflix')
+        spider.endpoints_captured = False
         
-        # Initialize Selenium WebDriver
-        spider.logger.info('Initializing Selenium WebDriver for Sflix spider...')
+        # Chrome is started lazily in replay mode, most pages never need it
+        if spider.mode != 'replay':
+            spider._start_browser()
         
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        # Bypass automation detection
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        # Connect spider close signal to cleanup driver
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        return spider
 
+    def _browser(self):
+        """Selenium driver, started on first use."""
+        if not hasattr(self, 'driver'):
+            self._start_browser()
+        return self.driver
+
+    def _start_browser(self):
+        """Initialize Selenium WebDriver."""
+        self.logger.info('Initializing Selenium WebDriver for Sflix spider...')
+        
         try:
-            service = Service(ChromeDriverManager().install())
-            spider.driver = webdriver.Chrome(service=service, options=options)
-            # Further bypass automation detection
-            spider.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            spider.driver.set_page_load_timeout(30)
-            spider.logger.info('✓ Selenium WebDriver initialized successfully')
+            self.driver = browser.start_chrome_for(self, performance_log=self.mode == 'capture')
+            self.waits = PageWaiter(self.driver, 'sflix', self.logger)
+            self.logger.info('✓ Selenium WebDriver initialized successfully')
         except Exception as e:
-            spider.logger.error(f'Failed to initialize Selenium: {e}')
+            self.logger.error(f'Failed to initialize Selenium: {e}')
             raise
-        
-        # Connect spider close signal to cleanup driver
-        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
-        return spider
 
     def spider_closed(self, spider):
         """
         Close the Selenium WebDriver when the spider closes.
         This method is connected to the `signals.spider_closed` signal.
         """
+        if hasattr(self, 'waits'):
+            self.waits.log_report()
         if hasattr(self, 'driver'):
             self.driver.quit()
             self.logger.info('Selenium WebDriver closed')
 
 
+    def _capture_endpoints(self, movie_url):
+        """Learn the server/source endpoints from the XHR calls this page made (capture mode)."""
+        server_ids = [el.get_attribute('data-id') for el in self.driver.find_elements(By.CSS_SELECTOR, 'a[data-id]')]
+        learned = ajax_replay.learn_endpoints(
+            ajax_replay.capture_xhr(self.driver), ajax_replay.content_id(movie_url), server_ids
+        )
+        if learned:
+            ajax_replay.save_endpoints('sflix', learned)
+            self.endpoints.update(learned)
+            self.endpoints_captured = True
+            self.logger.info(f'🎯 Captured endpoints: {learned}')
+
     def parse(self, response):
         """Parse the main page to extract movie links."""
         self.logger.info(f'🔍 Parsing main page: {response.url}')
         
         try:
-            self.driver.get(response.url)
-            self.logger.info('⏳ Waiting for page to load...')
-            time.sleep(8)  # Increased wait time for JavaScript to load
-            
-            # Scroll down to trigger lazy loading
-            self.logger.info('📜 Scrolling page to load more content...')
-            for i in range(3):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-            
-            # Scroll back to top
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(2)
-            
-            html = self.driver.page_source
-            sel = HtmlResponse(url=response.url, body=html, encoding="utf-8")
+            # The home page is server-rendered; only render it when the plain response has no titles
+            sel = response
+            html = response.text
+            if self.mode != 'replay' or not response.css('.flw-item, a[href*="/movie/"]'):
+                driver = self._browser()
+                driver.get(response.url)
+                self.logger.info('⏳ Waiting for page to load...')
+                self.waits.ready('listing')
+                
+                # Scroll down to trigger lazy loading
+                self.logger.info('📜 Scrolling page to load more content...')
+                for i in range(3):
+                    if not self.waits.scroll_to_bottom(item_selector='.flw-item'):
+                        break
+                
+                # Scroll back to top
+                driver.execute_script("window.scrollTo(0, 0);")
+                
+                html = driver.page_source
+                sel = HtmlResponse(url=response.url, body=html, encoding="utf-8")
             
             # Try multiple selectors to find movie links
             links = []
@@ -144,92 +162,185 @@ class SflixSpider(scrapy.Spider):
         except Exception as e:
             self.logger.error(f'❌ Error in parse: {e}', exc_info=True)
 
+    def _movie_item(self, sel, url):
+        """MovieItem with title, year, poster and synopsis from a movie page."""
+        item = MovieItem()
+        item["source_site"] = "sflix"
+        item["source_url"] = url
+        item["imdb_id"] = "sflix_" + url.split("/")[-1]
+
+        # Extract title and clean it
+        title = sel.css("h1::text, h2.heading-name::text, .title::text, title::text").get()
+        if title:
+            title = title.strip()
+            # Remove "Watch ... full HD on SFlix Free" wrapper
+            if "Watch" in title and "full HD on SFlix Free" in title:
+                # Extract the actual movie name and year
+                match = re.search(r'Watch (.+?) (\d{4}) full HD', title)
+                if match:
+                    title = match.group(1).strip()
+                    year = match.group(2)
+                else:
+                    # Fallback: just remove the wrapper text
+                    title = title.replace("Watch ", "").replace(" full HD on SFlix Free", "").strip()
+                    year = None
+            else:
+                year = None
+        else:
+            title = "Unknown"
+            year = None
+        
+        item["title"] = title
+        item["year"] = year
+        
+        self.logger.info(f'📝 Title: {item["title"]} ({year})')
+        
+        # Extract poster URL
+        poster_selectors = [
+            ".film-poster img::attr(src)",
+            ".detail_page-watch img::attr(src)",
+            "img.film-poster-img::attr(src)",
+            "meta[property='og:image']::attr(content)",
+            ".dp-i-c-poster img::attr(src)",
+        ]
+        
+        poster_url = None
+        for selector in poster_selectors:
+            poster_url = sel.css(selector).get()
+            if poster_url:
+                self.logger.info(f'✓ Found poster with selector: {selector}')
+                break
+        
+        if poster_url:
+            item["poster_url"] = sel.urljoin(poster_url)
+            self.logger.info(f'🖼️ Poster URL: {item["poster_url"][:60]}...')
+        else:
+            item["poster_url"] = ""
+            self.logger.warning(f'⚠️ No poster found for: {item["title"]}')
+        
+        # Extract synopsis
+        synopsis_selectors = [
+            ".description::text",
+            ".film-description::text",
+            "meta[property='og:description']::attr(content)",
+            ".dp-i-content .description::text",
+        ]
+        
+        synopsis = None
+        for selector in synopsis_selectors:
+            synopsis = sel.css(selector).get()
+            if synopsis:
+                break
+        
+        item["synopsis"] = synopsis.strip() if synopsis else ""
+        return item
+
+    @staticmethod
+    def _server_name(url):
+        """Detect the server from an embed URL."""
+        low = url.lower()
+        if "upcloud" in low:
+            return "UpCloud"
+        elif "megacloud" in low:
+            return "MegaCloud"
+        elif "vidcloud" in low:
+            return "VidCloud"
+        elif "akcloud" in low:
+            return "AkCloud"
+        elif "vidsrc" in low:
+            return "VidSrc"
+        return "Unknown"
+
     def parse_movie(self, response):
-        """Parse individual movie page to extract streaming information."""
+        """Parse a movie page: replay the server/source AJAX calls, or render it in Chrome."""
+        movie_id = ajax_replay.content_id(response.url)
+        if self.mode != 'replay' or not movie_id or '/movie/' not in response.url or 'servers' not in self.endpoints:
+            # TV pages list seasons first, those stay on the browser path
+            yield from self.parse_movie_browser(response)
+            return
+        
+        self.logger.info(f'🎬 Parsing movie page via AJAX: {response.url}')
+        item = self._movie_item(response, response.url)
+        yield scrapy.Request(
+            ajax_replay.endpoint_url(response.url, self.endpoints['servers'], movie_id),
+            headers=ajax_replay.ajax_headers(response.url),
+            callback=self.parse_servers,
+            errback=self.replay_failed,
+            meta={"item": item, "movie_url": response.url},
+            dont_filter=True,
+        )
+
+    def parse_servers(self, response):
+        """Server list from the AJAX endpoint; fetch the sources of the first one."""
+        servers = ajax_replay.parse_servers(response)
+        if not servers or 'sources' not in self.endpoints:
+            self.logger.warning(f'⚠️ No servers from AJAX for {response.meta["movie_url"]}, falling back to browser')
+            yield self._browser_request(response.meta["movie_url"])
+            return
+        yield self._sources_request(response.meta, servers)
+
+    def _sources_request(self, meta, servers):
+        return scrapy.Request(
+            ajax_replay.endpoint_url(meta["movie_url"], self.endpoints['sources'], servers[0][1]),
+            headers=ajax_replay.ajax_headers(meta["movie_url"]),
+            callback=self.parse_sources,
+            errback=self.replay_failed,
+            meta={"item": meta["item"], "movie_url": meta["movie_url"], "servers": servers},
+            dont_filter=True,
+        )
+
+    def parse_sources(self, response):
+        """Embed link of one server; the first server that has one wins."""
+        item = response.meta["item"]
+        servers = response.meta["servers"]
+        iframe = ajax_replay.parse_source_link(response)
+        if not iframe:
+            if len(servers) > 1:
+                yield self._sources_request(response.meta, servers[1:])
+            else:
+                self.logger.warning(f'⚠️ No iframe found for: {item["title"]} ({response.meta["movie_url"]})')
+            return
+        
+        server = self._server_name(iframe)
+        item["stream_url"] = iframe
+        item["server_name"] = server if server != "Unknown" else servers[0][0]
+        item["quality"] = "HD"
+        item["language"] = "EN"
+        
+        self.logger.info(f'✅ Scraped via AJAX: {item["title"]} | Server: {item["server_name"]}')
+        yield item
+
+    def replay_failed(self, failure):
+        """AJAX endpoint errored (blocked, moved, 5xx): render the page instead."""
+        self.logger.warning(f'⚠️ AJAX replay failed ({failure.value!r}), falling back to browser')
+        yield self._browser_request(failure.request.meta["movie_url"])
+
+    def _browser_request(self, movie_url):
+        return scrapy.Request(movie_url, callback=self.parse_movie_browser, dont_filter=True)
+
+    def parse_movie_browser(self, response):
+        """Parse individual movie page in Chrome to extract streaming information."""
         self.logger.info(f'🎬 Parsing movie page: {response.url}')
         
         try:
-            self.driver.get(response.url)
+            driver = self._browser()
+            if self.mode == 'capture':
+                ajax_replay.capture_xhr(driver)  # drain log entries from earlier pages
+            driver.get(response.url)
             self.logger.info('⏳ Waiting for movie page to load...')
-            time.sleep(8)
+            self.waits.ready('detail')
             
             # Scroll to trigger any lazy-loaded iframes
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(2)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+            self.waits.settle(label='detail:scroll')
+
+            if self.mode == 'capture' and not self.endpoints_captured:
+                self._capture_endpoints(response.url)
 
-            html = self.driver.page_source
+            html = driver.page_source
             sel = HtmlResponse(url=response.url, body=html, encoding="utf-8")
 
-            item = MovieItem()
-            item["source_site"] = "sflix"
-            item["source_url"] = response.url
-            item["imdb_id"] = "sflix_" + response.url.split("/")[-1]
-
-            # Extract title and clean it
-            title = sel.css("h1::text, h2.heading-name::text, .title::text, title::text").get()
-            if title:
-                title = title.strip()
-                # Remove "Watch ... full HD on SFlix Free" wrapper
-                if "Watch" in title and "full HD on SFlix Free" in title:
-                    # Extract the actual movie name and year
-                    import re
-                    match = re.search(r'Watch (.+?) (\d{4}) full HD', title)
-                    if match:
-                        title = match.group(1).strip()
-                        year = match.group(2)
-                    else:
-                        # Fallback: just remove the wrapper text
-                        title = title.replace("Watch ", "").replace(" full HD on SFlix Free", "").strip()
-                        year = None
-                else:
-                    year = None
-            else:
-                title = "Unknown"
-                year = None
-            
-            item["title"] = title
-            item["year"] = year
-            
-            self.logger.info(f'📝 Title: {item["title"]} ({year})')
-            
-            # Extract poster URL
-            poster_selectors = [
-                ".film-poster img::attr(src)",
-                ".detail_page-watch img::attr(src)",
-                "img.film-poster-img::attr(src)",
-                "meta[property='og:image']::attr(content)",
-                ".dp-i-c-poster img::attr(src)",
-            ]
-            
-            poster_url = None
-            for selector in poster_selectors:
-                poster_url = sel.css(selector).get()
-                if poster_url:
-                    self.logger.info(f'✓ Found poster with selector: {selector}')
-                    break
-            
-            if poster_url:
-                item["poster_url"] = response.urljoin(poster_url)
-                self.logger.info(f'🖼️ Poster URL: {item["poster_url"][:60]}...')
-            else:
-                item["poster_url"] = ""
-                self.logger.warning(f'⚠️ No poster found for: {item["title"]}')
-            
-            # Extract synopsis
-            synopsis_selectors = [
-                ".description::text",
-                ".film-description::text",
-                "meta[property='og:description']::attr(content)",
-                ".dp-i-content .description::text",
-            ]
-            
-            synopsis = None
-            for selector in synopsis_selectors:
-                synopsis = sel.css(selector).get()
-                if synopsis:
-                    break
-            
-            item["synopsis"] = synopsis.strip() if synopsis else ""
+            item = self._movie_item(sel, response.url)
 
             # Try multiple selectors for iframe, but filter out tracking iframes
             iframe_selectors = [
@@ -289,18 +400,7 @@ class SflixSpider(scrapy.Spider):
             self.logger.info(f'🔗 Iframe URL: {iframe}')
 
             # Detect server type
-            server = "Unknown"
-            low = iframe.lower()
-            if "upcloud" in low:
-                server = "UpCloud"
-            elif "megacloud" in low:
-                server = "MegaCloud"
-            elif "vidcloud" in low:
-                server = "VidCloud"
-            elif "akcloud" in low:
-                server = "AkCloud"
-            elif "vidsrc" in low:
-                server = "VidSrc"
+            server = self._server_name(iframe)
 
             item["stream_url"] = iframe
             item["server_name"] = server
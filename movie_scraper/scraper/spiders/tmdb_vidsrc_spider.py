@@ -9,15 +9,20 @@ from scrapy import signals
 import json
 import os
 import django
+from scrapy.exceptions import CloseSpider
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_scrape.settings')
 django.setup()
 
+from scraper.checkpoint import Checkpoint
+from scraper.crawlstate import ShardedSpiderMixin
 from scraper.items import MovieItem
+from scraper.tmdb_discovery import TmdbDiscoveryMixin
+from streaming import availability
 from streaming.models import Movie
 
 
-class TmdbVidsrcSpider(scrapy.Spider):
+class TmdbVidsrcSpider(TmdbDiscoveryMixin, ShardedSpiderMixin, scrapy.Spider):
     name = 'tmdb_vidsrc'
     
     custom_settings = {
@@ -27,7 +32,8 @@ class TmdbVidsrcSpider(scrapy.Spider):
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
     
-    def __init__(self, api_key=None, limit=100, max_pages=5, *args, **kwargs):
+    def __init__(self, api_key=None, limit=100, max_pages=5, shard=0, shards=1, run_id=None,
+                 refresh_older_than=7, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
         if not api_key:
@@ -38,6 +44,19 @@ class TmdbVidsrcSpider(scrapy.Spider):
         self.max_pages = int(max_pages)
         self.count = 0
         self.existing_imdb_ids = set()
+
+        # Sharded runs (run_improved_scraper --shards): this process crawls
+        # only the years it owns; dedupe and limit are shared via crawlstate
+        self.shard = int(shard)
+        self.shards = max(1, int(shards))
+        self.run_id = run_id
+
+        # Titles whose TMDB details were fetched less than this many days ago
+        # are skipped before the detail request (0 re-fetches everything)
+        self.refresh_older_than = float(refresh_older_than)
+        self.fresh_tmdb_ids = {'movie': set(), 'tv': set()}
+        self.pending_mappings = []
+        self.known_verdicts = {}
         
         # Statistics
         self.stats = {
@@ -45,19 +64,28 @@ class TmdbVidsrcSpider(scrapy.Spider):
             'successful': 0,
             'skipped_no_imdb': 0,
             'skipped_existing': 0,
+            'skipped_fresh': 0,
+            'skipped_unavailable': 0,
+            'cached_verdicts': 0,
             'errors': 0
         }
         
         self._load_existing_movies()
+        self._load_fresh_tmdb_ids()
     
     @classmethod
     def from_crawler(cls, crawler, *args, **kwargs):
         spider = super().from_crawler(crawler, *args, **kwargs)
         crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        spider.open_crawl_state(crawler)
+        spider.checkpoint = Checkpoint.for_spider(spider)
         return spider
     
-    def spider_closed(self, spider):
+    def spider_closed(self, spider, reason='finished'):
         """Show final statistics"""
+        self.close_crawl_state(reason)
+        self._flush_mappings()
+        self._save_checkpoint(force=True, finished=reason not in ('shutdown', 'cancelled'))
         self.logger.info('\n' + '='*70)
         self.logger.info('🎬 TMDB-VIDSRC SPIDER SUMMARY')
         self.logger.info('='*70)
@@ -65,6 +93,9 @@ class TmdbVidsrcSpider(scrapy.Spider):
         self.logger.info(f'✓ Successful:         {self.stats["successful"]}')
         self.logger.info(f'⊘ No IMDb ID:         {self.stats["skipped_no_imdb"]}')
         self.logger.info(f'⊘ Already Exists:     {self.stats["skipped_existing"]}')
+        self.logger.info(f'⊘ Fetched Recently:   {self.stats["skipped_fresh"]}')
+        self.logger.info(f'⊘ Unavailable:        {self.stats["skipped_unavailable"]}')
+        self.logger.info(f'⚡ Cached Verdicts:    {self.stats["cached_verdicts"]}')
         if self.stats['errors'] > 0:
             self.logger.info(f'❌ Errors:            {self.stats["errors"]}')
         self.logger.info('='*70 + '\n')
@@ -87,7 +118,7 @@ class TmdbVidsrcSpider(scrapy.Spider):
         current_year = datetime.datetime.now().year
         # Create a list of years and shuffle it for randomness
         import random
-        years = list(range(2000, current_year + 1))
+        years = [year for year in range(2000, current_year + 1) if self.owns(year)]
         random.shuffle(years)
         
         discovery_pool = []
@@ -125,12 +156,18 @@ class TmdbVidsrcSpider(scrapy.Spider):
         # Shuffle the entire pool! 
         # Now every request will likely be a different year and different type
         random.shuffle(discovery_pool)
+
+        # Resumed run: same shuffled pool, continue after the last request sent
+        discovery_pool, position = self._start_pool(discovery_pool)
+
+        self.logger.info(f'🎲 Hyper-Discovery Mode: Interleaving {len(discovery_pool)} requests across {len(years)} years')
         
-        self.logger.info(f'🎲 Hyper-Discovery Mode: Interleaving {len(discovery_pool)} requests across all years')
-        
-        for task in discovery_pool:
-            if self.count >= self.limit:
+        for index in range(position, len(discovery_pool)):
+            task = discovery_pool[index]
+            if self.limit_reached():
                 break
+            self.pool_position = index + 1
+            self._save_checkpoint()
                 
             if task['type'] == 'tv':
                 url = (
@@ -158,6 +195,8 @@ class TmdbVidsrcSpider(scrapy.Spider):
         page = response.meta.get('page')
         year = response.meta.get('year')
         try:
+            self.tasks_done += 1
+            self.report_progress()
             data = json.loads(response.text)
             movies = data.get('results', [])
             
@@ -165,11 +204,20 @@ class TmdbVidsrcSpider(scrapy.Spider):
             
             self.logger.info(f'📅 Movie {year} | Page {page}: Found {len(movies)} items')
             
+            known = self._known_verdicts('movie', [movie.get('id') for movie in movies])
             for movie in movies:
-                if self.count >= self.limit * 2: return # Total session limit safety
+                if self.limit_reached(self.limit * 2): return # Total session limit safety
                 
                 movie_id = movie.get('id')
                 if not movie_id: continue
+                if movie_id in self.fresh_tmdb_ids['movie']:
+                    self.stats['skipped_fresh'] += 1
+                    continue
+                if known.get(movie_id) == availability.UNAVAILABLE:
+                    self.stats['skipped_unavailable'] += 1
+                    continue
+                if not self.claim(f'movie:{movie_id}'): continue # Another shard has it
+                self.stats['attempted'] += 1
                 
                 detail_url = f'https://api.themoviedb.org/3/movie/{movie_id}?api_key={self.api_key}&append_to_response=external_ids,credits,keywords'
                 yield scrapy.Request(detail_url, callback=self.parse_movie_detail, meta={'tmdb_id': movie_id})
@@ -181,6 +229,8 @@ class TmdbVidsrcSpider(scrapy.Spider):
         page = response.meta.get('page')
         year = response.meta.get('year')
         try:
+            self.tasks_done += 1
+            self.report_progress()
             data = json.loads(response.text)
             shows = data.get('results', [])
             
@@ -188,11 +238,20 @@ class TmdbVidsrcSpider(scrapy.Spider):
             
             self.logger.info(f'📅 TV {year} | Page {page}: Found {len(shows)} items')
             
+            known = self._known_verdicts('tv', [show.get('id') for show in shows])
             for show in shows:
-                if self.count >= self.limit * 2: return # Total session limit safety
+                if self.limit_reached(self.limit * 2): return # Total session limit safety
                 
                 show_id = show.get('id')
                 if not show_id: continue
+                if show_id in self.fresh_tmdb_ids['tv']:
+                    self.stats['skipped_fresh'] += 1
+                    continue
+                if known.get(show_id) == availability.UNAVAILABLE:
+                    self.stats['skipped_unavailable'] += 1
+                    continue
+                if not self.claim(f'tv:{show_id}'): continue # Another shard has it
+                self.stats['attempted'] += 1
                 
                 detail_url = f'https://api.themoviedb.org/3/tv/{show_id}?api_key={self.api_key}&append_to_response=external_ids,credits,keywords'
                 yield scrapy.Request(detail_url, callback=self.parse_tv_detail, meta={'tmdb_id': show_id})
@@ -273,68 +332,21 @@ class TmdbVidsrcSpider(scrapy.Spider):
             # Instead of yielding immediately, we validate the link first
             self.logger.info(f'🔍 Validating link for [MOVIE] {item["title"]} ({year})...')
             
-            yield scrapy.Request(
-                vidsrc_to_url,
-                callback=self.validate_movie_link,
-                meta={
-                    'item': item,
-                    'vidsrc_to_url': vidsrc_to_url,
-                    'vidsrc_me_url': vidsrc_me_url,
-                    'is_series': False,
-                    'year': year,
-                    'status': status
-                },
-                priority=10
-            )
+            yield from self._validate({
+                'item': item,
+                'tmdb_id': data.get('id') or response.meta.get('tmdb_id'),
+                'vidsrc_to_url': vidsrc_to_url,
+                'vidsrc_me_url': vidsrc_me_url,
+                'is_series': False,
+                'year': year,
+                'status': status
+            })
 
+        except CloseSpider:
+            raise
         except Exception as e:
             self.logger.error(f'❌ Error processing movie: {e}')
 
-    def validate_movie_link(self, response):
-        """Check if the provider actually has the movie content"""
-        item = response.meta['item']
-        vidsrc_to_url = response.meta['vidsrc_to_url']
-        vidsrc_me_url = response.meta['vidsrc_me_url']
-        year = response.meta['year']
-        status = response.meta['status']
-        
-        html_content = response.text.lower()
-        
-        # Markers that indicate the media is unavailable
-        unavailable_markers = [
-            "media is unavailable",
-            "this video is not available",
-            "video not found",
-            "no link found",
-            "at the moment",
-            "unavailable"
-        ]
-        
-        if any(marker in html_content for marker in unavailable_markers) or response.status != 200:
-            type_label = "[SERIES]" if response.meta.get('is_series') else "[MOVIE]"
-            self.logger.warning(f'⏭️ Skipping {type_label} {item["title"]} ({year}) - Media unavailable on provider')
-            return
-
-        # If we reached here, the link is likely valid
-        self.count += 1
-        self.stats['successful'] += 1
-        type_label = "[SERIES]" if response.meta.get('is_series') else "[MOVIE]"
-        log_icon = '📅' if status == 'Upcoming' else '✓'
-        self.logger.info(f'{log_icon} {type_label} {item["title"]} ({year}) - Link Validated!')
-
-        # Yield link 1: VidSrc To
-        item_to = item.copy()
-        item_to['stream_url'] = vidsrc_to_url
-        item_to['server_name'] = 'VidSrc To'
-        yield item_to
-
-        # Yield link 2: VidSrc Me
-        item_me = item.copy()
-        item_me['stream_url'] = vidsrc_me_url
-        item_me['server_name'] = 'VidSrc Me'
-        yield item_me
-
-
     def parse_tv_detail(self, response):
         """Parse individual TV show details"""
         try:
@@ -427,19 +439,17 @@ class TmdbVidsrcSpider(scrapy.Spider):
             # Instead of yielding immediately, we validate the link first
             self.logger.info(f'🔍 Validating link for [SERIES] {item["title"]} ({year})...')
             
-            yield scrapy.Request(
-                vidsrc_to_url,
-                callback=self.validate_movie_link, # Reusing validation method
-                meta={
-                    'item': item,
-                    'vidsrc_to_url': vidsrc_to_url,
-                    'vidsrc_me_url': vidsrc_me_url,
-                    'is_series': True,
-                    'year': year,
-                    'status': status
-                },
-                priority=10
-            )
+            yield from self._validate({
+                'item': item,
+                'tmdb_id': data.get('id') or response.meta.get('tmdb_id'),
+                'vidsrc_to_url': vidsrc_to_url,
+                'vidsrc_me_url': vidsrc_me_url,
+                'is_series': True,
+                'year': year,
+                'status': status
+            })
 
+        except CloseSpider:
+            raise
         except Exception as e:
             self.logger.error(f'❌ Error processing TV show: {e}')
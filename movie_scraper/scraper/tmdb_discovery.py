@@ -0,0 +1,180 @@
+# scraper/tmdb_discovery.py
+"""
+The part of the TMDB discovery spiders (tmdb_vidsrc, tmdb_vidsrc_v2) that
+does not depend on what they discover:
+
+  freshness    TMDB ids whose details were fetched within
+               refresh_older_than days are skipped (TmdbMapping)
+  validation   a title's VidSrc embed is checked once per verdict TTL
+               (streaming/availability.py); cached verdicts skip the check,
+               and for titles already in TmdbMapping the detail request too
+  resume       the shuffled discovery pool and the position in it are kept
+               in the checkpoint (scraper/checkpoint.py)
+
+A title is recorded in TmdbMapping only once its link was accepted, so a
+title that fails validation is fetched again on the next run instead of
+counting as fresh for the whole refresh window.
+
+Imports Django models; spiders import it after django.setup().
+"""
+from datetime import timedelta
+
+import scrapy
+from django.utils import timezone
+from scrapy.exceptions import CloseSpider
+
+from streaming import availability
+from streaming.models import TmdbMapping
+
+MAPPING_BATCH = 50
+
+
+class TmdbDiscoveryMixin:
+    """
+    Detail, validation and resume helpers for the TMDB spiders. The spider
+    sets api_key, limit, count, stats, refresh_older_than, fresh_tmdb_ids
+    ({media_type: set()} per type it discovers), pending_mappings and
+    known_verdicts in __init__ and self.checkpoint in from_crawler;
+    take_item() comes from ShardedSpiderMixin.
+    """
+
+    def _load_fresh_tmdb_ids(self):
+        """TMDB ids refreshed within refresh_older_than days, per media type"""
+        if self.refresh_older_than <= 0:
+            return
+        since = timezone.now() - timedelta(days=self.refresh_older_than)
+        try:
+            for media_type in self.fresh_tmdb_ids:
+                self.fresh_tmdb_ids[media_type] = TmdbMapping.fresh_ids(media_type, since)
+            total = sum(len(ids) for ids in self.fresh_tmdb_ids.values())
+            self.logger.info(f'📚 {total} TMDB titles refreshed in the last {self.refresh_older_than:g} days will be skipped')
+        except Exception as e:
+            self.logger.warning(f'⚠️  Could not load TMDB mappings: {e}')
+
+    def _record_mapping(self, tmdb_id, media_type, imdb_id):
+        """Remember that tmdb_id was fetched now; written in batches"""
+        if not tmdb_id:
+            return
+        self.pending_mappings.append((tmdb_id, media_type, imdb_id))
+        if len(self.pending_mappings) >= MAPPING_BATCH:
+            self._flush_mappings()
+
+    def _flush_mappings(self):
+        if not self.pending_mappings:
+            return
+        rows, self.pending_mappings = self.pending_mappings, []
+        try:
+            TmdbMapping.record(rows, timezone.now())
+        except Exception as e:
+            self.logger.warning(f'⚠️  Could not save {len(rows)} TMDB mappings: {e}')
+
+    def _save_checkpoint(self, force=False, finished=False):
+        """Discovery pool and position for run_improved_scraper --resume (requests in flight are in JOBDIR)"""
+        self.checkpoint.save({
+            'pool': getattr(self, 'discovery_pool', []),
+            'position': getattr(self, 'pool_position', 0),
+            'count': self.count,
+            'stats': self.stats,
+        }, force=force, finished=finished)
+
+    def _start_pool(self, discovery_pool):
+        """
+        (pool, position) to crawl: discovery_pool from the start, or the saved
+        pool and position of an interrupted run.
+        """
+        saved = self.checkpoint.load()
+        position = 0
+        if saved.get('pool'):
+            discovery_pool = saved['pool']
+            position = saved.get('position', 0)
+            self.count = saved.get('count', 0)
+            self.stats.update(saved.get('stats', {}))
+            self.logger.info(f'♻️  Resuming discovery at request {position}/{len(discovery_pool)}')
+
+        self.tasks_total = len(discovery_pool)
+        self.tasks_done = position
+        self.discovery_pool = discovery_pool
+        self.pool_position = position
+        self.report_progress(status='running', force=True)
+        return discovery_pool, position
+
+    def _validate(self, meta):
+        """Validation request for a title, or its verdict straight from the availability cache"""
+        item = meta['item']
+        verdict = self.known_verdicts.pop(item['imdb_id'], None) or availability.get_verdict(item['imdb_id'], item['content_type'])
+        if verdict == availability.AVAILABLE:
+            self.stats['cached_verdicts'] += 1
+            yield from self._accept(meta)
+        elif verdict == availability.UNAVAILABLE:
+            self.stats['cached_verdicts'] += 1
+            self._skip_unavailable(meta)
+        else:
+            yield scrapy.Request(
+                meta['vidsrc_to_url'],
+                callback=self.validate_movie_link,
+                headers=availability.check_headers(),
+                meta={**meta, 'handle_httpstatus_list': availability.CHECK_STATUSES},
+                priority=10 # Higher priority for validation requests
+            )
+
+    def _known_verdicts(self, media_type, tmdb_ids):
+        """Cached verdicts of the discovered titles we already know the IMDb id of, one lookup per page"""
+        content_type = 'series' if media_type == 'tv' else 'movie'
+        try:
+            imdb_ids = TmdbMapping.imdb_ids(media_type, [tmdb_id for tmdb_id in tmdb_ids if tmdb_id])
+            verdicts = availability.get_verdicts((imdb_id, content_type) for imdb_id in imdb_ids.values())
+        except Exception as e:
+            self.logger.warning(f'⚠️  Could not look up cached verdicts: {e}')
+            return {}
+        known = {}
+        for tmdb_id, imdb_id in imdb_ids.items():
+            verdict = verdicts.get((imdb_id, content_type))
+            if verdict:
+                known[tmdb_id] = verdict
+                self.known_verdicts[imdb_id] = verdict
+        return known
+
+    def validate_movie_link(self, response):
+        """Check if the provider actually has the movie content"""
+        item = response.meta['item']
+        # Ranged GET: the unavailable markers are in the first KBs of the page
+        unavailable = availability.page_unavailable(response.status, response.text)
+        availability.record_verdict(item['imdb_id'], item['content_type'], not unavailable)
+        if unavailable:
+            self._skip_unavailable(response.meta)
+            return
+        yield from self._accept(response.meta)
+
+    def _skip_unavailable(self, meta):
+        type_label = "[SERIES]" if meta.get('is_series') else "[MOVIE]"
+        self.stats['skipped_unavailable'] += 1
+        self.logger.warning(f'⏭️ Skipping {type_label} {meta["item"]["title"]} ({meta["year"]}) - Media unavailable on provider')
+
+    def _accept(self, meta):
+        """Count a validated title, record its mapping and yield its two VidSrc links"""
+        item = meta['item']
+        vidsrc_to_url = meta['vidsrc_to_url']
+        vidsrc_me_url = meta['vidsrc_me_url']
+        year = meta['year']
+        status = meta['status']
+
+        if not self.take_item():
+            raise CloseSpider('run limit reached')
+        self.count += 1
+        self.stats['successful'] += 1
+        self._record_mapping(meta.get('tmdb_id'), 'tv' if meta.get('is_series') else 'movie', item['imdb_id'])
+        type_label = "[SERIES]" if meta.get('is_series') else "[MOVIE]"
+        log_icon = '📅' if status == 'Upcoming' else '✓'
+        self.logger.info(f'{log_icon} {type_label} {item["title"]} ({year}) - Link Validated!')
+
+        # Yield link 1: VidSrc To
+        item_to = item.copy()
+        item_to['stream_url'] = vidsrc_to_url
+        item_to['server_name'] = 'VidSrc To'
+        yield item_to
+
+        # Yield link 2: VidSrc Me
+        item_me = item.copy()
+        item_me['stream_url'] = vidsrc_me_url
+        item_me['server_name'] = 'VidSrc Me'
+        yield item_me
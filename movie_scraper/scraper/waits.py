@@ -0,0 +1,317 @@
+# scraper/waits.py
+"""
+Event-driven page waits for the Selenium spiders.
+
+The spiders used to sleep a fixed 2-8 seconds after every navigation,
+scroll and click. PageWaiter replaces those sleeps with WebDriverWait
+conditions that return as soon as the page is actually ready:
+
+  ready(page)        the profile's selector for that page is present and
+                     the page has settled
+  settle()           no DOM insertions for quiet_ms, no XHR/fetch in
+                     flight and no resource finished in the last idle_ms
+  scroll_to_bottom() scroll, then wait for the page (or an item count) to
+                     grow; returns False when nothing more loads
+  left(url)          the browser navigated away from url (JS redirects)
+  until(fn, label)   any other condition, timed like the rest
+
+AnchorStream collects links of infinite-scroll listings incrementally with
+its own MutationObserver, see its docstring.
+
+A MutationObserver and an XHR/fetch in-flight counter are injected into
+every document through CDP (Page.addScriptToEvaluateOnNewDocument), so they
+see requests fired before the first wait. Drivers without CDP get them
+injected lazily by the first check on each page.
+
+Every wait is timed per label; report() summarizes count, average, max
+and timeouts for the spider's closing log, plus bytes, requests and load
+time of the pages passed to ready() (see scraper/browser.py). A timed-out wait logs and
+returns a falsy value instead of raising, just like a sleep that was too
+short used to.
+"""
+import logging
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraper.browser import page_metrics
+
+DEFAULT_PROFILE = {
+    'timeout': 15,           # seconds to wait for a page's ready selector
+    'settle_timeout': 5,     # cap for quiet/idle, ad-heavy pages never go fully quiet
+    'scroll_timeout': 4,     # how long a scroll may take to load more content
+    'redirect_timeout': 10,
+    'quiet_ms': 500,         # no DOM insertions for this long
+    'idle_ms': 500,          # no network activity for this long
+    'poll': 0.1,
+    'selectors': {},         # page name -> CSS selector that marks it as loaded
+}
+
+SITE_PROFILES = {
+    'sflix': {
+        'quiet_ms': 600,
+        'selectors': {
+            'listing': '.flw-item, .film_list-wrap, a[href*="/movie/"]',
+            'detail': 'h2.heading-name, .detail_page-watch, iframe',
+        },
+    },
+    '1flix': {
+        'quiet_ms': 400,
+        'idle_ms': 400,
+        'selectors': {
+            'listing': 'a[href^="/movie/watch-"]',
+            'detail': 'a[data-id].link-item',
+        },
+    },
+    'goojara': {
+        'scroll_timeout': 3,
+        'selectors': {
+            'listing': 'a[href^="/m"], a[href*="goojara.to/m"]',
+            'detail': 'h1',
+        },
+    },
+}
+
+# Installed once per document: last DOM insertion time and open XHR/fetch count
+INSTRUMENT_JS = """
+(function () {
+    if (window.__waits) { return; }
+    var state = window.__waits = {lastMutation: performance.now(), inflight: 0};
+    try { performance.setResourceTimingBufferSize(10000); } catch (e) {}
+    new MutationObserver(function () { state.lastMutation = performance.now(); })
+        .observe(document, {childList: true, subtree: true});
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.inflight++;
+        this.addEventListener('loadend', function () { state.inflight--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            state.inflight++;
+            return fetch.apply(this, arguments).finally(function () { state.inflight--; });
+        };
+    }
+})();
+"""
+
+SETTLED_JS = INSTRUMENT_JS + """
+var quietMs = arguments[0], idleMs = arguments[1], state = window.__waits;
+var now = performance.now(), lastResponse = 0;
+var entries = performance.getEntriesByType('resource');
+for (var i = 0; i < entries.length; i++) {
+    lastResponse = Math.max(lastResponse, entries[i].responseEnd);
+}
+return document.readyState === 'complete'
+    && state.inflight <= 0
+    && now - state.lastMutation >= quietMs
+    && now - lastResponse >= idleMs;
+"""
+
+# Streams anchors added to the page: seeded once with the anchors already
+# there, then a MutationObserver queues only hrefs of newly inserted nodes
+ANCHOR_STREAM_JS = """
+var pattern = new RegExp(arguments[0]);
+if (window.__anchors) { window.__anchors.observer.disconnect(); }
+var state = window.__anchors = {queue: [], seen: {}, total: 0};
+function add(anchor) {
+    var href = anchor.getAttribute('href');
+    if (href && !state.seen[href] && pattern.test(href)) {
+        state.seen[href] = true;
+        state.queue.push(href);
+        state.total++;
+    }
+}
+function scan(node) {
+    if (node.nodeType !== 1) { return; }
+    if (node.tagName === 'A') { add(node); }
+    var nested = node.getElementsByTagName('a');
+    for (var i = 0; i < nested.length; i++) { add(nested[i]); }
+}
+scan(document.documentElement);
+state.observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var added = mutations[i].addedNodes;
+        for (var j = 0; j < added.length; j++) { scan(added[j]); }
+    }
+});
+state.observer.observe(document.documentElement, {childList: true, subtree: true});
+return state.total;
+"""
+
+ANCHOR_DRAIN_JS = """
+var state = window.__anchors;
+if (!state) { return null; }
+var batch = state.queue;
+state.queue = [];
+return batch;
+"""
+
+ANCHOR_TOTAL_JS = "return window.__anchors ? window.__anchors.total : -1;"
+
+PAGE_SIZE_JS = """
+var selector = arguments[0];
+return [document.body ? document.body.scrollHeight : 0,
+        selector ? document.querySelectorAll(selector).length : 0];
+"""
+
+
+class PageWaiter:
+    """Waits for one driver, tuned by a site profile, with per-label timings."""
+
+    def __init__(self, driver, site=None, logger=None, **overrides):
+        self.driver = driver
+        self.site = site or 'default'
+        self.logger = logger or logging.getLogger(__name__)
+        self.profile = {**DEFAULT_PROFILE, **SITE_PROFILES.get(site, {}), **overrides}
+        self.timings = defaultdict(list)
+        self.timeouts = defaultdict(int)
+        self.pages = defaultdict(list)
+        self._instrument_new_documents()
+
+    def _instrument_new_documents(self):
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': INSTRUMENT_JS})
+        except (AttributeError, WebDriverException):
+            self.logger.debug('CDP not available, page instrumentation will be injected per check')
+
+    def until(self, condition, label, timeout=None):
+        """Wait for condition(driver) to be truthy; returns its value, or None on timeout."""
+        timeout = self.profile['timeout'] if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            return WebDriverWait(
+                self.driver, timeout, poll_frequency=self.profile['poll'],
+                ignored_exceptions=(StaleElementReferenceException,),
+            ).until(condition)
+        except TimeoutException:
+            self.timeouts[label] += 1
+            self.logger.debug(f'⌛ Wait "{label}" timed out after {timeout}s on {self.site}')
+            return None
+        finally:
+            self.timings[label].append(time.monotonic() - started)
+
+    def _settled(self, driver):
+        try:
+            return driver.execute_script(SETTLED_JS, self.profile['quiet_ms'], self.profile['idle_ms'])
+        except WebDriverException:
+            return False
+
+    def settle(self, label='settle'):
+        """Wait until the DOM is quiet and the network idle (capped at settle_timeout)."""
+        return bool(self.until(self._settled, label, self.profile['settle_timeout']))
+
+    def present(self, selector, label=None, timeout=None):
+        """First element matching selector once present, or None."""
+        def find(driver):
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            return elements[0] if elements else False
+        return self.until(find, label or f'present:{selector}', timeout)
+
+    def ready(self, page):
+        """Wait for the profile's selector for page, then for the page to settle."""
+        selector = self.profile['selectors'].get(page)
+        found = True
+        if selector:
+            found = self.present(selector, label=f'{page}:selector') is not None
+        self.settle(label=f'{page}:settle')
+        metrics = page_metrics(self.driver)
+        if metrics:
+            self.pages[page].append(metrics)
+        return found
+
+    def scroll_to_bottom(self, item_selector=None, counter=None):
+        """
+        Scroll to the bottom and wait for more content (page height or number
+        of item_selector matches growing). Returns False when nothing loaded.
+        counter(driver) replaces the item_selector count with a cheaper one,
+        e.g. AnchorStream.total, so polling does not re-query the whole page.
+        """
+        height, items = self.driver.execute_script(PAGE_SIZE_JS, None if counter else item_selector)
+        if counter:
+            items = counter(self.driver)
+        self.driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+
+        def grew(driver):
+            new_height, new_items = driver.execute_script(PAGE_SIZE_JS, None if counter else item_selector)
+            if counter:
+                new_items = counter(driver)
+            return new_height > height or new_items > items
+
+        if not self.until(grew, 'scroll', self.profile['scroll_timeout']):
+            return False
+        self.settle(label='scroll:settle')
+        return True
+
+    def left(self, url, label='redirect'):
+        """Wait until the browser is no longer on url, then let the new page settle."""
+        moved = self.until(lambda driver: driver.current_url != url, label, self.profile['redirect_timeout'])
+        if moved:
+            self.settle(label=f'{label}:settle')
+        return bool(moved)
+
+    def report(self):
+        """One line per wait label: count, average, max and timeouts."""
+        lines = []
+        for label, durations in sorted(self.timings.items(), key=lambda kv: -sum(kv[1])):
+            lines.append(
+                f'{label:<24} {len(durations):>5} waits  avg {sum(durations) / len(durations):5.2f}s  '
+                f'max {max(durations):5.2f}s  total {sum(durations):7.1f}s  timeouts {self.timeouts[label]}'
+            )
+        for page, metrics in sorted(self.pages.items()):
+            count = len(metrics)
+            lines.append(
+                f'page {page:<19} {count:>5} loads  avg {sum(m["bytes"] for m in metrics) / count / 1024:8.1f} KB  '
+                f'{sum(m["requests"] for m in metrics) / count:6.1f} requests  '
+                f'{sum(m["load_ms"] for m in metrics) / count:7.0f} ms load'
+            )
+        return lines
+
+    def log_report(self, logger=None):
+        logger = logger or self.logger
+        if not self.timings:
+            return
+        logger.info(f'⏱️  Wait timings ({self.site}):')
+        for line in self.report():
+            logger.info(f'   {line}')
+
+
+class AnchorStream:
+    """
+    Incremental link extraction for infinite-scroll listings. start() seeds
+    the stream with the anchors already on the page; after that a
+    MutationObserver queues only the hrefs of inserted nodes, and drain()
+    hands over what arrived since the last call. Each scroll costs the new
+    items only, instead of re-reading page_source and re-parsing every link
+    loaded so far. pattern (a JavaScript regex) filters hrefs in the page,
+    so unrelated links never cross the driver connection.
+    """
+
+    def __init__(self, driver, pattern, logger=None):
+        self.driver = driver
+        self.pattern = pattern
+        self.logger = logger or logging.getLogger(__name__)
+
+    def start(self):
+        """(Re)start on the current document; returns the number of anchors already present."""
+        return self.driver.execute_script(ANCHOR_STREAM_JS, self.pattern)
+
+    def drain(self):
+        """hrefs added since the last drain. Restarts (returning all current anchors) after a navigation."""
+        batch = self.driver.execute_script(ANCHOR_DRAIN_JS)
+        if batch is None:
+            self.logger.debug('Anchor stream lost (page navigated), restarting')
+            self.start()
+            batch = self.driver.execute_script(ANCHOR_DRAIN_JS) or []
+        return batch
+
+    def total(self, driver=None):
+        """Anchors seen since start(), cheap enough to poll."""
+        try:
+            return (driver or self.driver).execute_script(ANCHOR_TOTAL_JS)
+        except WebDriverException:
+            return -1
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Movie, StreamingLink, WatchHistory, UserWatchlist, UserFavorite
+from .models import Movie, StreamingLink, WatchHistory, EpisodeProgress, UserWatchlist, UserFavorite
 
 
 @admin.register(Movie)
@@ -24,6 +24,11 @@ class WatchHistoryAdmin(admin.ModelAdmin):
     search_fields = ("user", "movie")
     list_filter = ("progress", "current_time", "season", "episode", "last_watched")
 
+@admin.register(EpisodeProgress)
+class EpisodeProgressAdmin(admin.ModelAdmin):
+    list_display = ("user", "movie", "last_season", "last_episode", "updated_at")
+    search_fields = ("user__email", "movie__title")
+
 @admin.register(UserWatchlist)
 class UserWatchlistAdmin(admin.ModelAdmin):
     list_display = ("user", "movie", "added_at")
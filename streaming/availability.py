@@ -0,0 +1,75 @@
+# streaming/availability.py
+"""
+Cached availability verdicts for provider embeds (VidSrc), per title.
+
+The TMDB spiders used to download the whole vidsrc.to embed page of every
+title on every run just to look for "unavailable" markers. Verdicts are now
+kept in the shared cache, keyed by content type and IMDb id:
+
+  available     kept for TTL (default 7 days)
+  unavailable   kept for NEGATIVE_TTL (default 1 day), titles get added
+                to providers all the time
+
+Only titles without a verdict (never checked, or expired) are validated
+again. Lookups for a whole discover page go out in one cache.get_many, and
+a check downloads only the first RANGE_BYTES of the embed page: the markers
+are in the error page itself, which is small, so a ranged GET decides as
+well as the full page does.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .embed import UNAVAILABLE_MARKERS
+
+AVAILABILITY_DEFAULTS = {
+    'TTL': 7 * 24 * 3600,
+    'NEGATIVE_TTL': 24 * 3600,
+    'RANGE_BYTES': 32 * 1024,
+}
+
+AVAILABLE = 'available'
+UNAVAILABLE = 'unavailable'
+
+# Statuses a check should hand to the callback instead of treating as errors
+CHECK_STATUSES = [403, 404, 410]
+
+
+def _config():
+    return {**AVAILABILITY_DEFAULTS, **getattr(settings, 'PROVIDER_AVAILABILITY', {})}
+
+
+def _key(imdb_id, content_type):
+    return f'availability:{content_type}:{imdb_id}'
+
+
+def get_verdict(imdb_id, content_type='movie'):
+    """AVAILABLE, UNAVAILABLE, or None when the title needs checking."""
+    return cache.get(_key(imdb_id, content_type))
+
+
+def get_verdicts(titles):
+    """{(imdb_id, content_type): verdict} for the titles that have a fresh verdict, in one cache call."""
+    keys = {_key(imdb_id, content_type): (imdb_id, content_type) for imdb_id, content_type in titles}
+    found = cache.get_many(list(keys))
+    return {keys[key]: verdict for key, verdict in found.items()}
+
+
+def record_verdict(imdb_id, content_type, available):
+    config = _config()
+    if available:
+        cache.set(_key(imdb_id, content_type), AVAILABLE, config['TTL'])
+    else:
+        cache.set(_key(imdb_id, content_type), UNAVAILABLE, config['NEGATIVE_TTL'])
+
+
+def check_headers():
+    """Headers for a check request: only the start of the page is needed."""
+    return {'Range': f'bytes=0-{_config()["RANGE_BYTES"] - 1}'}
+
+
+def page_unavailable(status_code, text):
+    """Whether a (possibly partial) embed page says the title is unavailable."""
+    if status_code not in (200, 206):
+        return True
+    text = text.lower()
+    return any(marker in text for marker in UNAVAILABLE_MARKERS)
@@ -0,0 +1,136 @@
+# streaming/embed.py
+"""
+Embed page fetching and sanitizing for the player proxy.
+
+Fetched pages are stored in the cache already sanitized, so the player proxy
+and the stream warmer (warm_streams command) share the same entries and a
+warmed title renders without any upstream round trip.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import health
+
+# Markers that indicate the media is unavailable on the provider (e.g. VidSrc).
+# They might return 200 with an error msg, or 404/403
+UNAVAILABLE_MARKERS = [
+    "media is unavailable",
+    "this video is not available",
+    "video not found",
+    "no link found",
+    "not released",
+    "at the moment",  # Specific suffix from "This media is unavailable at the moment"
+    "unavailable"  # Broad match
+]
+
+# External scripts from known aggressive ad domains
+AD_DOMAINS = [
+    'doubleclick', 'googlesyndication', 'adservice', 'adsense',
+    'topworkredbay', 'popads', 'popcash', 'adnxs', 'advertising',
+    'propellerads', 'exoclick', 'onclickads', 'adsterra'
+]
+
+EXTERNAL_SCRIPT_RE = re.compile(r'<script[^>]*src=["\'][^"\']*["\'][^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+INLINE_SCRIPT_RE = re.compile(r'<script(?![^>]*src)[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+AD_IFRAME_RE = re.compile(
+    r'<iframe[^>]*src=["\'][^"\']*(?:doubleclick|googlesyndication|adservice|popads)[^"\']*["\'][^>]*>.*?</iframe>',
+    re.IGNORECASE | re.DOTALL
+)
+META_REFRESH_RE = re.compile(r'<meta[^>]*http-equiv=["\']refresh["\'][^>]*>', re.IGNORECASE)
+
+
+def episode_stream_url(stream_url, content_type, season, episode):
+    """Point VidSrc style series links at a specific season/episode."""
+    if content_type == 'series' and season and episode and ('vidsrc' in stream_url.lower() or 'vidplay' in stream_url.lower()):
+        # If it's a vidsrc style url: .../tv/{id} or .../tv/{id}/1/1
+        if '/tv/' in stream_url:
+            return re.sub(r'(/tv/[^/]+).*', r'\1/' + f"{season}/{episode}", stream_url)
+        elif '/embed/tv/' in stream_url:
+            return re.sub(r'(/embed/tv/[^/]+).*', r'\1/' + f"{season}/{episode}", stream_url)
+    return stream_url
+
+
+def sanitize_embed_html(embed_html):
+    """SELECTIVE SCRIPT REMOVAL - Remove ONLY obvious ad scripts"""
+    cleaned_html = embed_html
+
+    # Step 1: Remove ONLY external scripts from known aggressive ad domains
+    for script in EXTERNAL_SCRIPT_RE.findall(cleaned_html):
+        script_lower = script.lower()
+        if any(ad_domain in script_lower for ad_domain in AD_DOMAINS):
+            cleaned_html = cleaned_html.replace(script, '')
+
+    # Step 2: Remove ONLY inline scripts that explicitly call window.open or do redirects
+    # Be very specific to avoid breaking video player scripts
+    for script in INLINE_SCRIPT_RE.findall(cleaned_html):
+        script_content = script.lower()
+        # Only remove if it has BOTH popup/redirect AND is very short (likely just an ad trigger)
+        has_popup = 'window.open(' in script_content or 'window.open (' in script_content
+        has_redirect = 'location.href=' in script_content or 'location.replace(' in script_content
+        is_short = len(script) < 500  # Short scripts are likely just ad triggers
+
+        if (has_popup or has_redirect) and is_short:
+            cleaned_html = cleaned_html.replace(script, '')
+
+    # Step 3: Remove ad iframes (but keep video iframes)
+    cleaned_html = AD_IFRAME_RE.sub('', cleaned_html)
+
+    # Step 4: Remove meta refresh tags (used for redirects)
+    cleaned_html = META_REFRESH_RE.sub('', cleaned_html)
+
+    return cleaned_html
+
+
+def _cache_key(stream_url):
+    return 'embed_page:' + hashlib.sha1(stream_url.encode('utf-8')).hexdigest()
+
+
+def get_cached_embed_page(stream_url):
+    return cache.get(_cache_key(stream_url))
+
+
+def fetch_embed_page(stream_url, use_cache=True, ttl=None):
+    """
+    Fetch and sanitize an embed page. Returns a dict:
+      {'status_code': int, 'unavailable': bool, 'html': sanitized html}
+
+    Available pages are cached for `ttl` seconds (EMBED_PAGE_CACHE_TTL by default),
+    unavailable ones for the shorter EMBED_PAGE_NEGATIVE_TTL.
+    Raises requests.RequestException when the provider can't be reached, or
+    health.CircuitOpenError (a RequestException) while its circuit is open.
+    """
+    key = _cache_key(stream_url)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Referer': stream_url,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+    }
+
+    response = health.tracked_get(stream_url, headers=headers, timeout=15)
+    embed_html = response.text
+
+    is_error_page = any(marker in embed_html.lower() for marker in UNAVAILABLE_MARKERS)
+    is_http_error = response.status_code != 200
+    unavailable = is_error_page or is_http_error
+
+    page = {
+        'status_code': response.status_code,
+        'unavailable': unavailable,
+        'html': '' if unavailable else sanitize_embed_html(embed_html),
+    }
+
+    if unavailable:
+        ttl = getattr(settings, 'EMBED_PAGE_NEGATIVE_TTL', 120)
+    elif ttl is None:
+        ttl = getattr(settings, 'EMBED_PAGE_CACHE_TTL', 900)
+    cache.set(key, page, ttl)
+    return page
@@ -0,0 +1,172 @@
+# streaming/extraction.py
+"""
+Video URL extraction from embed pages.
+
+All the patterns used to find a playable URL are compiled into one scanner so
+the embed HTML is walked once, and results are memoized per embed URL:
+  - direct hits are cached until shortly before their signed URL expires
+  - embed-only fallbacks (nothing extractable) are negatively cached
+"""
+import calendar
+import hashlib
+import re
+import time
+import urllib.parse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import health
+
+EXTRACT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Referer': 'https://sflix.ps/',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+}
+
+M3U8_URL_RE = re.compile(r'https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*')
+MP4_URL_RE = re.compile(r'https?://[^\s"\'<>]+\.mp4[^\s"\'<>]*')
+
+# One alternation for every strategy: direct HLS, direct MP4 and player configs
+VIDEO_URL_SCANNER = re.compile(
+    r'(?P<m3u8>https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*)'
+    r'|(?P<mp4>https?://[^\s"\'<>]+\.mp4[^\s"\'<>]*)'
+    r'|"file"\s*:\s*"(?P<file>[^"]+)"'
+    r'|"src"\s*:\s*"(?P<src>[^"]+)"'
+    r'|"url"\s*:\s*"(?P<url>[^"]+)"'
+    r'|source\s*:\s*"(?P<source>[^"]+)"'
+)
+
+# Lower rank wins, matching the old scan order (m3u8, mp4, then config keys in order)
+MATCH_RANKS = {'m3u8': 0, 'mp4': 1, 'file': 2, 'src': 3, 'url': 4, 'source': 5}
+
+MATCH_MESSAGES = {
+    'm3u8': 'Found HLS stream',
+    'mp4': 'Found MP4 stream',
+    'extracted': 'Found video URL in player config',
+}
+
+# Query parameters used by CDNs to carry an absolute unix expiry timestamp
+EXPIRY_PARAMS = ('expires', 'expire', 'exp', 'e', 'expiry', 'validto', 'valid_until', 'deadline')
+
+# Refresh this long before a signed URL actually expires
+EXPIRY_SAFETY_MARGIN = 60
+
+
+def scan_video_url(html):
+    """
+    Single pass over the HTML. Returns (video_url, type) or (None, None).
+
+    A player config value that is itself an absolute m3u8/mp4 URL is classified
+    as such, so results match the old "direct URL first" priority.
+    """
+    best = None
+    best_rank = len(MATCH_RANKS)
+
+    for match in VIDEO_URL_SCANNER.finditer(html):
+        kind = match.lastgroup
+        value = match.group(kind)
+        rank = MATCH_RANKS[kind]
+
+        if rank >= MATCH_RANKS['file']:
+            if 'm3u8' not in value and 'mp4' not in value:
+                continue
+            direct = M3U8_URL_RE.search(value)
+            if direct:
+                kind, value, rank = 'm3u8', direct.group(0), MATCH_RANKS['m3u8']
+            else:
+                direct = MP4_URL_RE.search(value)
+                if direct:
+                    kind, value, rank = 'mp4', direct.group(0), MATCH_RANKS['mp4']
+
+        if rank < best_rank:
+            best, best_rank = (value, kind), rank
+            if rank == 0:
+                break  # Nothing beats an HLS stream
+
+    if best is None:
+        return None, None
+
+    video_url, kind = best
+    return video_url, kind if kind in ('m3u8', 'mp4') else 'extracted'
+
+
+def signed_url_ttl(video_url, default_ttl):
+    """Cache TTL for a video URL, bounded by any expiry encoded in its query string."""
+    params = urllib.parse.parse_qs(urllib.parse.urlparse(video_url).query)
+    lowered = {key.lower(): values for key, values in params.items()}
+    now = time.time()
+
+    expires_at = None
+    for name in EXPIRY_PARAMS:
+        for value in lowered.get(name, []):
+            if value.isdigit():
+                expires_at = int(value)
+                # Millisecond timestamps
+                if expires_at > 10 ** 11:
+                    expires_at //= 1000
+                break
+        if expires_at:
+            break
+
+    # AWS style: X-Amz-Date=20250101T000000Z + X-Amz-Expires=<seconds>
+    if expires_at is None and 'x-amz-expires' in lowered and 'x-amz-date' in lowered:
+        try:
+            signed_at = calendar.timegm(time.strptime(lowered['x-amz-date'][0], '%Y%m%dT%H%M%SZ'))
+            expires_at = int(signed_at + int(lowered['x-amz-expires'][0]))
+        except (ValueError, IndexError):
+            expires_at = None
+
+    # Akamai style: hdnts=st=...~exp=1700000000~hmac=...
+    if expires_at is None:
+        for value in lowered.get('hdnts', []) + lowered.get('__token__', []):
+            exp_match = re.search(r'exp=(\d+)', value)
+            if exp_match:
+                expires_at = int(exp_match.group(1))
+                break
+
+    if expires_at is None or expires_at < 10 ** 9:
+        return default_ttl
+
+    return max(0, min(default_ttl, int(expires_at - now - EXPIRY_SAFETY_MARGIN)))
+
+
+def _cache_key(embed_url):
+    return 'extract_video:' + hashlib.sha1(embed_url.encode('utf-8')).hexdigest()
+
+
+def resolve_video_url(embed_url, use_cache=True):
+    """
+    Return the extraction payload for an embed URL (same shape as the
+    extract_video_url API). Network errors propagate and are never cached.
+    """
+    key = _cache_key(embed_url)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = health.tracked_get(embed_url, headers=EXTRACT_HEADERS, timeout=10)
+    video_url, kind = scan_video_url(response.text)
+
+    if video_url:
+        result = {
+            'success': True,
+            'video_url': video_url,
+            'type': kind,
+            'message': MATCH_MESSAGES[kind],
+        }
+        ttl = signed_url_ttl(video_url, getattr(settings, 'EXTRACT_VIDEO_CACHE_TTL', 1800))
+    else:
+        result = {
+            'success': True,
+            'video_url': embed_url,
+            'type': 'embed',
+            'message': 'Using embed URL (direct extraction failed)',
+            'requires_proxy': True
+        }
+        ttl = getattr(settings, 'EXTRACT_VIDEO_NEGATIVE_TTL', 600)
+
+    if ttl > 0:
+        cache.set(key, result, ttl)
+    return result
@@ -0,0 +1,249 @@
+# streaming/health.py
+"""
+Per-domain circuit breaker and health scoreboard for embed providers.
+
+Every upstream call made on behalf of the player (embed page fetches, video
+URL extraction) is recorded here with its outcome and latency. State lives in
+the shared cache so all workers see the same picture:
+
+  closed     normal operation, calls are recorded in a rolling window
+  open       too many failures/slow calls - fail fast instead of waiting on timeouts
+  half_open  after OPEN_SECONDS one probe call is let through; success closes
+             the circuit, failure opens it again
+
+Updates are read-modify-write on a single cache key per domain; two workers
+recording at the same instant can drop one event, which is fine for a health
+signal.
+"""
+import time
+import urllib.parse
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+BREAKER_DEFAULTS = {
+    'WINDOW_SECONDS': 300,    # rolling window length
+    'WINDOW_SIZE': 50,        # max events kept per domain
+    'MIN_CALLS': 5,           # don't judge a domain on fewer calls than this
+    'FAILURE_RATE': 0.5,      # open when this share of calls failed...
+    'SLOW_CALL_SECONDS': 8,
+    'SLOW_CALL_RATE': 0.8,    # ...or this share of calls were slower than SLOW_CALL_SECONDS
+    'OPEN_SECONDS': 60,       # how long to fail fast before probing again
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DOMAINS_KEY = 'breaker:domains'
+STATE_TTL = 24 * 3600
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+def _config():
+    return {**BREAKER_DEFAULTS, **getattr(settings, 'PROVIDER_CIRCUIT_BREAKER', {})}
+
+
+def domain_for(url):
+    netloc = urllib.parse.urlparse(url).netloc.lower().split(':')[0]
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+def _key(domain):
+    return f'breaker:{domain}'
+
+
+def _empty():
+    return {'state': CLOSED, 'opened_at': None, 'events': []}
+
+
+def _effective_state(data, now, config):
+    if data['state'] == OPEN and now - (data['opened_at'] or 0) >= config['OPEN_SECONDS']:
+        return HALF_OPEN
+    return data['state']
+
+
+def _window(events, now, config):
+    cutoff = now - config['WINDOW_SECONDS']
+    return [e for e in events if e[0] >= cutoff][-config['WINDOW_SIZE']:]
+
+
+def allow_request(url):
+    """False while the domain's circuit is open. In half-open state only one probe gets through."""
+    domain = domain_for(url)
+    data = cache.get(_key(domain))
+    if not data:
+        return True
+
+    config = _config()
+    state = _effective_state(data, time.time(), config)
+    if state == CLOSED:
+        return True
+    if state == OPEN:
+        return False
+    # Half-open: first caller to grab the probe slot goes upstream
+    return cache.add(f'{_key(domain)}:probe', 1, timeout=config['OPEN_SECONDS'])
+
+
+def check_request(url):
+    """Raise CircuitOpenError when calls to url's domain should fail fast."""
+    if not allow_request(url):
+        raise CircuitOpenError(f'{domain_for(url)} is temporarily unavailable (circuit open)')
+
+
+def record(url, ok, latency):
+    """Record one upstream call. latency is seconds until the response headers arrived."""
+    domain = domain_for(url)
+    key = _key(domain)
+    config = _config()
+    now = time.time()
+
+    data = cache.get(key) or _empty()
+    state = _effective_state(data, now, config)
+    events = _window(data['events'], now, config)
+    events.append([now, bool(ok), round(float(latency), 3)])
+
+    if state == HALF_OPEN:
+        if ok:
+            data = {'state': CLOSED, 'opened_at': None, 'events': events[-1:]}
+        else:
+            data = {'state': OPEN, 'opened_at': now, 'events': events}
+        cache.delete(f'{key}:probe')
+    elif state == OPEN:
+        # Calls that raced the breaker opening - just keep the numbers
+        data['events'] = events
+    else:
+        data['events'] = events
+        if len(events) >= config['MIN_CALLS']:
+            failure_rate = sum(1 for e in events if not e[1]) / len(events)
+            slow_rate = sum(1 for e in events if e[2] >= config['SLOW_CALL_SECONDS']) / len(events)
+            if failure_rate >= config['FAILURE_RATE'] or slow_rate >= config['SLOW_CALL_RATE']:
+                data['state'] = OPEN
+                data['opened_at'] = now
+
+    cache.set(key, data, STATE_TTL)
+
+    domains = cache.get(DOMAINS_KEY) or {}
+    if domain not in domains or now - domains[domain] > 60:
+        domains[domain] = now
+        cache.set(DOMAINS_KEY, domains, STATE_TTL)
+
+
+def tracked_get(url, **kwargs):
+    """
+    requests.get wrapped with the circuit breaker: fails fast while the domain
+    is open and records the outcome/latency of every real call.
+    5xx responses and network errors count as failures.
+    """
+    check_request(url)
+    started = time.monotonic()
+    try:
+        response = requests.get(url, **kwargs)
+    except requests.RequestException:
+        record(url, False, time.monotonic() - started)
+        raise
+    record(url, response.status_code < 500, response.elapsed.total_seconds())
+    return response
+
+
+def _summarize(domain, data, now, config):
+    events = _window(data['events'], now, config)
+    calls = len(events)
+    latencies = sorted(e[2] for e in events if e[1])
+    return {
+        'domain': domain,
+        'state': _effective_state(data, now, config),
+        'opened_at': data['opened_at'],
+        'calls': calls,
+        'failures': sum(1 for e in events if not e[1]),
+        'success_rate': round(sum(1 for e in events if e[1]) / calls, 3) if calls else None,
+        'avg_latency': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'p90_latency': latencies[int(len(latencies) * 0.9)] if latencies else None,
+    }
+
+
+def get_states(domains):
+    """Summaries for the given domains in one cache round trip."""
+    config = _config()
+    now = time.time()
+    stored = cache.get_many([_key(d) for d in domains])
+    return {
+        d: _summarize(d, stored.get(_key(d)) or _empty(), now, config)
+        for d in domains
+    }
+
+
+def snapshot():
+    """Summaries for every domain seen in the last day, for monitoring."""
+    domains = sorted((cache.get(DOMAINS_KEY) or {}).keys())
+    return list(get_states(domains).values())
+
+
+# ---------------------------------------------------------------------------
+# Link ranking
+# ---------------------------------------------------------------------------
+
+RANKING_DEFAULTS = {
+    'SUCCESS_WEIGHT': 0.6,
+    'LATENCY_WEIGHT': 0.25,
+    'QUALITY_WEIGHT': 0.15,
+    'TARGET_TTFB': 1.5,      # seconds; a provider at this TTFB gets half the latency score
+    'PRIOR_CALLS': 3,        # unseen providers start as if they had this many calls...
+    'PRIOR_SUCCESS': 0.8,    # ...with this success rate
+}
+
+QUALITY_SCORES = {
+    '4k': 1.0, '2160p': 1.0,
+    '1080p': 0.9, 'fhd': 0.9,
+    'hd': 0.8, '720p': 0.7,
+    'dvd': 0.5, 'unknown': 0.5,
+    'sd': 0.4, '480p': 0.4,
+    'cam': 0.1,
+}
+
+
+def quality_score(quality):
+    return QUALITY_SCORES.get((quality or 'unknown').strip().lower(), 0.5)
+
+
+def link_score(summary, quality):
+    """
+    0..1 score for a link from its provider's rolling stats and its quality.
+    Success rate is smoothed towards a prior so a provider with two lucky calls
+    doesn't outrank one with a long good record; open circuits always score 0.
+    """
+    if summary['state'] == OPEN:
+        return 0.0
+
+    config = {**RANKING_DEFAULTS, **getattr(settings, 'LINK_RANKING', {})}
+    calls = summary['calls']
+    successes = calls - summary['failures']
+    success = (successes + config['PRIOR_CALLS'] * config['PRIOR_SUCCESS']) / (calls + config['PRIOR_CALLS'])
+
+    ttfb = summary['avg_latency']
+    latency = 1 / (1 + ttfb / config['TARGET_TTFB']) if ttfb is not None else 0.5
+
+    return round(
+        config['SUCCESS_WEIGHT'] * success
+        + config['LATENCY_WEIGHT'] * latency
+        + config['QUALITY_WEIGHT'] * quality_score(quality),
+        4
+    )
+
+
+def rank_links(links):
+    """
+    Sort serialized links (dicts with stream_url/quality) best first, in place.
+    Adds provider_status and score to each link. One cache round trip, no queries.
+    """
+    states = get_states({domain_for(link.get('stream_url', '')) for link in links})
+    for link in links:
+        summary = states[domain_for(link.get('stream_url', ''))]
+        link['provider_status'] = summary['state']
+        link['score'] = link_score(summary, link.get('quality'))
+    links.sort(key=lambda link: link['score'], reverse=True)
+    return links
@@ -0,0 +1,213 @@
+# streaming/hls.py
+"""
+HLS helpers for the video proxy.
+
+Rewrites master/media playlists so every variant, segment, key and init-map
+URI goes back through our own proxy, and keeps immutable segments
+(.ts / .m4s) in a size-bounded on-disk LRU cache so that many
+viewers of the same title share one upstream fetch.
+"""
+import hashlib
+import os
+import re
+import threading
+import urllib.parse
+from pathlib import Path
+
+from django.conf import settings
+
+PLAYLIST_CONTENT_TYPES = (
+    'application/vnd.apple.mpegurl',
+    'application/x-mpegurl',
+    'audio/mpegurl',
+    'audio/x-mpegurl',
+)
+
+# Only segment-sized media is cached; whole .mp4 files keep streaming straight through
+SEGMENT_EXTENSIONS = ('.ts', '.m4s', '.aac', '.vtt')
+
+SEGMENT_CONTENT_TYPES = {
+    '.ts': 'video/mp2t',
+    '.m4s': 'video/iso.segment',
+    '.aac': 'audio/aac',
+    '.vtt': 'text/vtt',
+}
+
+# URI="..." attributes inside tags (#EXT-X-KEY, #EXT-X-MAP, #EXT-X-MEDIA, #EXT-X-I-FRAME-STREAM-INF ...)
+URI_ATTRIBUTE_RE = re.compile(r'URI="([^"]+)"')
+
+
+def _url_path(url):
+    return urllib.parse.urlparse(url).path.lower()
+
+
+def is_playlist_url(url):
+    return _url_path(url).endswith('.m3u8')
+
+
+def is_playlist_response(url, content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return content_type in PLAYLIST_CONTENT_TYPES or is_playlist_url(url)
+
+
+def is_segment_url(url):
+    return _url_path(url).endswith(SEGMENT_EXTENSIONS)
+
+
+def segment_content_type(url):
+    return SEGMENT_CONTENT_TYPES.get(os.path.splitext(_url_path(url))[1], 'application/octet-stream')
+
+
+def rewrite_playlist(playlist_text, playlist_url, proxy_path):
+    """
+    Rewrite every URI in a master or media playlist to go through proxy_path.
+
+    Relative URIs are resolved against the playlist URL first, so providers
+    that serve `seg-1.ts` style relative segments keep working behind the proxy.
+    """
+    def proxied(uri):
+        absolute = urllib.parse.urljoin(playlist_url, uri.strip())
+        return f"{proxy_path}?url={urllib.parse.quote(absolute, safe='')}"
+
+    rewritten = []
+    for line in playlist_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            rewritten.append(line)
+        elif stripped.startswith('#'):
+            # Tags can carry URIs too (keys, init segments, alternate renditions)
+            rewritten.append(URI_ATTRIBUTE_RE.sub(lambda m: f'URI="{proxied(m.group(1))}"', line))
+        else:
+            # Any non-tag line is a variant playlist or segment URI
+            rewritten.append(proxied(stripped))
+
+    return '\n'.join(rewritten) + '\n'
+
+
+class SegmentCache:
+    """
+    Size-bounded LRU cache of HLS segments on local disk.
+
+    Segments are immutable once published, so they can be cached by URL without
+    revalidation. The file mtime doubles as the LRU clock: hits touch the file,
+    and eviction removes the least recently used files first.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._total_bytes = None
+
+    def _path_for(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / digest
+
+    def _scan(self):
+        """Compute the current cache size on first use (cheap after that)."""
+        total = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.rglob('*'):
+                if path.is_file() and not path.name.endswith('.tmp'):
+                    total += path.stat().st_size
+        self._total_bytes = total
+
+    def get(self, url):
+        """Return the cached segment bytes for url, or None on a miss."""
+        path = self._path_for(url)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path, None)  # Bump LRU position
+        except OSError:
+            pass
+        return data
+
+    def put(self, url, data):
+        path = self._path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write atomically so concurrent readers never see half a segment
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._scan()
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used segments until we are 10% under budget."""
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self.cache_dir.rglob('*'):
+            if path.is_file() and not path.name.endswith('.tmp'):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def fetch_lock(self, url):
+        """
+        Per-URL lock so concurrent viewers asking for the same segment wait for
+        a single upstream download instead of each fetching it.
+        """
+        with self._lock:
+            lock = self._fetch_locks.get(url)
+            if lock is None:
+                # Keep the lock table from growing without bound
+                if len(self._fetch_locks) > 1024:
+                    self._fetch_locks = {k: v for k, v in self._fetch_locks.items() if v.locked()}
+                lock = self._fetch_locks[url] = threading.Lock()
+            return lock
+
+    def get_or_fetch(self, url, fetch):
+        """
+        Return (data, was_cached). fetch(url) must return the segment bytes or
+        raise; only successful fetches are stored.
+        """
+        data = self.get(url)
+        if data is not None:
+            return data, True
+
+        with self.fetch_lock(url):
+            # Another request may have filled the cache while we waited
+            data = self.get(url)
+            if data is not None:
+                return data, True
+            data = fetch(url)
+            self.put(url, data)
+            return data, False
+
+
+_segment_cache = None
+_segment_cache_lock = threading.Lock()
+
+
+def get_segment_cache():
+    global _segment_cache
+    if _segment_cache is None:
+        with _segment_cache_lock:
+            if _segment_cache is None:
+                _segment_cache = SegmentCache(
+                    getattr(settings, 'HLS_SEGMENT_CACHE_DIR', Path(settings.BASE_DIR) / 'media' / 'hls_cache'),
+                    getattr(settings, 'HLS_SEGMENT_CACHE_MAX_BYTES', 2 * 1024 ** 3),
+                )
+    return _segment_cache
@@ -0,0 +1,120 @@
+# streaming/home.py
+"""
+Precomputed home page rails.
+
+The home page used to fire one /api/movies/ call per rail, each with its
+own count and full serialization. build_snapshot() assembles every rail in
+a few id-only queries plus one movie fetch, and the result is cached as a
+single snapshot that /api/home/ serves as is. The snapshot is rebuilt on a
+schedule (rebuild_home --interval) and after scrapes (run_improved_scraper).
+"""
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Movie
+
+SNAPSHOT_KEY = 'home:snapshot'
+REBUILD_LOCK_KEY = 'home:rebuild_lock'
+
+RAIL_SIZE = 20
+
+# Rails are sampled from this many newest matches so each rebuild mixes things up
+SAMPLE_POOL = 300
+
+KIDS_FILTER = (
+    models.Q(genre_list__icontains='Animation') |
+    models.Q(genre_list__icontains='Family') |
+    models.Q(genre_list__icontains='Kids')
+)
+
+
+class HomeMovieSerializer(serializers.ModelSerializer):
+    # Only what cards and the hero render
+    class Meta:
+        model = Movie
+        fields = ['imdb_id', 'title', 'year', 'synopsis', 'poster_url', 'content_type', 'status']
+
+
+def _snapshot_ttl():
+    return getattr(settings, 'HOME_SNAPSHOT_TTL', 30 * 60)
+
+
+def _sample(queryset, size, pool=SAMPLE_POOL):
+    ids = list(queryset.order_by('-year', '-imdb_id').values_list('imdb_id', flat=True)[:pool])
+    return random.sample(ids, min(size, len(ids)))
+
+
+def rail_ids():
+    """{rail name: [imdb_id, ...]} for every home rail."""
+    year = timezone.now().year
+    released = Movie.released()
+    movies = released.filter(content_type='movie')
+    series = released.filter(content_type='series')
+    with_posters = ~models.Q(poster_url='')
+
+    trending = list(
+        released.filter(trending_score__gt=0)
+        .order_by('-trending_score')
+        .values_list('imdb_id', flat=True)[:RAIL_SIZE]
+    )
+    if len(trending) < RAIL_SIZE:
+        # Not enough view data yet - top up with recent titles
+        filler = _sample(movies.filter(year__gte=year - 2).exclude(imdb_id__in=trending), RAIL_SIZE - len(trending))
+        trending += filler
+
+    hero = (
+        _sample(movies.filter(with_posters, year__gte=year - 1), 10)
+        + _sample(series.filter(with_posters, year__gte=year - 8), 5)
+    )
+    random.shuffle(hero)
+
+    return {
+        'hero': hero,
+        'new_releases': _sample(movies.filter(year__gte=year - 1), RAIL_SIZE),
+        'trending': trending,
+        'popular_series': _sample(series.filter(year__gte=year - 8), RAIL_SIZE),
+        'popular_movies': _sample(movies.filter(year__gte=year - 8), RAIL_SIZE),
+        'kids': _sample(released.filter(KIDS_FILTER, year__gte=year - 8), RAIL_SIZE),
+        'animation': _sample(released.filter(genre_list__icontains='Animation', year__gte=year - 8), RAIL_SIZE),
+    }
+
+
+def _assemble():
+    rails = rail_ids()
+    all_ids = {imdb_id for ids in rails.values() for imdb_id in ids}
+    movies = {
+        movie['imdb_id']: movie
+        for movie in HomeMovieSerializer(Movie.objects.filter(imdb_id__in=all_ids), many=True).data
+    }
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'rails': {
+            name: [movies[imdb_id] for imdb_id in ids if imdb_id in movies]
+            for name, ids in rails.items()
+        },
+    }
+
+
+def build_snapshot():
+    """Assemble all rails, store the snapshot in the cache and return it."""
+    snapshot = _assemble()
+    cache.set(SNAPSHOT_KEY, snapshot, _snapshot_ttl())
+    return snapshot
+
+
+def get_snapshot():
+    """Cached snapshot. On a miss one worker rebuilds and stores it; concurrent ones just assemble their own."""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is not None:
+        return snapshot
+    if cache.add(REBUILD_LOCK_KEY, 1, timeout=60):
+        try:
+            return build_snapshot()
+        finally:
+            cache.delete(REBUILD_LOCK_KEY)
+    return _assemble()
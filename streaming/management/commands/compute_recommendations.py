@@ -0,0 +1,117 @@
+# streaming/management/commands/compute_recommendations.py
+"""
+Rebuild the item-item neighbor lists behind /api/movies/recommended/.
+
+Builds a sparse users x movies matrix from WatchHistory, UserFavorite,
+UserWatchlist and Review, blends its item-item cosine similarity with
+metadata (TF-IDF) similarity, and stores the top-N neighbors of every
+movie as MovieNeighbors(kind='recommend').
+
+Run nightly from cron; it reads everything in a handful of queries and
+writes in batches.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from streaming import similarity
+from streaming.models import (
+    Movie, MovieNeighbors, Review, UserFavorite, UserWatchlist, WatchHistory
+)
+
+# How much each kind of interaction says about a user's taste
+INTERACTION_WEIGHTS = {
+    'history': 1.0,     # scaled by how much of the title was watched
+    'watchlist': 1.5,
+    'favorite': 3.0,
+    'review': 2.0,      # scaled by rating, reviews below 3 stars are ignored
+}
+
+
+class Command(BaseCommand):
+    help = 'Compute per-movie recommendation neighbors from user activity and metadata'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=30,
+            help='Neighbors to keep per movie'
+        )
+        parser.add_argument(
+            '--content-weight',
+            type=float,
+            default=0.3,
+            help='Share of the score that comes from metadata similarity (0-1)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=256,
+            help='Movies scored per matrix multiplication'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per database write'
+        )
+
+    def interaction_events(self):
+        weights = INTERACTION_WEIGHTS
+        for user_id, movie_id, progress in WatchHistory.objects.values_list('user_id', 'movie_id', 'progress').iterator():
+            yield user_id, movie_id, weights['history'] * (0.5 + min(max(progress or 0, 0), 100) / 100)
+        for user_id, movie_id in UserWatchlist.objects.values_list('user_id', 'movie_id').iterator():
+            yield user_id, movie_id, weights['watchlist']
+        for user_id, movie_id in UserFavorite.objects.values_list('user_id', 'movie_id').iterator():
+            yield user_id, movie_id, weights['favorite']
+        for user_id, movie_id, rating in Review.objects.filter(rating__gte=3).values_list('user_id', 'movie_id', 'rating').iterator():
+            yield user_id, movie_id, weights['review'] * (rating - 2) / 3
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        movies = list(Movie.objects.values_list('imdb_id', 'metadata').iterator())
+        imdb_ids = [imdb_id for imdb_id, _ in movies]
+        movie_index = {imdb_id: i for i, imdb_id in enumerate(imdb_ids)}
+        self.stdout.write(f'📋 {len(imdb_ids)} movies')
+
+        interactions = similarity.interaction_matrix(self.interaction_events(), movie_index)
+        self.stdout.write(f'👥 {interactions.shape[0]} users, {interactions.nnz} interactions')
+
+        content, vocabulary, _ = similarity.content_vectors([metadata for _, metadata in movies])
+        self.stdout.write(f'🏷️  {len(vocabulary)} metadata tokens')
+
+        content_weight = min(max(options['content_weight'], 0.0), 1.0)
+        vector_sets = [
+            (similarity.item_vectors(interactions), 1.0 - content_weight),
+            (content, content_weight),
+        ]
+
+        batch = []
+        written = 0
+        for row, neighbors in similarity.top_neighbors(vector_sets, options['top_n'], options['chunk_size']):
+            batch.append(MovieNeighbors(
+                movie_id=imdb_ids[row],
+                kind=MovieNeighbors.KIND_RECOMMEND,
+                neighbors=[[imdb_ids[col], round(score, 4)] for col, score in neighbors],
+            ))
+            if len(batch) >= options['batch_size']:
+                written += self.save(batch)
+                batch = []
+        written += self.save(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Stored recommendation neighbors for {written} movies in {time.monotonic() - started:.1f}s'
+        ))
+
+    def save(self, batch):
+        if not batch:
+            return 0
+        MovieNeighbors.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['movie', 'kind'],
+            update_fields=['neighbors', 'updated_at'],
+        )
+        return len(batch)
@@ -0,0 +1,113 @@
+# streaming/management/commands/compute_similar.py
+"""
+Rebuild the "more like this" neighbor lists behind /api/movies/{imdb_id}/similar/.
+
+Vectorizes Movie.metadata (genres, directors, writers, keywords, language,
+score bucket) as TF-IDF, computes cosine similarity in row chunks and
+stores the top-N neighbors per movie as MovieNeighbors(kind='content').
+
+--incremental only scores titles that don't have a list yet (freshly
+scraped ones) and slots each of them into the existing lists of its
+neighbors when it beats their weakest entry, so a nightly full run plus
+incremental runs after scrapes keep everything current.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from streaming import similarity
+from streaming.models import Movie, MovieNeighbors
+
+
+class Command(BaseCommand):
+    help = 'Compute content-based similar titles from movie metadata'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=20,
+            help='Neighbors to keep per movie'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only score movies without a neighbor list and patch their neighbors\' lists'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=256,
+            help='Movies scored per matrix multiplication'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per database write'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        top_n = options['top_n']
+        kind = MovieNeighbors.KIND_CONTENT
+
+        movies = list(Movie.objects.values_list('imdb_id', 'metadata').iterator())
+        imdb_ids = [imdb_id for imdb_id, _ in movies]
+
+        vectors, vocabulary, _ = similarity.content_vectors(
+            [metadata for _, metadata in movies], fields=similarity.SIMILAR_FIELDS
+        )
+        self.stdout.write(f'📋 {len(imdb_ids)} movies, {len(vocabulary)} metadata tokens')
+
+        rows = None
+        existing = {}
+        if options['incremental']:
+            existing = dict(MovieNeighbors.objects.filter(kind=kind).values_list('movie_id', 'neighbors'))
+            rows = [i for i, imdb_id in enumerate(imdb_ids) if imdb_id not in existing]
+            self.stdout.write(f'🆕 {len(rows)} movies without a similar list')
+            if not rows:
+                return
+
+        computed = {}
+        for row, neighbors in similarity.top_neighbors([(vectors, 1.0)], top_n, options['chunk_size'], rows=rows):
+            computed[imdb_ids[row]] = [[imdb_ids[col], round(score, 4)] for col, score in neighbors]
+
+        patched = set()
+        if options['incremental']:
+            # Similarity is symmetric: offer each new title to its neighbors' lists
+            for new_id, neighbors in list(computed.items()):
+                for neighbor_id, score in neighbors:
+                    current = existing.get(neighbor_id)
+                    if current is None or any(imdb_id == new_id for imdb_id, _ in current):
+                        continue
+                    if len(current) < top_n or score > current[-1][1]:
+                        existing[neighbor_id] = sorted(current + [[new_id, score]], key=lambda n: -n[1])[:top_n]
+                        patched.add(neighbor_id)
+            for neighbor_id in patched:
+                computed[neighbor_id] = existing[neighbor_id]
+
+        written = 0
+        batch = []
+        for imdb_id, neighbors in computed.items():
+            batch.append(MovieNeighbors(movie_id=imdb_id, kind=kind, neighbors=neighbors))
+            if len(batch) >= options['batch_size']:
+                written += self.save(batch)
+                batch = []
+        written += self.save(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Stored similar lists for {written} movies ({len(patched)} existing lists patched) '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
+
+    def save(self, batch):
+        if not batch:
+            return 0
+        MovieNeighbors.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['movie', 'kind'],
+            update_fields=['neighbors', 'updated_at'],
+        )
+        return len(batch)
@@ -0,0 +1,113 @@
+# streaming/management/commands/compute_trending.py
+"""
+Recompute Movie.trending_score from the hourly view buckets.
+
+score = sum(views * 0.5 ** (age_hours / HALF_LIFE_HOURS)) over the last
+WINDOW_DAYS. Also keeps MovieViewBucket bounded: hourly buckets older than
+--rollup-after-hours are merged into one bucket per day, and buckets older
+than the window are deleted.
+
+Run it every few minutes from cron, or keep it running with --interval.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay
+
+from streaming import trending
+from streaming.models import Movie, MovieViewBucket
+
+
+class Command(BaseCommand):
+    help = 'Recompute time-decayed trending scores and compact view buckets'
+
+    def add_arguments(self, parser):
+        config = trending.config()
+        parser.add_argument(
+            '--half-life-hours',
+            type=float,
+            default=config['HALF_LIFE_HOURS'],
+            help='Hours after which a view counts half as much'
+        )
+        parser.add_argument(
+            '--window-days',
+            type=int,
+            default=config['WINDOW_DAYS'],
+            help='Only buckets from the last N days count; older ones are deleted'
+        )
+        parser.add_argument(
+            '--rollup-after-hours',
+            type=int,
+            default=48,
+            help='Merge hourly buckets older than this into daily buckets'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, recomputing every N seconds (0 = run once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            scored = self.score(options)
+            rolled, deleted = self.compact(options)
+            elapsed = time.monotonic() - started
+
+            self.stdout.write(self.style.SUCCESS(
+                f'📈 {scored} trending titles, {rolled} buckets rolled up, {deleted} expired buckets deleted '
+                f'in {elapsed:.1f}s'
+            ))
+
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
+
+    def score(self, options):
+        now = trending.current_hour()
+        since = now - timedelta(days=options['window_days'])
+        half_life = max(options['half_life_hours'], 0.1)
+
+        scores = defaultdict(float)
+        buckets = MovieViewBucket.objects.filter(hour__gte=since).values_list('movie_id', 'hour', 'views')
+        for movie_id, hour, views in buckets.iterator():
+            age_hours = (now - hour).total_seconds() / 3600
+            scores[movie_id] += views * trending.decay_weight(age_hours, half_life)
+
+        with transaction.atomic():
+            Movie.objects.filter(trending_score__gt=0).update(trending_score=0)
+            Movie.objects.bulk_update(
+                [Movie(imdb_id=movie_id, trending_score=round(score, 4)) for movie_id, score in scores.items()],
+                ['trending_score'],
+                batch_size=500,
+            )
+        return len(scores)
+
+    def compact(self, options):
+        now = trending.current_hour()
+
+        deleted, _ = MovieViewBucket.objects.filter(hour__lt=now - timedelta(days=options['window_days'])).delete()
+
+        # Hourly resolution only matters while the decay curve is steep
+        cutoff = now - timedelta(hours=options['rollup_after_hours'])
+        cutoff = cutoff.replace(hour=0)  # Only whole days
+        old = MovieViewBucket.objects.filter(hour__lt=cutoff)
+        daily = list(
+            old.annotate(day=TruncDay('hour', tzinfo=timezone.utc)).values('movie_id', 'day').annotate(total=Sum('views'))
+        )
+        rows = old.count()
+        if rows <= len(daily):
+            return 0, deleted  # Already one bucket per day
+
+        with transaction.atomic():
+            old.delete()
+            MovieViewBucket.objects.bulk_create(
+                [MovieViewBucket(movie_id=d['movie_id'], hour=d['day'], views=d['total']) for d in daily],
+                batch_size=500,
+            )
+        return rows - len(daily), deleted
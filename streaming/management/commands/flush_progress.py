@@ -0,0 +1,44 @@
+# streaming/management/commands/flush_progress.py
+"""
+Flush buffered player progress (streaming/progress.py) into WatchHistory.
+
+Requests already trigger a flush every PROGRESS_FLUSH_INTERVAL seconds; run
+this from cron or with --interval to keep flushing when traffic is quiet,
+and before deploys so nothing buffered is lost.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from streaming import progress
+
+
+class Command(BaseCommand):
+    help = 'Write buffered watch progress to WatchHistory in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, flushing every N seconds (0 = flush once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            try:
+                written = progress.flush()
+            except Exception as e:
+                if not options['interval']:
+                    raise
+                # Keep the loop alive; the buffers are retried on the next round
+                self.stderr.write(self.style.ERROR(f'❌ Flush failed: {e}'))
+                written = 0
+            elapsed = time.monotonic() - started
+            if written or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'💾 Flushed {written} watch history rows in {elapsed:.2f}s'))
+
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
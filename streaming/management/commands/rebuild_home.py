@@ -0,0 +1,37 @@
+# streaming/management/commands/rebuild_home.py
+"""
+Rebuild the cached home page snapshot served by /api/home/.
+
+run_improved_scraper calls this after every crawl; schedule it (or keep it
+running with --interval) so the rails rotate and pick up trending changes.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from streaming import home
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed home page rails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, rebuilding every N seconds (0 = rebuild once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            snapshot = home.build_snapshot()
+            elapsed = time.monotonic() - started
+
+            sizes = ', '.join(f'{name} {len(movies)}' for name, movies in snapshot['rails'].items())
+            self.stdout.write(self.style.SUCCESS(f'🏠 Home snapshot rebuilt in {elapsed:.2f}s ({sizes})'))
+
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
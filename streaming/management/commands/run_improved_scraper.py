@@ -1,13 +1,20 @@
 # streaming/management/commands/run_improved_scraper.py
+import json
 import os
+import shutil
+import subprocess
 import sys
+import time
 import django
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 import importlib
 
 # Path Setup
 DJANGO_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 SCRAPY_PROJECT_PATH = os.path.join(DJANGO_PROJECT_ROOT, 'movie_scraper')
+# One Scrapy JOBDIR per spider (per shard for sharded runs), see --checkpoint/--resume
+JOBS_ROOT = os.path.join(DJANGO_PROJECT_ROOT, 'crawls')
 
 if SCRAPY_PROJECT_PATH not in sys.path:
     sys.path.insert(0, SCRAPY_PROJECT_PATH)
@@ -20,6 +27,16 @@ django.setup()
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
+# Spiders whose discovery space can be split across worker processes
+SHARDED_SPIDERS = {
+    'tmdb_vidsrc': 'scraper.spiders.tmdb_vidsrc_spider.TmdbVidsrcSpider',
+    'tmdb_vidsrc_v2': 'scraper.spiders.tmdb_vidsrc_spider_v2.TmdbVidsrcSpiderV2',
+}
+
+# TMDB allows roughly 50 requests/second per IP; the workers share a token
+# bucket (HOST_RATE_LIMITS) that keeps them below it together
+TMDB_MAX_RATE = 40
+
 class Command(BaseCommand):
     help = 'Run improved movie scrapers'
 
@@ -43,19 +60,75 @@ class Command(BaseCommand):
             default=5,
             help='Maximum number of pages to scrape per URL (for pagination support)'
         )
+        parser.add_argument(
+            '--mode',
+            type=str,
+            default='replay',
+            choices=['replay', 'browser', 'capture'],
+            help='Selenium spiders (sflix, goojara_v2, oneflix_ultimate): replay AJAX/HTTP endpoints, browser only, or capture endpoints'
+        )
+        parser.add_argument(
+            '--browser-profile',
+            type=str,
+            default='lite',
+            choices=['lite', 'player', 'full'],
+            help='Headless Chrome profile: lite blocks ads and assets, full loads everything (baseline for measurements)'
+        )
         parser.add_argument(
             '--api-key',
             type=str,
             default=None,
             help='TMDB API key (required for tmdb_vidsrc spider)'
         )
+        parser.add_argument(
+            '--refresh-older-than',
+            type=float,
+            default=7,
+            help='TMDB spiders: skip titles whose details were fetched fewer than this many days ago (0 = re-fetch all)'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=1,
+            help='TMDB spiders: split discovery by year across this many worker processes'
+        )
+        parser.add_argument(
+            '--shard',
+            type=int,
+            default=None,
+            help='Internal: index of the shard this worker process crawls (set by --shards)'
+        )
+        parser.add_argument(
+            '--run-id',
+            type=str,
+            default=None,
+            help='Internal: id of the sharded run the worker belongs to (shared dedupe and limit)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the last interrupted crawl of the spider (or of all its shards) from its checkpoint; implies --checkpoint'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            action='store_true',
+            help='Persist the request queue and spider state under crawls/, so an interrupted crawl can be continued with --resume'
+        )
 
     def handle(self, *args, **options):
         spider_choice = options['spider']
         limit = options['limit']
         max_pages = options['max_pages']
+        mode = options['mode']
+        shard = options['shard']
+        resume = options['resume']
+        self.checkpointing = resume or options['checkpoint']
+
+        if options['shards'] > 1 and shard is None:
+            return self._run_shards(options)
 
         self.stdout.write(self.style.SUCCESS(f'Starting {spider_choice} spider(s)...'))
+        job_suffix = f'-shard{shard}of{options["shards"]}' if shard is not None else ''
 
         # Import spiders after paths are set
         working_archive_module = importlib.import_module('scraper.spiders.working_archive_spider')
@@ -97,6 +170,7 @@ class Command(BaseCommand):
             settings.set('LOG_LEVEL', 'INFO')
             settings.set('CONCURRENT_REQUESTS', 2)
             settings.set('DOWNLOAD_DELAY', 2)
+            settings.set('BROWSER_PROFILE', options['browser_profile'])
             settings.set('ITEM_PIPELINES', {
                 'scraper.pipelines.DjangoItemPipeline': 300,
             })
@@ -105,50 +179,195 @@ class Command(BaseCommand):
 
             if spider_choice == 'archive' or spider_choice == 'all':
                 self.stdout.write('Adding Archive.org spider...')
-                process.crawl(WorkingArchiveSpider, limit=limit)
+                process.crawl(self._job(WorkingArchiveSpider, resume, job_suffix), limit=limit)
 
             if spider_choice == 'makemovies' or spider_choice == 'all':
                 self.stdout.write('Adding Makemovies spider...')
-                process.crawl(ImprovedMakemoviesSpider, limit=limit)
+                process.crawl(self._job(ImprovedMakemoviesSpider, resume, job_suffix), limit=limit)
 
             if spider_choice == 'goojara' or spider_choice == 'all':
                 self.stdout.write('Adding Goojara spider...')
-                process.crawl(GoojaraSpider, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(GoojaraSpider, resume, job_suffix), limit=limit, max_pages=max_pages)
 
             if spider_choice == 'sflix' or spider_choice == 'all':
                 self.stdout.write('Adding sflix spider...')
                 # FIX: Updated the variable name here to be consistent
-                process.crawl(SflixSpider, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(SflixSpider, resume, job_suffix), limit=limit, max_pages=max_pages, mode=mode)
 
             if spider_choice == 'goojara_v2':
                 self.stdout.write('Adding Goojara V2 spider (Multi-Server + Smart Scraping)...')
-                process.crawl(GoojaraSpiderV2, limit=limit, max_pages=max_pages, rescrape_broken=True)
+                process.crawl(self._job(GoojaraSpiderV2, resume, job_suffix), limit=limit, max_pages=max_pages, rescrape_broken=True, mode=mode)
 
             if spider_choice == 'oneflix_ultimate' or spider_choice == 'all':
                 self.stdout.write('Adding 1Flix Ultimate spider (UpCloud/MegaCloud/VidCloud)...')
-                process.crawl(OneFlixUltimateSpider, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(OneFlixUltimateSpider, resume, job_suffix), limit=limit, max_pages=max_pages, mode=mode)
             
             if spider_choice == 'oneflix_network':
                 self.stdout.write('Adding 1Flix Network Capture spider (Advanced URL Extraction)...')
-                process.crawl(OneflixNetworkCaptureSpider, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(OneflixNetworkCaptureSpider, resume, job_suffix), limit=limit, max_pages=max_pages)
             
+            # Worker of a sharded run: crawl only this shard's years
+            shard_kwargs = {}
+            if shard is not None:
+                shard_kwargs = {'shard': shard, 'shards': options['shards'], 'run_id': options['run_id']}
+                if settings.get('HOST_RATE_LIMIT_BACKEND', 'memory') == 'memory':
+                    # Shards must draw from one TMDB budget, not one each
+                    settings.set('HOST_RATE_LIMIT_BACKEND', 'sqlite')
+
             if spider_choice == 'tmdb_vidsrc':
                 api_key = options.get('api_key') or '9c179ef2342597bccad54c238061343e'
                 self.stdout.write('Adding TMDB-VidSrc spider (API-based, no scraping)...')
-                process.crawl(TmdbVidsrcSpider, api_key=api_key, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(TmdbVidsrcSpider, resume, job_suffix), api_key=api_key, limit=limit, max_pages=max_pages,
+                              refresh_older_than=options['refresh_older_than'], **shard_kwargs)
 
             if spider_choice == 'tmdb_vidsrc_v2':
                 api_key = options.get('api_key') or '9c179ef2342597bccad54c238061343e'
                 self.stdout.write('Adding TMDB-VidSrc Spider V2 (High Detail + Metadata)...')
-                process.crawl(TmdbVidsrcSpiderV2, api_key=api_key, limit=limit, max_pages=max_pages)
+                process.crawl(self._job(TmdbVidsrcSpiderV2, resume, job_suffix), api_key=api_key, limit=limit, max_pages=max_pages,
+                              refresh_older_than=options['refresh_older_than'], **shard_kwargs)
 
             self.stdout.write(self.style.SUCCESS('\nStarting crawl...'))
             process.start()
 
             self.stdout.write(self.style.SUCCESS('\n✓ Scraping completed!'))
+            if shard is not None:
+                return # The parent process rebuilds the home page once all shards are done
+
+            # New titles should show up on the home page right away
+            call_command('rebuild_home', stdout=self.stdout)
             self.stdout.write('Run "python manage.py runserver" and check http://localhost:8000/')
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error: {e}'))
             import traceback
-            self.stdout.write(traceback.format_exc())
\ No newline at end of file
+            self.stdout.write(traceback.format_exc())
+
+    def _run_shards(self, options):
+        """Start one worker process per shard, print their progress until all exit."""
+        from scraper.crawlstate import DEFAULT_PATH, CrawlState
+
+        spider_choice = options['spider']
+        shards = options['shards']
+        if spider_choice not in SHARDED_SPIDERS:
+            self.stdout.write(self.style.ERROR(
+                f'--shards only works with {", ".join(SHARDED_SPIDERS)} (got {spider_choice})'
+            ))
+            return
+
+        module_name, class_name = SHARDED_SPIDERS[spider_choice].rsplit('.', 1)
+        spider_cls = getattr(importlib.import_module(module_name), class_name)
+        delay = spider_cls.custom_settings.get('DOWNLOAD_DELAY') or 0
+        if delay and shards / delay > TMDB_MAX_RATE:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {shards} shards at DOWNLOAD_DELAY {delay}s could make {shards / delay:.0f} TMDB requests/s; '
+                f'the shared rate limiter holds them to ~{TMDB_MAX_RATE}/s, so more shards will not go faster'
+            ))
+
+        # A resumed run keeps its run id, so the shards see the claims and
+        # counters they made before the interruption
+        run_file = os.path.join(JOBS_ROOT, f'{spider_cls.name}-shards.json')
+        run_id = options['run_id']
+        if not run_id and options['resume']:
+            saved = self._read_json(run_file)
+            if saved.get('shards') == shards:
+                run_id = saved.get('run_id')
+                self.stdout.write(f'♻️  Resuming run {run_id}')
+            else:
+                self.stdout.write(self.style.WARNING(f'No interrupted {shards}-shard run to resume, starting a new one'))
+        run_id = run_id or time.strftime('%Y%m%d-%H%M%S')
+        os.makedirs(JOBS_ROOT, exist_ok=True)
+        with open(run_file, 'w') as f:
+            json.dump({'run_id': run_id, 'shards': shards}, f)
+
+        log_dir = os.path.join(DJANGO_PROJECT_ROOT, 'logs', run_id)
+        os.makedirs(log_dir, exist_ok=True)
+
+        state = CrawlState(run_id, path=get_project_settings().get('CRAWL_STATE_DB') or DEFAULT_PATH)
+        state.prune()
+
+        base_args = [
+            sys.executable, os.path.join(DJANGO_PROJECT_ROOT, 'manage.py'), 'run_improved_scraper',
+            '--spider', spider_choice,
+            '--limit', str(options['limit']),
+            '--max-pages', str(options['max_pages']),
+            '--refresh-older-than', str(options['refresh_older_than']),
+            '--shards', str(shards),
+            '--run-id', run_id,
+        ]
+        if options.get('api_key'):
+            base_args += ['--api-key', options['api_key']]
+        if options['resume']:
+            base_args.append('--resume')
+        elif options['checkpoint']:
+            base_args.append('--checkpoint')
+
+        self.stdout.write(self.style.SUCCESS(f'Starting {shards} {spider_choice} shards (run {run_id}, logs in {log_dir})...'))
+        workers = []
+        for index in range(shards):
+            log_file = open(os.path.join(log_dir, f'shard-{index}.log'), 'a' if options['resume'] else 'w')
+            process = subprocess.Popen(
+                base_args + ['--shard', str(index)],
+                cwd=DJANGO_PROJECT_ROOT, stdout=log_file, stderr=subprocess.STDOUT,
+            )
+            workers.append((process, log_file))
+
+        try:
+            while any(process.poll() is None for process, _ in workers):
+                time.sleep(5)
+                self._print_shard_progress(state, options['limit'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping shards...'))
+            for process, _ in workers:
+                process.terminate()
+            for process, _ in workers:
+                process.wait()
+        finally:
+            for _, log_file in workers:
+                log_file.close()
+
+        self._print_shard_progress(state, options['limit'])
+        failed = [index for index, (process, _) in enumerate(workers) if process.returncode]
+        if failed:
+            self.stdout.write(self.style.ERROR(f'Shards {failed} exited with errors, see {log_dir}'))
+        state.close()
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Scraping completed!'))
+        call_command('rebuild_home', stdout=self.stdout)
+
+    def _job(self, spider_cls, resume, suffix=''):
+        """
+        With --checkpoint or --resume, spider_cls with its own JOBDIR, so
+        Scrapy persists the request queue and the spider its checkpoint there.
+        Without resume, or when the last crawl finished, the directory is
+        cleared and the crawl starts over. Otherwise spider_cls unchanged:
+        a plain run keeps its queue in memory and leaves crawls/ alone.
+        """
+        from scraper.checkpoint import read_checkpoint
+
+        if not self.checkpointing:
+            return spider_cls
+        jobdir = os.path.join(JOBS_ROOT, f'{spider_cls.name}{suffix}')
+        if os.path.isdir(jobdir) and (not resume or read_checkpoint(jobdir).get('finished')):
+            shutil.rmtree(jobdir)
+        elif resume and os.path.isdir(jobdir):
+            self.stdout.write(f'♻️  Resuming {spider_cls.name}{suffix} from {jobdir}')
+        custom_settings = {**(spider_cls.custom_settings or {}), 'JOBDIR': jobdir}
+        return type(spider_cls.__name__, (spider_cls,), {'custom_settings': custom_settings})
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _print_shard_progress(self, state, limit):
+        rows = state.progress()
+        self.stdout.write(f'📊 {state.count("items")}/{limit} items across {len(rows)} shards')
+        for row in rows:
+            done = f'{row["tasks_done"]}/{row["tasks_total"]}'
+            self.stdout.write(
+                f'   shard {row["shard"] + 1}/{row["shards"]}  pages {done:>9}  '
+                f'details {row["details"]:>5}  items {row["items"]:>4}  {row["status"]}'
+            )
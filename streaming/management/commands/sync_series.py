@@ -0,0 +1,142 @@
+# streaming/management/commands/sync_series.py
+"""
+Refresh seasons and episode counts of TV titles that may have new episodes.
+
+Instead of re-running the TMDB spider over whole shows, this fetches
+/tv/{id} only for shows whose next episode has aired since the last sync
+(or whose schedule is unknown and stale), then merges the seasons into
+Movie.metadata with a JSON patch. See streaming/series.py for the rules.
+
+Series scraped before TmdbMapping existed are mapped first, from their
+themoviedb.org source URL or through TMDB's /find endpoint.
+
+Run it daily from cron.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from streaming import series
+from streaming.models import Movie, TmdbMapping
+
+TMDB_API = 'https://api.themoviedb.org/3'
+
+RELEASED_STATUSES = ['Released', 'Returning Series', 'Ended', 'Canceled']
+
+
+class Command(BaseCommand):
+    help = 'Re-fetch TV shows with newly aired episodes and patch their season metadata'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--api-key',
+            type=str,
+            default=os.environ.get('TMDB_API_KEY', '9c179ef2342597bccad54c238061343e'),
+            help='TMDB API key (defaults to $TMDB_API_KEY)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=200,
+            help='Maximum number of shows to fetch per run'
+        )
+        parser.add_argument(
+            '--recheck-days',
+            type=int,
+            default=7,
+            help='Re-check shows without an announced next episode after this many days'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent TMDB requests'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the shows that would be fetched'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.session = requests.Session()
+        self.api_key = options['api_key']
+        limit = options['limit']
+
+        mapped = self.map_unmapped(limit, options['dry_run'])
+        due = list(series.due_shows(options['recheck_days'])[:max(0, limit - len(mapped))])
+        shows = mapped + [mapping for mapping in due if mapping.pk not in {m.pk for m in mapped}]
+        self.stdout.write(f'📺 {len(shows)} shows to sync ({len(mapped)} newly mapped, {len(due)} due)')
+
+        if options['dry_run']:
+            for mapping in shows:
+                self.stdout.write(f'   {mapping.imdb_id}  tv/{mapping.tmdb_id}  next {mapping.next_air_date or "-"}  {mapping.series_status or "?"}')
+            return
+
+        stats = {'synced': 0, 'new_episodes': 0, 'errors': 0}
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = {executor.submit(self.fetch, f'/tv/{mapping.tmdb_id}'): mapping for mapping in shows}
+            # Database writes stay on this thread
+            for future in as_completed(futures):
+                mapping = futures[future]
+                try:
+                    data = future.result()
+                    stats['new_episodes'] += self.apply(mapping, data)
+                    stats['synced'] += 1
+                except Exception as e:
+                    stats['errors'] += 1
+                    self.stdout.write(self.style.WARNING(f'⚠️  tv/{mapping.tmdb_id} ({mapping.imdb_id}): {str(e)[:100]}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Synced {stats['synced']} shows, {stats['new_episodes']} new episodes "
+            f"({stats['errors']} errors) in {time.monotonic() - started:.1f}s"
+        ))
+
+    def fetch(self, path, **params):
+        response = self.session.get(f'{TMDB_API}{path}', params={'api_key': self.api_key, **params}, timeout=15)
+        response.raise_for_status()
+        return response.json()
+
+    def map_unmapped(self, limit, dry_run=False):
+        """TmdbMapping rows for catalog series that have none yet."""
+        mapped = []
+        for movie in series.unmapped_series().only('imdb_id', 'source_url')[:limit]:
+            tmdb_id = series.tmdb_id_from_url(movie.source_url)
+            if not tmdb_id and not dry_run:
+                try:
+                    results = self.fetch(f'/find/{movie.imdb_id}', external_source='imdb_id').get('tv_results', [])
+                    tmdb_id = results[0]['id'] if results else None
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f'⚠️  Could not map {movie.imdb_id}: {str(e)[:100]}'))
+            if not tmdb_id:
+                continue
+            mapping, _ = TmdbMapping.objects.update_or_create(
+                tmdb_id=tmdb_id, media_type='tv',
+                defaults={'imdb_id': movie.imdb_id, 'refreshed_at': timezone.now()},
+            )
+            mapped.append(mapping)
+        return mapped
+
+    def apply(self, mapping, data):
+        """Patch the show's metadata and schedule; returns the number of episodes added."""
+        movie = Movie.objects.filter(imdb_id=mapping.imdb_id).only('imdb_id', 'metadata', 'status').first()
+        added = 0
+        if movie:
+            before = sum(season.get('episode_count') or 0 for season in (movie.metadata or {}).get('seasons', []) if isinstance(season, dict))
+            patch = series.metadata_patch(movie.metadata, data)
+            series.patch_metadata(movie.imdb_id, patch)
+            added = max(0, sum(season.get('episode_count') or 0 for season in patch['seasons']) - before)
+
+            status = 'Released' if data.get('status') in RELEASED_STATUSES else 'Upcoming'
+            if movie.status != status:
+                Movie.objects.filter(imdb_id=movie.imdb_id).update(status=status)
+            if added:
+                self.stdout.write(f'✓ {data.get("name", movie.imdb_id)}: +{added} episodes')
+
+        series.record_air_dates(mapping, data)
+        return added
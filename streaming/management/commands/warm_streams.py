@@ -0,0 +1,190 @@
+# streaming/management/commands/warm_streams.py
+"""
+Pre-resolve playable streams for the titles people are most likely to open next.
+
+Takes the most-watched titles (WatchHistory over a recent window) and the
+most recently added ones (default catalog ordering), then fetches and sanitizes
+their embed pages and extracts their video URLs into the proxy cache, so the
+first play of a popular title doesn't wait on upstream providers.
+
+Series play through per-episode URLs (embed.episode_stream_url), so for a
+series the episodes its viewers play next (EpisodeProgress.next_episode,
+most common first, S1E1 when nobody has started it) are warmed instead of
+the bare link.
+
+Run it from cron, or keep it running with --interval.
+"""
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from itertools import zip_longest
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from streaming import embed, extraction
+from streaming.models import EpisodeProgress, Movie, StreamingLink, WatchHistory
+
+WARMER_DEFAULTS = {
+    'TITLES': 50,
+    'WORKERS': 4,
+    'FRESHNESS': 15 * 60,
+    'WATCH_WINDOW_DAYS': 7,
+    'EPISODES_PER_SERIES': 3,
+}
+
+
+class Command(BaseCommand):
+    help = 'Warm embed pages and extracted video URLs for trending and newly added titles'
+
+    def add_arguments(self, parser):
+        config = {**WARMER_DEFAULTS, **getattr(settings, 'STREAM_WARMER', {})}
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=config['TITLES'],
+            help='Number of most-watched and of most-recent titles to warm'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=config['WORKERS'],
+            help='Concurrent upstream fetches'
+        )
+        parser.add_argument(
+            '--freshness',
+            type=int,
+            default=config['FRESHNESS'],
+            help='Seconds a warmed embed page stays in the cache'
+        )
+        parser.add_argument(
+            '--window-days',
+            type=int,
+            default=config['WATCH_WINDOW_DAYS'],
+            help='Only count WatchHistory activity from the last N days'
+        )
+        parser.add_argument(
+            '--episodes-per-series',
+            type=int,
+            default=config['EPISODES_PER_SERIES'],
+            help='Episodes to warm per series (the ones its viewers play next)'
+        )
+        parser.add_argument(
+            '--no-extract',
+            action='store_true',
+            help='Only warm embed pages, skip video URL extraction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running, re-warming every N seconds (0 = run once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            stats = self.warm(options)
+            elapsed = time.monotonic() - started
+
+            self.stdout.write(self.style.SUCCESS(
+                f"🔥 Warmed {stats['pages']} embed pages, {stats['extracted']} video URLs "
+                f"({stats['fresh']} already fresh, {stats['errors']} errors) in {elapsed:.1f}s"
+            ))
+
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
+
+    def select_titles(self, titles, window_days):
+        """Most-watched titles first, interleaved with the newest additions."""
+        since = timezone.now() - timedelta(days=window_days)
+        most_watched = list(
+            WatchHistory.objects.filter(last_watched__gte=since)
+            .values('movie_id')
+            .annotate(views=Count('id'))
+            .order_by('-views')
+            .values_list('movie_id', flat=True)[:titles]
+        )
+        most_recent = list(
+            Movie.released()
+            .order_by('-year', '-imdb_id')
+            .values_list('imdb_id', flat=True)[:titles]
+        )
+
+        selected = []
+        seen = set()
+        for pair in zip_longest(most_watched, most_recent):
+            for imdb_id in pair:
+                if imdb_id and imdb_id not in seen:
+                    seen.add(imdb_id)
+                    selected.append(imdb_id)
+        return selected
+
+    def next_episodes(self, series_ids, window_days, per_series):
+        """{imdb_id: [(season, episode), ...]}: what recent viewers of each series play next."""
+        since = timezone.now() - timedelta(days=window_days)
+        counts = defaultdict(Counter)
+        progress_rows = (
+            EpisodeProgress.objects.filter(movie_id__in=series_ids, updated_at__gte=since)
+            .select_related('movie')
+            .only('movie_id', 'seasons', 'last_season', 'last_episode', 'movie__metadata')
+        )
+        for ep in progress_rows.iterator():
+            next_episode = ep.next_episode()
+            if next_episode:
+                counts[ep.movie_id][next_episode] += 1
+        return {
+            imdb_id: [pair for pair, _ in counts[imdb_id].most_common(per_series)] or [(1, 1)]
+            for imdb_id in series_ids
+        }
+
+    def warm(self, options):
+        imdb_ids = self.select_titles(options['titles'], options['window_days'])
+        links = list(
+            StreamingLink.objects.filter(movie_id__in=imdb_ids, is_active=True)
+            .values_list('movie_id', 'movie__content_type', 'stream_url')
+        )
+        episodes = self.next_episodes(
+            {movie_id for movie_id, content_type, _ in links if content_type == 'series'},
+            options['window_days'], options['episodes_per_series'],
+        )
+        stream_urls = set()
+        for movie_id, content_type, stream_url in links:
+            if content_type != 'series':
+                stream_urls.add(stream_url)
+                continue
+            for season, episode in episodes[movie_id]:
+                stream_urls.add(embed.episode_stream_url(stream_url, content_type, season, episode))
+        stream_urls = sorted(stream_urls)
+        self.stdout.write(f'📋 {len(imdb_ids)} titles, {len(stream_urls)} stream URLs (episodes for series) to warm')
+
+        stats = {'pages': 0, 'extracted': 0, 'fresh': 0, 'errors': 0}
+
+        def warm_link(stream_url):
+            result = {'pages': 0, 'extracted': 0, 'fresh': 0, 'errors': 0}
+            try:
+                if embed.get_cached_embed_page(stream_url) is not None:
+                    result['fresh'] += 1
+                else:
+                    embed.fetch_embed_page(stream_url, use_cache=False, ttl=options['freshness'])
+                    result['pages'] += 1
+
+                if not options['no_extract']:
+                    extraction.resolve_video_url(stream_url)
+                    result['extracted'] += 1
+            except Exception as e:
+                result['errors'] += 1
+                self.stdout.write(self.style.WARNING(f'⚠️  {stream_url[:80]}: {str(e)[:100]}'))
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = [executor.submit(warm_link, url) for url in stream_urls]
+            for future in as_completed(futures):
+                for key, value in future.result().items():
+                    stats[key] += value
+
+        return stats
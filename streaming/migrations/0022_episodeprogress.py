@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('streaming', '0021_movie_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EpisodeProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seasons', models.JSONField(blank=True, default=dict)),
+                ('last_season', models.IntegerField(blank=True, null=True)),
+                ('last_episode', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='streaming.movie')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='episode_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'movie')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-19 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('streaming', '0022_episodeprogress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='watchhistory',
+            index=models.Index(condition=models.Q(('progress__gt', 5), ('progress__lt', 95)), fields=['user', '-last_watched'], name='history_in_progress_idx'),
+        ),
+    ]
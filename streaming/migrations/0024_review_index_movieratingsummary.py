@@ -0,0 +1,44 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:20
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_rating_summaries(apps, schema_editor):
+    Review = apps.get_model('streaming', 'Review')
+    MovieRatingSummary = apps.get_model('streaming', 'MovieRatingSummary')
+
+    summaries = {}
+    for row in Review.objects.values('movie_id', 'rating').annotate(n=Count('id')):
+        if row['rating'] in range(1, 6):
+            summary = summaries.setdefault(row['movie_id'], MovieRatingSummary(movie_id=row['movie_id']))
+            setattr(summary, f"star_{row['rating']}", row['n'])
+    MovieRatingSummary.objects.bulk_create(summaries.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0023_watchhistory_in_progress_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['movie', '-created_at'], name='review_movie_recent_idx'),
+        ),
+        migrations.CreateModel(
+            name='MovieRatingSummary',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='streaming.movie')),
+                ('star_1', models.PositiveIntegerField(default=0)),
+                ('star_2', models.PositiveIntegerField(default=0)),
+                ('star_3', models.PositiveIntegerField(default=0)),
+                ('star_4', models.PositiveIntegerField(default=0)),
+                ('star_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0024_review_index_movieratingsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieNeighbors',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('recommend', 'Recommendation')], default='recommend', max_length=20)),
+                ('neighbors', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_lists', to='streaming.movie')),
+            ],
+            options={
+                'unique_together': {('movie', 'kind')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0025_movieneighbors'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='movieneighbors',
+            name='kind',
+            field=models.CharField(choices=[('recommend', 'Recommendation'), ('content', 'Similar content')], default='recommend', max_length=20),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0026_alter_movieneighbors_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0, help_text='Time-decayed view count, maintained by compute_trending'),
+        ),
+        migrations.CreateModel(
+            name='MovieViewBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True, help_text='Start of the hour (UTC)')),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_buckets', to='streaming.movie')),
+            ],
+            options={
+                'unique_together': {('movie', 'hour')},
+            },
+        ),
+    ]
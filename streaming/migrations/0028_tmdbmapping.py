@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0027_movie_trending_score_movieviewbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TmdbMapping',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tmdb_id', models.PositiveIntegerField()),
+                ('media_type', models.CharField(choices=[('movie', 'Movie'), ('tv', 'TV')], default='movie', max_length=10)),
+                ('imdb_id', models.CharField(blank=True, db_index=True, help_text='Empty when TMDB has no IMDb id', max_length=20)),
+                ('refreshed_at', models.DateTimeField(db_index=True, help_text='Last time the TMDB details were fetched')),
+            ],
+            options={
+                'unique_together': {('tmdb_id', 'media_type')},
+            },
+        ),
+    ]
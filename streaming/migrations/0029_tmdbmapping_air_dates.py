@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streaming', '0028_tmdbmapping'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tmdbmapping',
+            name='last_air_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tmdbmapping',
+            name='next_air_date',
+            field=models.DateField(blank=True, db_index=True, help_text='Air date of the next announced episode', null=True),
+        ),
+        migrations.AddField(
+            model_name='tmdbmapping',
+            name='series_status',
+            field=models.CharField(blank=True, help_text='TMDB status, e.g. Returning Series, Ended', max_length=40),
+        ),
+    ]
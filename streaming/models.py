@@ -22,6 +22,14 @@ class Movie(models.Model):
     status = models.CharField(max_length=50, default='Released', db_index=True, help_text="e.g., Released, Upcoming, Post Production")
     metadata = models.JSONField(default=dict, blank=True, help_text="Extra data like season counts e.g. {'seasons': [{'season_number': 1, 'episode_count': 10}]}")
     genre_list = models.CharField(max_length=500, blank=True, db_index=True, help_text="Comma-separated genres for fast filtering")
+    trending_score = models.FloatField(default=0, db_index=True, help_text="Time-decayed view count, maintained by compute_trending")
+
+    # What the catalog treats as upcoming (is_upcoming lists); everything else is released
+    UPCOMING = models.Q(status='Upcoming') | models.Q(year__gte=2026)
+
+    @classmethod
+    def released(cls):
+        return cls.objects.exclude(cls.UPCOMING)
 
     def save(self, *args, **kwargs):
         # Automatically populate genre_list from metadata for fast searching
@@ -80,13 +88,83 @@ class WatchHistory(models.Model):
     episode = models.IntegerField(null=True, blank=True)
     last_watched = models.DateTimeField(auto_now=True)
 
+    # Started but not finished - what the continue-watching feed shows
+    IN_PROGRESS = models.Q(progress__gt=5, progress__lt=95)
+
     class Meta:
         unique_together = ('user', 'movie')
         ordering = ['-last_watched']
+        indexes = [
+            # Partial index behind the continue-watching feed
+            models.Index(
+                fields=['user', '-last_watched'],
+                name='history_in_progress_idx',
+                condition=models.Q(progress__gt=5, progress__lt=95),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} watched {self.movie.title}"
 
+class EpisodeProgress(models.Model):
+    """
+    Per-episode progress for one user and one series, in a single row.
+    seasons maps season number -> list of watched percentages (0-100), where
+    index i is episode i+1 and 0 means not started, e.g. {"1": [100, 100, 42]}.
+    """
+    FINISHED_AT = 90  # Percent watched at which an episode counts as seen
+    # Upper bounds for reported season/episode numbers; the map is a dense list per season
+    MAX_SEASON = 100
+    MAX_EPISODE = 2000
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='episode_progress')
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
+    seasons = models.JSONField(default=dict, blank=True)
+    last_season = models.IntegerField(null=True, blank=True)
+    last_episode = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'movie')
+
+    def __str__(self):
+        return f"{self.user.email} progress on {self.movie.title}"
+
+    def set_episode(self, season, episode, progress):
+        episodes = self.seasons.setdefault(str(season), [])
+        if len(episodes) < episode:
+            episodes.extend([0] * (episode - len(episodes)))
+        episodes[episode - 1] = max(0, min(100, int(round(progress))))
+        self.last_season, self.last_episode = season, episode
+
+    def get_episode(self, season, episode):
+        episodes = self.seasons.get(str(season), [])
+        return episodes[episode - 1] if 0 < episode <= len(episodes) else 0
+
+    def next_episode(self):
+        """
+        (season, episode) to play next, using movie.metadata['seasons']:
+        resume the last episode if unfinished, else the one after it.
+        None when the series is done.
+        """
+        seasons = sorted(
+            (s.get('season_number'), s.get('episode_count') or 0)
+            for s in (self.movie.metadata or {}).get('seasons', [])
+            if s.get('season_number')  # Season 0 holds specials
+        )
+        if self.last_season is None or self.last_episode is None:
+            return next(((n, 1) for n, count in seasons if count), None) if seasons else (1, 1)
+        if self.get_episode(self.last_season, self.last_episode) < self.FINISHED_AT:
+            return self.last_season, self.last_episode
+
+        for number, count in seasons:
+            if number == self.last_season and self.last_episode < count:
+                return number, self.last_episode + 1
+            if number > self.last_season and count:
+                return number, 1
+        return None
+
+
 class Review(models.Model):
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -97,6 +175,146 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['movie', '-created_at'], name='review_movie_recent_idx'),
+        ]
 
     def __str__(self):
         return f"Review by {self.user.email} for {self.movie.title} - {self.rating} stars"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so edits can move the histogram counters
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
+
+class MovieRatingSummary(models.Model):
+    """Per-movie review counters, kept in step with Review by streaming/signals.py"""
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Ratings for {self.movie_id}"
+
+    @property
+    def histogram(self):
+        return {str(i): getattr(self, f'star_{i}') for i in range(1, 6)}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def average(self):
+        count = self.count
+        if not count:
+            return 0
+        return round(sum(int(stars) * n for stars, n in self.histogram.items()) / count, 2)
+
+    @classmethod
+    def adjust(cls, movie_id, rating, delta):
+        """Atomically add delta to the counter for rating (1-5)."""
+        if rating not in range(1, 6):
+            return
+        field = f'star_{rating}'
+        cls.objects.get_or_create(movie_id=movie_id)
+        cls.objects.filter(movie_id=movie_id).update(**{field: models.F(field) + delta})
+
+
+class MovieNeighbors(models.Model):
+    """
+    Precomputed top-N similar titles for a movie, written by the offline
+    similarity jobs (see streaming/similarity.py). neighbors is a list of
+    [imdb_id, score] pairs, best first.
+    """
+    KIND_RECOMMEND = 'recommend'  # Co-watch/favorite/review signals blended with content
+    KIND_CONTENT = 'content'      # Metadata only, for "more like this"
+
+    KINDS = [
+        (KIND_RECOMMEND, 'Recommendation'),
+        (KIND_CONTENT, 'Similar content'),
+    ]
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='neighbor_lists')
+    kind = models.CharField(max_length=20, choices=KINDS, default=KIND_RECOMMEND)
+    neighbors = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('movie', 'kind')
+
+    def __str__(self):
+        return f"{self.kind} neighbors for {self.movie_id}"
+
+
+class MovieViewBucket(models.Model):
+    """Views of a movie within one hour, the raw input of the trending score (see streaming/trending.py)"""
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='view_buckets')
+    hour = models.DateTimeField(db_index=True, help_text="Start of the hour (UTC)")
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('movie', 'hour')
+
+    def __str__(self):
+        return f"{self.movie_id} @ {self.hour:%Y-%m-%d %H}:00 - {self.views} views"
+
+
+class TmdbMapping(models.Model):
+    """
+    TMDB id -> IMDb id of every title the TMDB spiders fetched and accepted.
+    refreshed_at lets them skip discover results fetched recently instead of
+    downloading and validating the same titles every run. For TV shows the
+    air dates decide when sync_series fetches them again.
+    """
+    MEDIA_TYPES = [
+        ('movie', 'Movie'),
+        ('tv', 'TV'),
+    ]
+
+    tmdb_id = models.PositiveIntegerField()
+    media_type = models.CharField(max_length=10, choices=MEDIA_TYPES, default='movie')
+    imdb_id = models.CharField(max_length=20, blank=True, db_index=True, help_text="Empty when TMDB has no IMDb id")
+    refreshed_at = models.DateTimeField(db_index=True, help_text="Last time the TMDB details were fetched")
+    # TV only, maintained by sync_series (see streaming/series.py)
+    last_air_date = models.DateField(null=True, blank=True)
+    next_air_date = models.DateField(null=True, blank=True, db_index=True, help_text="Air date of the next announced episode")
+    series_status = models.CharField(max_length=40, blank=True, help_text="TMDB status, e.g. Returning Series, Ended")
+
+    class Meta:
+        unique_together = ('tmdb_id', 'media_type')
+
+    def __str__(self):
+        return f"{self.media_type}/{self.tmdb_id} -> {self.imdb_id or '-'}"
+
+    @classmethod
+    def fresh_ids(cls, media_type, since):
+        """TMDB ids of media_type refreshed after since."""
+        return set(cls.objects.filter(media_type=media_type, refreshed_at__gte=since).values_list('tmdb_id', flat=True))
+
+    @classmethod
+    def record(cls, rows, refreshed_at):
+        """Upsert (tmdb_id, media_type, imdb_id) rows in one query."""
+        cls.objects.bulk_create(
+            [cls(tmdb_id=tmdb_id, media_type=media_type, imdb_id=imdb_id or '', refreshed_at=refreshed_at)
+             for tmdb_id, media_type, imdb_id in rows],
+            update_conflicts=True,
+            unique_fields=['tmdb_id', 'media_type'],
+            update_fields=['imdb_id', 'refreshed_at'],
+        )
+
+    @classmethod
+    def imdb_ids(cls, media_type, tmdb_ids):
+        """{tmdb_id: imdb_id} for the given ids that have a known IMDb id."""
+        return dict(
+            cls.objects.filter(media_type=media_type, tmdb_id__in=tmdb_ids)
+            .exclude(imdb_id='')
+            .values_list('tmdb_id', 'imdb_id')
+        )
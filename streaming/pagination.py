@@ -12,3 +12,43 @@ class CursorPaginationExample(PageNumberPagination):
     # Show last page link in response
     last_page_strings = ('last',)
 
+
+
+class UserListPagination(PageNumberPagination):
+    # Watchlist, favorites and history listings
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ReviewPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RowsThenQuerySet:
+    """
+    Already serialized rows followed by a queryset, as one sequence that
+    Django's Paginator can count and slice: the rows fill the first pages
+    and the queryset carries on after them, so page sizes and count/next
+    stay right. Still one COUNT and one SELECT per page.
+    """
+
+    def __init__(self, rows, queryset):
+        self.rows = rows
+        self.queryset = queryset
+
+    def count(self):
+        return len(self.rows) + self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        skip = len(self.rows)
+        queried = list(self.queryset[max(start - skip, 0):stop - skip]) if stop > skip else []
+        return self.rows[start:stop] + queried
@@ -0,0 +1,456 @@
+# streaming/progress.py
+"""
+Write-coalescing progress tracking for WatchHistory.
+
+The player reports its position every few seconds. Instead of one
+update_or_create per tick, the latest position per (user, movie, season,
+episode) is buffered in the cache and written to WatchHistory in periodic
+bulk upserts:
+
+  progress:pending:<user_id>   {"<movie>|<season>|<episode>": entry, ...}
+  progress:seq                 write counter (cache.incr, atomic on Redis)
+  progress:log:<seq>           user_id that wrote at that sequence number
+  progress:flushed_seq         last sequence number already flushed
+
+flush() walks the log from flushed_seq to seq, so no dirty user is missed even
+when several workers write at once. Reads call pending_for_user() and merge
+entries newer than the stored row.
+
+The log needs a cache shared by all workers with an atomic cache.incr
+(Redis, Memcached). The local-memory cache is atomic but per process, so a
+worker's flush would never see the other workers' entries; it only suits a
+single process (PROGRESS_BUFFERING = True, as the tests do). On other
+backends, e.g. FileBasedCache, two concurrent ticks can get the same
+sequence number and one user would never be flushed, so record() keeps the
+old single-row write there instead of buffering: one update_or_create per
+tick, plus the episode map for series (setting PROGRESS_BUFFERING forces
+either way).
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import trending
+from .models import EpisodeProgress, Movie, WatchHistory
+
+logger = logging.getLogger(__name__)
+
+SEQ_KEY = 'progress:seq'
+FLUSHED_SEQ_KEY = 'progress:flushed_seq'
+FLUSH_LOCK_KEY = 'progress:flush_lock'
+FLUSH_DUE_KEY = 'progress:flush_due'
+
+# Buffered entries outlive several missed flushes before the cache drops them
+PENDING_TTL = 24 * 3600
+
+PROGRESS_FIELDS = ('progress', 'current_time', 'season', 'episode')
+
+# Log entries this close to the head may still be in flight
+RECENT_SEQS = 100
+
+# Continue-watching feed: max items and how long a built feed is reused
+CONTINUE_WATCHING_LIMIT = 20
+CONTINUE_WATCHING_TTL = 600
+
+
+# Cache backends shared across processes whose incr() is atomic
+ATOMIC_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django_redis.cache.RedisCache',
+)
+
+
+def buffering_enabled():
+    buffering = getattr(settings, 'PROGRESS_BUFFERING', None)
+    if buffering is not None:
+        return buffering
+    return settings.CACHES['default']['BACKEND'] in ATOMIC_CACHE_BACKENDS
+
+
+def _pending_key(user_id):
+    return f'progress:pending:{user_id}'
+
+
+def _log_key(seq):
+    return f'progress:log:{seq}'
+
+
+def _feed_key(user_id):
+    return f'progress:continue:{user_id}'
+
+
+def _entry_key(movie_id, season, episode):
+    return f'{movie_id}|{season or ""}|{episode or ""}'
+
+
+def _flush_interval():
+    return getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 30)
+
+
+def _next_seq():
+    cache.add(SEQ_KEY, 0, timeout=None)
+    return cache.incr(SEQ_KEY)
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_int(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _valid_entry(entry):
+    """Season/episode either unset or within EpisodeProgress's bounds."""
+    season, episode = entry.get('season'), entry.get('episode')
+    return (
+        (season is None or 1 <= season <= EpisodeProgress.MAX_SEASON)
+        and (episode is None or 1 <= episode <= EpisodeProgress.MAX_EPISODE)
+    )
+
+
+def record(user_id, movie_id, progress=0, current_time=0, season=None, episode=None):
+    """
+    Store one position update. Buffered in the cache and written by a later
+    flush when buffering_enabled(), else written to the database right away.
+    """
+    season, episode = _to_int(season), _to_int(episode)
+    if not _valid_entry({'season': season, 'episode': episode}):
+        raise ValueError(f'Invalid season/episode {season}/{episode}')
+    key = _pending_key(user_id)
+    pending = cache.get(key) or {}
+    entry_key = _entry_key(movie_id, season, episode)
+    trending.record_session_view(movie_id, user_id)
+    entry = {
+        'movie_id': movie_id,
+        'progress': _to_float(progress),
+        'current_time': _to_float(current_time),
+        'season': season,
+        'episode': episode,
+        'ts': time.time(),
+    }
+    if not buffering_enabled():
+        _write_direct(user_id, entry)
+        cache.delete(_feed_key(user_id))
+        return
+
+    pending[entry_key] = entry
+    cache.set(key, pending, PENDING_TTL)
+
+    seq = _next_seq()
+    cache.set(_log_key(seq), user_id, PENDING_TTL)
+
+    maybe_flush()
+
+
+def _write_direct(user_id, entry):
+    """Unbuffered write of one update: the per-tick update_or_create used before buffering."""
+    WatchHistory.objects.update_or_create(
+        user_id=user_id,
+        movie_id=entry['movie_id'],
+        defaults={field: entry[field] for field in PROGRESS_FIELDS},
+    )
+    if entry['season'] and entry['episode']:
+        with transaction.atomic():
+            ep, _ = EpisodeProgress.objects.select_for_update().get_or_create(user_id=user_id, movie_id=entry['movie_id'])
+            ep.set_episode(entry['season'], entry['episode'], entry['progress'])
+            ep.save()
+
+
+def _latest_per_movie(entries):
+    latest = {}
+    for entry in entries:
+        current = latest.get(entry['movie_id'])
+        if current is None or entry['ts'] > current['ts']:
+            latest[entry['movie_id']] = entry
+    return latest
+
+
+def pending_for_user(user_id):
+    """Latest unflushed entry per movie for a user: {movie_id: entry}."""
+    return _latest_per_movie((cache.get(_pending_key(user_id)) or {}).values())
+
+
+def merge_pending(user_id, rows):
+    """
+    Overlay unflushed positions on serialized history rows (dicts with
+    movie/progress/current_time/season/episode/last_watched) in place.
+    """
+    pending = pending_for_user(user_id)
+    if not pending:
+        return rows
+    for row in rows:
+        entry = pending.get(row.get('movie'))
+        if entry:
+            row.update(entry_fields(entry))
+    return rows
+
+
+def entry_fields(entry):
+    """The history row fields an unflushed entry overrides, as serialized."""
+    return {
+        **{field: entry[field] for field in PROGRESS_FIELDS},
+        'last_watched': datetime.fromtimestamp(entry['ts'], tz=timezone.utc).isoformat(),
+    }
+
+
+def discard(user_id, movie_id=None):
+    """Drop buffered entries (all of them, or one movie's) so a flush can't resurrect deleted history."""
+    cache.delete(_feed_key(user_id))
+    key = _pending_key(user_id)
+    if movie_id is None:
+        cache.delete(key)
+        return
+    pending = cache.get(key) or {}
+    remaining = {k: v for k, v in pending.items() if v['movie_id'] != movie_id}
+    if len(remaining) != len(pending):
+        cache.set(key, remaining, PENDING_TTL)
+
+
+def maybe_flush():
+    """Kick off a background flush at most once per PROGRESS_FLUSH_INTERVAL across all workers."""
+    if cache.add(FLUSH_DUE_KEY, 1, timeout=_flush_interval()):
+        threading.Thread(target=_flush_in_background, daemon=True).start()
+
+
+def _flush_in_background():
+    try:
+        flush()
+    except Exception:
+        # Nobody waits on this thread; the buffers stay for the next flush
+        logger.exception('Background progress flush failed')
+    finally:
+        # The thread got its own DB connection - don't leak it
+        connection.close()
+
+
+def flush_users(user_ids):
+    """
+    Write the buffered positions of the given users to WatchHistory. Returns
+    rows upserted. If the batch fails, users are retried one at a time and the
+    buffer of a user that still fails is logged and dropped, so one bad entry
+    can't hold back everyone else's progress; if every user fails (database
+    down) the error is raised and the buffers are kept for the next flush.
+    """
+    flushed = {}
+    for user_id in user_ids:
+        pending = cache.get(_pending_key(user_id)) or {}
+        if pending:
+            flushed[user_id] = pending
+
+    try:
+        written = _write_pending(flushed)
+    except Exception:
+        logger.exception(f'Progress flush of {len(flushed)} users failed, retrying them one by one')
+        written, failed = 0, []
+        for user_id, pending in flushed.items():
+            try:
+                written += _write_pending({user_id: pending})
+            except Exception:
+                logger.exception(f'Dropping buffered progress of user {user_id}')
+                failed.append(user_id)
+        if failed and len(failed) == len(flushed):
+            raise
+
+    cache.delete_many([_feed_key(user_id) for user_id in flushed])
+
+    # Only remove what we wrote - updates that arrived meanwhile stay buffered
+    for user_id, pending in flushed.items():
+        key = _pending_key(user_id)
+        current = cache.get(key) or {}
+        remaining = {
+            k: v for k, v in current.items()
+            if k not in pending or v['ts'] > pending[k]['ts']
+        }
+        if remaining:
+            cache.set(key, remaining, PENDING_TTL)
+        else:
+            cache.delete(key)
+
+    return written
+
+
+def _write_pending(flushed):
+    """Upsert {user_id: pending entries} in one transaction. Returns WatchHistory rows written."""
+    rows = []
+    valid = {}
+    for user_id, pending in flushed.items():
+        valid[user_id] = {k: entry for k, entry in pending.items() if _valid_entry(entry)}
+        if len(valid[user_id]) != len(pending):
+            logger.warning(f'Skipping {len(pending) - len(valid[user_id])} invalid progress entries of user {user_id}')
+        # WatchHistory is one row per (user, movie): keep the most recent episode
+        for entry in _latest_per_movie(valid[user_id].values()).values():
+            rows.append(WatchHistory(
+                user_id=user_id,
+                movie_id=entry['movie_id'],
+                **{field: entry[field] for field in PROGRESS_FIELDS}
+            ))
+
+    if rows:
+        with transaction.atomic():
+            WatchHistory.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user', 'movie'],
+                update_fields=[*PROGRESS_FIELDS, 'last_watched'],
+            )
+            _flush_episodes(valid)
+    return len(rows)
+
+
+def _flush_episodes(flushed):
+    """Fold buffered series entries into the per-episode maps (EpisodeProgress)."""
+    entries = [
+        (user_id, entry)
+        for user_id, pending in flushed.items()
+        for entry in pending.values()
+        if entry['season'] and entry['episode']
+    ]
+    if not entries:
+        return
+
+    existing = {
+        (ep.user_id, ep.movie_id): ep
+        for ep in EpisodeProgress.objects.filter(
+            user_id__in={user_id for user_id, _ in entries},
+            movie_id__in={entry['movie_id'] for _, entry in entries},
+        )
+    }
+    for user_id, entry in sorted(entries, key=lambda item: item[1]['ts']):
+        ep = existing.get((user_id, entry['movie_id']))
+        if ep is None:
+            ep = existing[(user_id, entry['movie_id'])] = EpisodeProgress(user_id=user_id, movie_id=entry['movie_id'])
+        ep.set_episode(entry['season'], entry['episode'], entry['progress'])
+
+    fields = ['seasons', 'last_season', 'last_episode', 'updated_at']
+    now = datetime.now(timezone.utc)  # bulk_update skips auto_now
+    for ep in existing.values():
+        ep.updated_at = now
+    EpisodeProgress.objects.bulk_update([ep for ep in existing.values() if ep.pk], fields)
+    EpisodeProgress.objects.bulk_create(
+        [ep for ep in existing.values() if not ep.pk],
+        update_conflicts=True,
+        unique_fields=['user', 'movie'],
+        update_fields=fields,
+    )
+
+
+def episode_progress(user_id, movie):
+    """EpisodeProgress for a series with unflushed episodes applied (unsaved if new)."""
+    ep = EpisodeProgress.objects.filter(user_id=user_id, movie=movie).first()
+    if ep is None:
+        ep = EpisodeProgress(user_id=user_id, movie=movie)
+    pending = cache.get(_pending_key(user_id)) or {}
+    for entry in sorted(pending.values(), key=lambda e: e['ts']):
+        if entry['movie_id'] == movie.imdb_id and entry['season'] and entry['episode'] and _valid_entry(entry):
+            ep.set_episode(entry['season'], entry['episode'], entry['progress'])
+    return ep
+
+
+def flush():
+    """
+    Flush every user that wrote since the last flush. Safe to call from any
+    worker; only one flush runs at a time. Returns rows upserted.
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=300):
+        return 0
+    try:
+        cache.add(SEQ_KEY, 0, timeout=None)
+        last_seq = cache.get(SEQ_KEY) or 0
+        flushed_seq = cache.get(FLUSHED_SEQ_KEY) or 0
+        if last_seq <= flushed_seq:
+            return 0
+
+        # Chunk the log so a long backlog doesn't build one giant cache request
+        seqs = range(flushed_seq + 1, last_seq + 1)
+        logged = {}
+        for i in range(0, len(seqs), 1000):
+            logged.update(cache.get_many([_log_key(s) for s in seqs[i:i + 1000]]))
+
+        # A writer may have taken a sequence number but not stored its log entry
+        # yet; stop just before it so the next flush picks that user up
+        recent_gap = next(
+            (s for s in seqs if s > last_seq - RECENT_SEQS and _log_key(s) not in logged), None
+        )
+        if recent_gap is not None:
+            last_seq = recent_gap - 1
+            seqs = range(flushed_seq + 1, last_seq + 1)
+
+        written = flush_users({logged[_log_key(s)] for s in seqs if _log_key(s) in logged})
+        chunks = [[_log_key(s) for s in seqs[i:i + 1000]] for i in range(0, len(seqs), 1000)]
+
+        cache.set(FLUSHED_SEQ_KEY, last_seq, timeout=None)
+        for keys in chunks:
+            cache.delete_many(keys)
+        return written
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def continue_watching(user_id):
+    """
+    In-progress titles for a user, newest first, as slim dicts. Built from the
+    partial (user, -last_watched) index, cached until the next flush for the
+    user, with unflushed positions and titles merged in on each read.
+    """
+    key = _feed_key(user_id)
+    items = cache.get(key)
+    if items is None:
+        items = [
+            {
+                'movie': h.movie_id,
+                'title': h.movie.title,
+                'poster_url': h.movie.poster_url,
+                'content_type': h.movie.content_type,
+                'progress': h.progress,
+                'current_time': h.current_time,
+                'season': h.season,
+                'episode': h.episode,
+                'last_watched': h.last_watched.isoformat(),
+            }
+            for h in WatchHistory.objects.filter(WatchHistory.IN_PROGRESS, user_id=user_id)
+            .select_related('movie')
+            .only(
+                'movie_id', 'progress', 'current_time', 'season', 'episode', 'last_watched',
+                'movie__title', 'movie__poster_url', 'movie__content_type',
+            )
+            .order_by('-last_watched')[:CONTINUE_WATCHING_LIMIT]
+        ]
+        cache.set(key, items, CONTINUE_WATCHING_TTL)
+
+    items = merge_pending(user_id, [dict(item) for item in items])
+
+    # Titles started since the last flush have no row yet, like in the history
+    # list; a pending position is the newest one, so it also lifts titles
+    # whose stored row is finished or beyond the cached feed
+    pending = pending_for_user(user_id)
+    listed = {item['movie'] for item in items}
+    new_ids = [movie_id for movie_id, entry in pending.items() if movie_id not in listed and 5 < entry['progress'] < 95]
+    if new_ids:
+        fresh = [
+            {
+                'movie': movie.imdb_id,
+                'title': movie.title,
+                'poster_url': movie.poster_url,
+                'content_type': movie.content_type,
+            }
+            for movie in Movie.objects.filter(imdb_id__in=new_ids).only('imdb_id', 'title', 'poster_url', 'content_type')
+        ]
+        items += merge_pending(user_id, fresh)
+
+    items = [item for item in items if 5 < item['progress'] < 95]
+    items.sort(key=lambda item: item['last_watched'], reverse=True)
+    return items[:CONTINUE_WATCHING_LIMIT]
@@ -0,0 +1,57 @@
+# streaming/recommendations.py
+"""
+Serving side of personalized recommendations.
+
+A user's recent activity picks a few seed titles; their precomputed neighbor
+lists (MovieNeighbors, built offline by compute_recommendations) are merged
+with the seed weights and titles the user already knows are dropped. That is
+a handful of indexed reads, and the result is cached per user.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import MovieNeighbors, Review, UserFavorite, UserWatchlist, WatchHistory
+
+SEED_LIMIT = 50
+
+
+def _cache_key(user_id):
+    return f'recommend:user:{user_id}'
+
+
+def user_seeds(user):
+    """{imdb_id: weight} for the user's most telling recent activity."""
+    seeds = defaultdict(float)
+    for movie_id, progress in WatchHistory.objects.filter(user=user).values_list('movie_id', 'progress')[:SEED_LIMIT]:
+        seeds[movie_id] += 0.5 + min(max(progress or 0, 0), 100) / 100
+    for movie_id in UserFavorite.objects.filter(user=user).values_list('movie_id', flat=True)[:SEED_LIMIT]:
+        seeds[movie_id] += 3.0
+    for movie_id in UserWatchlist.objects.filter(user=user).values_list('movie_id', flat=True)[:SEED_LIMIT]:
+        seeds[movie_id] += 1.5
+    for movie_id, rating in Review.objects.filter(user=user, rating__gte=4).values_list('movie_id', 'rating')[:SEED_LIMIT]:
+        seeds[movie_id] += rating - 2
+    return seeds
+
+
+def recommend_for_user(user, limit=20):
+    """Ordered imdb_ids recommended for user (empty until compute_recommendations has run)."""
+    key = _cache_key(user.id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[:limit]
+
+    seeds = user_seeds(user)
+    scores = defaultdict(float)
+    neighbor_lists = MovieNeighbors.objects.filter(
+        movie_id__in=seeds.keys(), kind=MovieNeighbors.KIND_RECOMMEND
+    ).values_list('movie_id', 'neighbors')
+    for seed_id, neighbors in neighbor_lists:
+        for imdb_id, score in neighbors:
+            if imdb_id not in seeds:
+                scores[imdb_id] += seeds[seed_id] * score
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:100]
+    cache.set(key, ranked, getattr(settings, 'RECOMMENDATIONS_CACHE_TTL', 600))
+    return ranked[:limit]
@@ -1,6 +1,6 @@
 # streaming/serializers.py
 from rest_framework import serializers
-from .models import Movie, StreamingLink, UserWatchlist, UserFavorite, WatchHistory, Review
+from .models import Movie, StreamingLink, UserWatchlist, UserFavorite, WatchHistory, EpisodeProgress, Review, MovieRatingSummary
 
 class StreamingLinkSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,6 +16,15 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'movie', 'user', 'user_email', 'user_name', 'rating', 'comment', 'created_at', 'updated_at']
         read_only_fields = ['user']
 
+class RatingSummarySerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(read_only=True)
+    average = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = MovieRatingSummary
+        fields = ['count', 'average', 'histogram']
+
 class MovieSerializer(serializers.ModelSerializer):
     # Show all related streaming links
     links = StreamingLinkSerializer(many=True, read_only=True, source='links.all')
@@ -32,23 +41,33 @@ class MovieSerializer(serializers.ModelSerializer):
             return 0
         return sum(r.rating for r in reviews) / len(reviews)
 
+class MovieSummarySerializer(serializers.ModelSerializer):
+    # Compact movie for list rows (watchlist, favorites, history) - no links/reviews, no extra queries
+    class Meta:
+        model = Movie
+        fields = ['imdb_id', 'title', 'year', 'poster_url', 'content_type', 'source_site']
+
 class UserWatchlistSerializer(serializers.ModelSerializer):
-    movie_details = MovieSerializer(source='movie', read_only=True)
+    movie_details = MovieSummarySerializer(source='movie', read_only=True)
     
     class Meta:
         model = UserWatchlist
         fields = ['id', 'movie', 'movie_details', 'added_at']
 
 class UserFavoriteSerializer(serializers.ModelSerializer):
-    movie_details = MovieSerializer(source='movie', read_only=True)
+    movie_details = MovieSummarySerializer(source='movie', read_only=True)
 
     class Meta:
         model = UserFavorite
         fields = ['id', 'movie', 'movie_details', 'added_at']
 
 class WatchHistorySerializer(serializers.ModelSerializer):
-    movie_details = MovieSerializer(source='movie', read_only=True)
+    movie_details = MovieSummarySerializer(source='movie', read_only=True)
 
     class Meta:
         model = WatchHistory
         fields = ['id', 'movie', 'movie_details', 'progress', 'current_time', 'season', 'episode', 'last_watched']
+        extra_kwargs = {
+            'season': {'min_value': 1, 'max_value': EpisodeProgress.MAX_SEASON},
+            'episode': {'min_value': 1, 'max_value': EpisodeProgress.MAX_EPISODE},
+        }
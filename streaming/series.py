@@ -0,0 +1,152 @@
+# streaming/series.py
+"""
+Incremental season/episode refresh for TV titles (sync_series command).
+
+TMDB tells us when a show's next episode airs (next_episode_to_air) and
+when the last one did (last_air_date). TmdbMapping keeps both per show, so
+a refresh only fetches shows that can have something new:
+
+  due       next_air_date is today or earlier - an episode aired since the
+            last sync
+  unknown   never synced, or a returning show without an announced next
+            episode, re-checked once its row is older than recheck_days
+  finished  Ended / Canceled shows are skipped
+
+The fetched seasons are merged into Movie.metadata['seasons'] by season
+number and written with a JSON merge patch (SQLite json_patch, PostgreSQL
+jsonb ||), so keys other processes or the scrapers wrote to metadata in
+the meantime are left alone.
+"""
+import json
+import re
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Movie, TmdbMapping
+
+FINISHED_STATUSES = ['Ended', 'Canceled']
+
+TMDB_TV_URL_RE = re.compile(r'themoviedb\.org/tv/(\d+)')
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def due_shows(recheck_days=7, today=None):
+    """TmdbMapping rows of TV shows that may have new episodes, most overdue first."""
+    today = today or timezone.now().date()
+    stale = timezone.now() - timedelta(days=recheck_days)
+    return (
+        TmdbMapping.objects.filter(media_type='tv')
+        .exclude(imdb_id='')
+        .exclude(series_status__in=FINISHED_STATUSES)
+        .filter(
+            Q(next_air_date__lte=today)
+            | Q(next_air_date__isnull=True, refreshed_at__lt=stale)
+        )
+        .order_by('next_air_date', 'refreshed_at')
+    )
+
+
+def unmapped_series():
+    """Series in the catalog without a TV TmdbMapping row (scraped before mappings existed, or by other spiders)."""
+    mapped = TmdbMapping.objects.filter(media_type='tv').exclude(imdb_id='').values('imdb_id')
+    return Movie.objects.filter(content_type='series').exclude(imdb_id__in=mapped)
+
+
+def tmdb_id_from_url(url):
+    match = TMDB_TV_URL_RE.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def seasons_from_details(data):
+    """metadata['seasons'] entries from a TMDB /tv/{id} response, specials (season 0) left out."""
+    return [
+        {
+            'season_number': season.get('season_number'),
+            'episode_count': season.get('episode_count'),
+            'name': season.get('name'),
+            'air_date': season.get('air_date'),
+            'poster_path': season.get('poster_path'),
+        }
+        for season in data.get('seasons', [])
+        if season.get('season_number', 0) > 0
+    ]
+
+
+def merge_seasons(existing, fresh):
+    """existing seasons updated with fresh ones by season_number; seasons TMDB no longer lists are kept."""
+    merged = {season.get('season_number'): dict(season) for season in existing or [] if isinstance(season, dict)}
+    for season in fresh:
+        merged.setdefault(season['season_number'], {}).update(season)
+    return sorted(merged.values(), key=lambda season: season.get('season_number') or 0)
+
+
+def metadata_patch(existing_metadata, data):
+    """The metadata keys a sync changes, with seasons merged into what is stored."""
+    next_episode = data.get('next_episode_to_air') or None
+    if next_episode:
+        next_episode = {
+            'season_number': next_episode.get('season_number'),
+            'episode_number': next_episode.get('episode_number'),
+            'air_date': next_episode.get('air_date'),
+        }
+    return {
+        'seasons': merge_seasons((existing_metadata or {}).get('seasons'), seasons_from_details(data)),
+        'number_of_seasons': data.get('number_of_seasons'),
+        'number_of_episodes': data.get('number_of_episodes'),
+        'last_air_date': data.get('last_air_date'),
+        'next_episode_to_air': next_episode,
+    }
+
+
+def patch_metadata(imdb_id, patch):
+    """
+    Merge patch into one movie's metadata with a single UPDATE. Keys set to
+    None are removed (RFC 7396 merge patch semantics, on every backend).
+    """
+    table = Movie._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f'UPDATE {table} SET metadata = json_patch(COALESCE(metadata, \'{{}}\'), %s) WHERE imdb_id = %s',
+                [json.dumps(patch), imdb_id],
+            )
+            return
+        if connection.vendor == 'postgresql':
+            removed = [key for key, value in patch.items() if value is None]
+            kept = {key: value for key, value in patch.items() if value is not None}
+            cursor.execute(
+                f'UPDATE {table} SET metadata = (COALESCE(metadata, \'{{}}\'::jsonb) || %s::jsonb) - %s::text[] '
+                f'WHERE imdb_id = %s',
+                [json.dumps(kept), removed, imdb_id],
+            )
+            return
+
+    # Other backends: read-modify-write under a row lock
+    with transaction.atomic():
+        movie = Movie.objects.select_for_update().only('metadata').get(imdb_id=imdb_id)
+        metadata = dict(movie.metadata or {})
+        for key, value in patch.items():
+            if value is None:
+                metadata.pop(key, None)
+            else:
+                metadata[key] = value
+        Movie.objects.filter(imdb_id=imdb_id).update(metadata=metadata)
+
+
+def record_air_dates(mapping, data):
+    """Store the schedule fields of a TMDB /tv/{id} response on the show's mapping row."""
+    next_episode = data.get('next_episode_to_air') or {}
+    mapping.last_air_date = parse_date(data.get('last_air_date'))
+    mapping.next_air_date = parse_date(next_episode.get('air_date'))
+    mapping.series_status = data.get('status') or ''
+    mapping.refreshed_at = timezone.now()
+    mapping.save(update_fields=['last_air_date', 'next_air_date', 'series_status', 'refreshed_at'])
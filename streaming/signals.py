@@ -0,0 +1,36 @@
+# streaming/signals.py
+"""
+Cache invalidation hooks for per-user state (see streaming/user_state.py)
+and maintenance of the per-movie review counters (MovieRatingSummary).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import user_state
+from .models import UserWatchlist, UserFavorite, Review, MovieRatingSummary
+
+
+@receiver([post_save, post_delete], sender=UserWatchlist)
+def watchlist_changed(sender, instance, **kwargs):
+    user_state.invalidate('watchlist', instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=UserFavorite)
+def favorites_changed(sender, instance, **kwargs):
+    user_state.invalidate('favorites', instance.user_id)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_rating', None)
+    if created:
+        MovieRatingSummary.adjust(instance.movie_id, instance.rating, 1)
+    elif previous is not None and previous != instance.rating:
+        MovieRatingSummary.adjust(instance.movie_id, previous, -1)
+        MovieRatingSummary.adjust(instance.movie_id, instance.rating, 1)
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    MovieRatingSummary.adjust(instance.movie_id, getattr(instance, '_loaded_rating', None) or instance.rating, -1)
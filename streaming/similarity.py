@@ -0,0 +1,163 @@
+# streaming/similarity.py
+"""
+Offline item-item similarity with NumPy/SciPy.
+
+Used by the compute_recommendations and compute_similar commands, never
+imported by the web process. Two signals are combined:
+
+  collaborative  cosine similarity between the columns of a sparse
+                 users x movies interaction matrix (watch history,
+                 favorites, watchlist, reviews)
+  content        cosine similarity between TF-IDF vectors of metadata
+                 tokens (genres, directors, keywords, ...)
+
+Results are top-N neighbor lists per movie, computed in row chunks so
+the full movies x movies matrix is never materialized.
+"""
+import math
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+# Weight of each metadata field in the content vectors
+CONTENT_FIELDS = {
+    'genres': 1.0,
+    'directors': 1.0,
+    'keywords': 0.5,
+}
+
+# Richer field set for "more like this" (numbers such as user_score are bucketed)
+SIMILAR_FIELDS = {
+    'genres': 1.0,
+    'directors': 1.0,
+    'writers': 0.7,
+    'keywords': 0.5,
+    'original_language': 0.5,
+    'user_score': 0.3,
+}
+
+
+def _normalize_rows(matrix):
+    """L2-normalize the rows of a sparse matrix (zero rows stay zero)."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+
+def interaction_matrix(events, movie_index):
+    """
+    Sparse users x movies matrix from (user_id, imdb_id, weight) events.
+    Repeated (user, movie) pairs are summed.
+    """
+    user_index = {}
+    rows, cols, weights = [], [], []
+    for user_id, imdb_id, weight in events:
+        col = movie_index.get(imdb_id)
+        if col is None or weight <= 0:
+            continue
+        rows.append(user_index.setdefault(user_id, len(user_index)))
+        cols.append(col)
+        weights.append(weight)
+
+    return sparse.coo_matrix(
+        (np.asarray(weights, dtype=np.float32), (rows, cols)),
+        shape=(len(user_index), len(movie_index))
+    ).tocsr()
+
+
+def item_vectors(interactions):
+    """Movies x users matrix with unit-length rows, so X @ X.T is item-item cosine similarity."""
+    return _normalize_rows(interactions.T)
+
+
+def _tokens(metadata, fields):
+    for field, weight in fields.items():
+        values = (metadata or {}).get(field) or []
+        if isinstance(values, (int, float)):
+            values = [int(values)]  # e.g. user_score 7.4 -> bucket "7"
+        elif isinstance(values, str):
+            values = [values]
+        for value in values:
+            if value:
+                yield f'{field}:{str(value).strip().lower()}', weight
+
+
+def content_vectors(metadatas, fields=CONTENT_FIELDS, vocabulary=None, idf=None):
+    """
+    TF-IDF matrix (movies x tokens) with unit-length rows from metadata dicts.
+
+    Pass the vocabulary/idf returned by a previous call to vectorize new
+    titles in the same space (tokens not in the vocabulary are dropped).
+    Returns (matrix, vocabulary, idf).
+    """
+    docs = [dict(_tokens(metadata, fields)) for metadata in metadatas]
+
+    if vocabulary is None:
+        document_frequency = defaultdict(int)
+        for doc in docs:
+            for token in doc:
+                document_frequency[token] += 1
+        vocabulary = {token: i for i, token in enumerate(sorted(document_frequency))}
+        total = max(len(docs), 1)
+        idf = np.ones(len(vocabulary), dtype=np.float32)
+        for token, df in document_frequency.items():
+            idf[vocabulary[token]] = math.log((1 + total) / (1 + df)) + 1
+
+    rows, cols, values = [], [], []
+    for row, doc in enumerate(docs):
+        for token, weight in doc.items():
+            col = vocabulary.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                values.append(weight * idf[col])
+
+    matrix = sparse.coo_matrix(
+        (np.asarray(values, dtype=np.float32), (rows, cols)),
+        shape=(len(docs), len(vocabulary))
+    )
+    return _normalize_rows(matrix), vocabulary, idf
+
+
+def _top_n(row, exclude, top_n):
+    """[(col, score), ...] for the top_n largest entries of a sparse row."""
+    data, indices = row.data, row.indices
+    keep = indices != exclude
+    data, indices = data[keep], indices[keep]
+    if data.size == 0:
+        return []
+    if data.size > top_n:
+        best = np.argpartition(-data, top_n)[:top_n]
+        data, indices = data[best], indices[best]
+    order = np.argsort(-data)
+    return [(int(indices[i]), float(data[i])) for i in order if data[i] > 0]
+
+
+def top_neighbors(vector_sets, top_n=30, chunk_size=256, rows=None):
+    """
+    Yield (row, [(neighbor_row, score), ...]) for every movie row.
+
+    vector_sets is a list of (matrix, weight) pairs with unit-length rows over
+    the same movie order; the blended similarity is sum(weight * X @ X.T).
+    Work is done chunk_size rows at a time to bound memory. rows limits the
+    output to those movie rows (neighbors still come from the whole catalog).
+    """
+    total = vector_sets[0][0].shape[0]
+    rows = np.arange(total) if rows is None else np.asarray(rows)
+    transposed = [(matrix.T.tocsc(), weight) for matrix, weight in vector_sets]
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        blended = None
+        for (matrix, weight), (matrix_t, _) in zip(vector_sets, transposed):
+            if weight <= 0:
+                continue
+            part = (matrix[chunk] @ matrix_t) * weight
+            blended = part if blended is None else blended + part
+        if blended is None:
+            continue
+        blended = blended.tocsr()
+        for offset, movie_row in enumerate(chunk):
+            yield int(movie_row), _top_n(blended.getrow(offset), movie_row, top_n)
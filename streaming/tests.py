@@ -1,3 +1,375 @@
-from django.test import TestCase
+import os
+import tempfile
+import urllib.parse
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import health, hls, progress, trending, user_state
+from .models import Movie, MovieViewBucket, StreamingLink, UserWatchlist, UserFavorite, WatchHistory, Review
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class UserListQueryCountTests(TestCase):
+    """Watchlist/favorites/history listings must not issue per-row queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='lists@example.com', password='pass12345')
+        for i in range(30):
+            movie = Movie.objects.create(imdb_id=f'tt{i:07d}', title=f'Movie {i}', year=2000 + i)
+            StreamingLink.objects.create(movie=movie, stream_url=f'https://example.com/embed/{i}')
+            Review.objects.create(movie=movie, user=cls.user, rating=4, comment='ok')
+            UserWatchlist.objects.create(user=cls.user, movie=movie)
+            UserFavorite.objects.create(user=cls.user, movie=movie)
+            WatchHistory.objects.create(user=cls.user, movie=movie, progress=50)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_list_queries(self, url):
+        # One COUNT for pagination + one joined SELECT for the page, regardless of row count
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 30)
+        self.assertIn('title', response.data['results'][0]['movie_details'])
+
+    def test_watchlist(self):
+        self.assert_list_queries('/api/watchlist/')
+
+    def test_favorites(self):
+        self.assert_list_queries('/api/favorites/')
+
+    def test_history(self):
+        self.assert_list_queries('/api/history/')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROGRESS_BUFFERING=True, PROGRESS_FLUSH_INTERVAL=3600)
+class ProgressBufferTests(TestCase):
+    """Buffered player progress (streaming/progress.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='progress@example.com', password='pass12345')
+        cls.other = get_user_model().objects.create_user(email='other@example.com', password='pass12345')
+        cls.movie = Movie.objects.create(imdb_id='tt1000001', title='Buffered', year=2020)
+        cls.series = Movie.objects.create(imdb_id='tt1000002', title='Buffered Show', year=2020, content_type='series')
+
+    def setUp(self):
+        cache.clear()
+        # record() would start a background flush; tests flush explicitly
+        cache.add(progress.FLUSH_DUE_KEY, 1, timeout=3600)
+        # ...and the trending flush thread
+        patcher = mock.patch.object(trending, 'record_session_view')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_record_buffers_until_flush(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40, current_time=600)
+        progress.record(self.user.id, self.movie.imdb_id, progress=45, current_time=660)
+
+        self.assertFalse(WatchHistory.objects.exists())
+        pending = progress.pending_for_user(self.user.id)
+        self.assertEqual(pending[self.movie.imdb_id]['progress'], 45)
+
+        progress.flush()
+
+        history = WatchHistory.objects.get(user=self.user, movie=self.movie)
+        self.assertEqual((history.progress, history.current_time), (45, 660))
+        self.assertEqual(progress.pending_for_user(self.user.id), {})
+
+    @override_settings(PROGRESS_BUFFERING=False)
+    def test_record_writes_through_without_buffering(self):
+        progress.record(self.user.id, self.series.imdb_id, progress=30, season=2, episode=3)
+
+        history = WatchHistory.objects.get(user=self.user, movie=self.series)
+        self.assertEqual((history.progress, history.season, history.episode), (30, 2, 3))
+        self.assertEqual(progress.pending_for_user(self.user.id), {})
+        self.assertEqual(progress.episode_progress(self.user.id, self.series).last_episode, 3)
+
+    def test_merge_pending_overrides_stored_rows(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40, current_time=600)
+        rows = [
+            {'movie': self.movie.imdb_id, 'progress': 10, 'current_time': 100, 'season': None, 'episode': None, 'last_watched': None},
+            {'movie': self.series.imdb_id, 'progress': 5, 'current_time': 50, 'season': 1, 'episode': 1, 'last_watched': None},
+        ]
+
+        progress.merge_pending(self.user.id, rows)
+
+        self.assertEqual((rows[0]['progress'], rows[0]['current_time']), (40, 600))
+        self.assertIsNotNone(rows[0]['last_watched'])
+        self.assertEqual(rows[1]['progress'], 5)
+        self.assertIsNone(rows[1]['last_watched'])
+
+    def test_flush_users_drops_only_the_failing_user(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40)
+        progress.record(self.other.id, self.movie.imdb_id, progress=70)
+        write_pending = progress._write_pending
+
+        def fail_for_other(flushed):
+            if self.other.id in flushed:
+                raise DatabaseError('bad row')
+            return write_pending(flushed)
+
+        with mock.patch.object(progress, '_write_pending', side_effect=fail_for_other):
+            written = progress.flush_users([self.user.id, self.other.id])
+
+        self.assertEqual(written, 1)
+        self.assertTrue(WatchHistory.objects.filter(user=self.user).exists())
+        self.assertFalse(WatchHistory.objects.filter(user=self.other).exists())
+        self.assertEqual(progress.pending_for_user(self.other.id), {})
+
+    def test_flush_users_keeps_buffers_when_every_user_fails(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40)
+        progress.record(self.other.id, self.movie.imdb_id, progress=70)
+
+        with mock.patch.object(progress, '_write_pending', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                progress.flush_users([self.user.id, self.other.id])
+
+        self.assertEqual(progress.pending_for_user(self.user.id)[self.movie.imdb_id]['progress'], 40)
+        self.assertEqual(progress.pending_for_user(self.other.id)[self.movie.imdb_id]['progress'], 70)
+
+    def test_flush_users_keeps_updates_newer_than_the_flush(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40)
+        write_pending = progress._write_pending
+
+        def tick_during_write(flushed):
+            progress.record(self.user.id, self.movie.imdb_id, progress=80)
+            return write_pending(flushed)
+
+        with mock.patch.object(progress, '_write_pending', side_effect=tick_during_write):
+            progress.flush_users([self.user.id])
+
+        self.assertEqual(WatchHistory.objects.get(user=self.user, movie=self.movie).progress, 40)
+        self.assertEqual(progress.pending_for_user(self.user.id)[self.movie.imdb_id]['progress'], 80)
+
+    def test_flush_users_returns_rows_written(self):
+        progress.record(self.user.id, self.movie.imdb_id, progress=40, current_time=600)
+        progress.record(self.user.id, self.series.imdb_id, progress=20, season=1, episode=2)
+        progress.record(self.other.id, self.movie.imdb_id, progress=70)
+
+        written = progress.flush_users([self.user.id, self.other.id])
+
+        self.assertEqual(written, 3)
+        self.assertEqual(WatchHistory.objects.count(), 3)
+        self.assertEqual(progress.flush_users([self.user.id, self.other.id]), 0)
+
+    def test_bulk_status_pending_only_row_matches_serializer(self):
+        WatchHistory.objects.create(user=self.user, movie=self.series, progress=10, season=1, episode=1)
+        progress.record(self.user.id, self.movie.imdb_id, progress=40, current_time=600)
+
+        status = user_state.bulk_status(self.user, [self.movie.imdb_id, self.series.imdb_id])
+
+        pending_row = status[self.movie.imdb_id]['watch_history']
+        stored_row = status[self.series.imdb_id]['watch_history']
+        self.assertEqual(list(pending_row), list(stored_row))
+        self.assertIsNone(pending_row['id'])
+        self.assertEqual(pending_row['movie_details']['title'], 'Buffered')
+        self.assertEqual(pending_row['progress'], 40)
+        self.assertIsNotNone(pending_row['last_watched'])
+
+    def test_history_pages_count_unflushed_titles(self):
+        stored = [Movie.objects.create(imdb_id=f'tt200000{i}', title=f'Stored {i}', year=2001) for i in range(2)]
+        for movie in stored:
+            WatchHistory.objects.create(user=self.user, movie=movie, progress=90)
+        progress.record(self.user.id, self.movie.imdb_id, progress=40)
+        progress.record(self.user.id, self.series.imdb_id, progress=20, season=1, episode=1)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        first = client.get('/api/history/?page_size=2').data
+        second = client.get('/api/history/?page_size=2&page=2').data
+
+        self.assertEqual(first['count'], 4)
+        self.assertEqual([row['movie'] for row in first['results']], [self.series.imdb_id, self.movie.imdb_id])
+        self.assertIsNotNone(first['next'])
+        self.assertEqual({row['movie'] for row in second['results']}, {movie.imdb_id for movie in stored})
+        self.assertIsNone(second['next'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROVIDER_CIRCUIT_BREAKER={'MIN_CALLS': 2, 'OPEN_SECONDS': 60})
+class CircuitBreakerTests(SimpleTestCase):
+    """Per-domain breaker and link ranking (streaming/health.py)."""
+
+    url = 'https://www.flaky.example/embed/1'
+
+    def setUp(self):
+        cache.clear()
+
+    def open_circuit(self):
+        health.record(self.url, False, 1)
+        health.record(self.url, False, 1)
+
+    def expire_open_period(self):
+        key = health._key(health.domain_for(self.url))
+        data = cache.get(key)
+        data['opened_at'] -= 61
+        cache.set(key, data)
+
+    def test_failures_open_the_circuit(self):
+        health.record(self.url, False, 1)
+        self.assertTrue(health.allow_request(self.url))
+
+        health.record(self.url, False, 1)
+
+        self.assertFalse(health.allow_request(self.url))
+        with self.assertRaises(health.CircuitOpenError):
+            health.check_request(self.url)
+
+    def test_slow_calls_open_the_circuit(self):
+        health.record(self.url, True, 9)
+        health.record(self.url, True, 9)
+
+        self.assertEqual(health.get_states(['flaky.example'])['flaky.example']['state'], health.OPEN)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.open_circuit()
+        self.expire_open_period()
+
+        self.assertTrue(health.allow_request(self.url))
+        self.assertFalse(health.allow_request(self.url))
+
+    def test_successful_probe_closes_the_circuit(self):
+        self.open_circuit()
+        self.expire_open_period()
+        health.allow_request(self.url)
+
+        health.record(self.url, True, 0.5)
+
+        summary = health.get_states(['flaky.example'])['flaky.example']
+        self.assertEqual((summary['state'], summary['calls']), (health.CLOSED, 1))
+        self.assertTrue(health.allow_request(self.url))
+
+    def test_failed_probe_opens_the_circuit_again(self):
+        self.open_circuit()
+        self.expire_open_period()
+        health.allow_request(self.url)
+
+        health.record(self.url, False, 1)
+
+        self.assertFalse(health.allow_request(self.url))
+
+    def test_rank_links(self):
+        self.open_circuit()
+        for _ in range(5):
+            health.record('https://fast.example/e/1', True, 0.3)
+        links = [
+            {'stream_url': self.url, 'quality': '4k'},
+            {'stream_url': 'https://unseen.example/e/1', 'quality': 'cam'},
+            {'stream_url': 'https://fast.example/e/2', 'quality': '1080p'},
+        ]
+
+        health.rank_links(links)
+
+        self.assertEqual(
+            [link['stream_url'] for link in links],
+            ['https://fast.example/e/2', 'https://unseen.example/e/1', self.url],
+        )
+        self.assertEqual((links[2]['provider_status'], links[2]['score']), (health.OPEN, 0.0))
+        self.assertEqual(links[1]['provider_status'], health.CLOSED)
+
+
+class HlsTests(SimpleTestCase):
+    """Playlist rewriting and the segment cache (streaming/hls.py)."""
+
+    def proxied(self, url):
+        return f"/api/proxy/?url={urllib.parse.quote(url, safe='')}"
+
+    def test_rewrite_playlist_resolves_relative_uris(self):
+        playlist = '\n'.join([
+            '#EXTM3U',
+            '#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x1',
+            '#EXT-X-MAP:URI="../init.mp4"',
+            '#EXTINF:4.0,',
+            'seg-1.ts',
+            '',
+            '#EXTINF:4.0,',
+            'https://other.example/seg-2.ts',
+        ])
+
+        lines = hls.rewrite_playlist(playlist, 'https://cdn.example/hls/v1/index.m3u8', '/api/proxy/').splitlines()
+
+        self.assertEqual(lines[0], '#EXTM3U')
+        self.assertEqual(lines[1], f'#EXT-X-KEY:METHOD=AES-128,URI="{self.proxied("https://cdn.example/hls/v1/key.bin")}",IV=0x1')
+        self.assertEqual(lines[2], f'#EXT-X-MAP:URI="{self.proxied("https://cdn.example/hls/init.mp4")}"')
+        self.assertEqual(lines[3], '#EXTINF:4.0,')
+        self.assertEqual(lines[4], self.proxied('https://cdn.example/hls/v1/seg-1.ts'))
+        self.assertEqual(lines[5], '')
+        self.assertEqual(lines[7], self.proxied('https://other.example/seg-2.ts'))
+
+    def test_segment_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            segments = hls.SegmentCache(cache_dir, max_bytes=100)
+            segments.put('a.ts', b'a' * 40)
+            segments.put('b.ts', b'b' * 40)
+            os.utime(segments._path_for('a.ts'), (1000, 1000))
+            os.utime(segments._path_for('b.ts'), (2000, 2000))
+            segments.get('a.ts')  # a becomes the most recently used
+
+            segments.put('c.ts', b'c' * 40)
+
+            self.assertIsNone(segments.get('b.ts'))
+            self.assertEqual(segments.get('a.ts'), b'a' * 40)
+            self.assertEqual(segments.get('c.ts'), b'c' * 40)
+
+    def test_get_or_fetch_fetches_once(self):
+        fetch = mock.Mock(return_value=b'data')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            segments = hls.SegmentCache(cache_dir, max_bytes=100)
+
+            self.assertEqual(segments.get_or_fetch('a.ts', fetch), (b'data', False))
+            self.assertEqual(segments.get_or_fetch('a.ts', fetch), (b'data', True))
+        fetch.assert_called_once_with('a.ts')
+
+
+class TrendingTests(TestCase):
+    """Decayed trending score and bucket compaction (streaming/trending.py, compute_trending)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(imdb_id='tt3000001', title='Trending', year=2024)
+
+    def compute(self):
+        call_command('compute_trending', stdout=StringIO())
+
+    def test_decay_weight(self):
+        self.assertEqual(trending.decay_weight(0, 24), 1)
+        self.assertEqual(trending.decay_weight(24, 24), 0.5)
+        self.assertEqual(trending.decay_weight(48, 24), 0.25)
+        self.assertEqual(trending.decay_weight(-5, 24), 1)
+
+    def test_score_decays_with_age(self):
+        now = trending.current_hour()
+        MovieViewBucket.objects.create(movie=self.movie, hour=now, views=4)
+        MovieViewBucket.objects.create(movie=self.movie, hour=now - timedelta(hours=24), views=4)
+
+        self.compute()
+
+        self.movie.refresh_from_db()
+        self.assertAlmostEqual(self.movie.trending_score, 6)
+
+    def test_old_buckets_are_rolled_up_and_expired(self):
+        now = trending.current_hour()
+        day = (now - timedelta(days=4)).replace(hour=0)
+        for hour, views in ((1, 1), (2, 2), (3, 3)):
+            MovieViewBucket.objects.create(movie=self.movie, hour=day + timedelta(hours=hour), views=views)
+        MovieViewBucket.objects.create(movie=self.movie, hour=now - timedelta(days=10), views=9)
+        MovieViewBucket.objects.create(movie=self.movie, hour=now, views=1)
+
+        self.compute()
+
+        self.assertEqual(
+            sorted(MovieViewBucket.objects.values_list('hour', 'views')),
+            [(day, 6), (now, 1)],
+        )
@@ -0,0 +1,131 @@
+# streaming/trending.py
+"""
+View counting for the trending score.
+
+Views come from watch sessions: the first progress tick of a title (see
+streaming/progress.py) counts, later ticks of the same user and title within
+SESSION_HOURS don't (a cache.add marker per pair). They are counted in process
+and written to hourly MovieViewBucket rows by a background thread every
+FLUSH_INTERVAL seconds, so a busy title costs one UPDATE per flush instead of
+one write per view. The thread runs while there are counts to write and the
+rest is flushed when the process exits normally; a killed process loses at
+most its last FLUSH_INTERVAL seconds of views, which is fine for a
+popularity signal. compute_trending turns the buckets into the decayed
+Movie.trending_score and compacts old buckets.
+"""
+import atexit
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Movie, MovieViewBucket
+
+logger = logging.getLogger(__name__)
+
+TRENDING_DEFAULTS = {
+    'FLUSH_INTERVAL': 60,    # seconds between bucket writes per process
+    'HALF_LIFE_HOURS': 24,   # a view counts half as much after this long
+    'WINDOW_DAYS': 7,        # buckets older than this no longer contribute
+    'SESSION_HOURS': 4,      # one view per user and title within this window
+}
+
+_pending = Counter()
+_lock = threading.Lock()
+_flusher = None  # background flush thread, alive while there are counts
+
+
+def config():
+    return {**TRENDING_DEFAULTS, **getattr(settings, 'TRENDING', {})}
+
+
+def current_hour():
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record_view(imdb_id):
+    """Count one view; the background thread writes it within FLUSH_INTERVAL seconds."""
+    global _flusher
+    if not imdb_id:
+        return
+    with _lock:
+        _pending[(imdb_id, current_hour())] += 1
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='trending-flush', daemon=True)
+            _flusher.start()
+
+
+def record_session_view(imdb_id, viewer):
+    """Count a view unless viewer already watched imdb_id within SESSION_HOURS."""
+    if not imdb_id:
+        return
+    if cache.add(f'trending:session:{viewer}:{imdb_id}', 1, timeout=config()['SESSION_HOURS'] * 3600):
+        record_view(imdb_id)
+
+
+def _flush_loop():
+    """Flush every FLUSH_INTERVAL until nothing is left; the next view starts a new loop."""
+    global _flusher
+    try:
+        while True:
+            time.sleep(config()['FLUSH_INTERVAL'])
+            try:
+                flush()
+            except Exception:
+                # flush() put the counts back, the next round retries them
+                logger.exception('Trending view flush failed')
+            with _lock:
+                if not _pending:
+                    _flusher = None
+                    return
+    finally:
+        connection.close()
+
+
+@atexit.register
+def _flush_at_exit():
+    # Daemon threads die with the process; write what they haven't yet
+    try:
+        flush()
+    except Exception:
+        logger.exception('Trending view flush at exit failed')
+
+
+def flush():
+    """Add this process's buffered counts to their hourly buckets. Returns buckets touched."""
+    with _lock:
+        counts = dict(_pending)
+        _pending.clear()
+    if not counts:
+        return 0
+
+    try:
+        known = set(Movie.objects.filter(imdb_id__in={imdb_id for imdb_id, _ in counts}).values_list('imdb_id', flat=True))
+        with transaction.atomic():
+            for (imdb_id, hour), views in counts.items():
+                if imdb_id not in known:
+                    continue
+                updated = MovieViewBucket.objects.filter(movie_id=imdb_id, hour=hour).update(views=F('views') + views)
+                if not updated:
+                    bucket, created = MovieViewBucket.objects.get_or_create(
+                        movie_id=imdb_id, hour=hour, defaults={'views': views}
+                    )
+                    if not created:
+                        MovieViewBucket.objects.filter(pk=bucket.pk).update(views=F('views') + views)
+    except Exception:
+        # Keep the counts for the next flush rather than dropping them
+        with _lock:
+            _pending.update(counts)
+        raise
+    return len(counts)
+
+
+def decay_weight(age_hours, half_life_hours):
+    return math.pow(0.5, max(age_hours, 0) / half_life_hours)
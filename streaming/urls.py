@@ -18,6 +18,12 @@ urlpatterns = [
     # Watch endpoint
     path('api/watch/<str:imdb_id>/', views.MovieWatchView.as_view(), name='movie-watch'),
     
+    # Home page rails in one request (cached snapshot)
+    path('api/home/', views.HomeView.as_view(), name='home-rails'),
+    
+    # Provider circuit breaker / health scoreboard (monitoring)
+    path('api/health/providers/', views.ProviderHealthView.as_view(), name='provider-health'),
+    
     # Proxy player route (CRITICAL for Luluvdo, Dood, and other problematic servers)
     path('player/<str:imdb_id>/<int:link_id>/', views.player_proxy, name='player-proxy'),
     
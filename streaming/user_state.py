@@ -0,0 +1,93 @@
+# streaming/user_state.py
+"""
+Cached per-user membership sets for watchlist and favorites.
+
+Each user's watchlist/favorite movie ids are kept as one cached set, so
+"is this card in my list?" checks for a whole grid cost no queries on a warm
+cache and one query per set on a cold one. Writes invalidate the sets through
+the signal handlers in streaming/signals.py.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from . import progress
+from .models import Movie, UserWatchlist, UserFavorite, WatchHistory
+from .serializers import MovieSummarySerializer, WatchHistorySerializer
+
+KINDS = {
+    'watchlist': UserWatchlist,
+    'favorites': UserFavorite,
+}
+
+# Hard cap on ids per bulk status request
+MAX_BULK_IDS = 100
+
+
+def _key(kind, user_id):
+    return f'user_state:{kind}:{user_id}'
+
+
+def get_ids(kind, user_id):
+    """Set of movie ids the user has in `kind` ('watchlist' or 'favorites')."""
+    key = _key(kind, user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = set(KINDS[kind].objects.filter(user_id=user_id).values_list('movie_id', flat=True))
+        cache.set(key, ids, getattr(settings, 'USER_STATE_CACHE_TTL', 3600))
+    return ids
+
+
+def invalidate(kind, user_id):
+    cache.delete(_key(kind, user_id))
+
+
+def bulk_status(user, imdb_ids):
+    """
+    Watchlist/favorite/progress state for many movies at once, keyed by imdb_id,
+    in the same shape as the single-title user_status endpoint (which uses it).
+    At most four queries: one per membership set on a cache miss, one for
+    history, one for titles whose only progress is not flushed yet.
+    """
+    watchlist = get_ids('watchlist', user.id)
+    favorites = get_ids('favorites', user.id)
+    rows = WatchHistorySerializer(
+        WatchHistory.objects.filter(user=user, movie_id__in=imdb_ids).select_related('movie'), many=True
+    ).data
+    # Positions not yet flushed to WatchHistory win over the stored row
+    history = {row['movie']: row for row in progress.merge_pending(user.id, [dict(row) for row in rows])}
+
+    # Titles with only unflushed positions have no row yet
+    pending = progress.pending_for_user(user.id)
+    new_ids = [imdb_id for imdb_id in imdb_ids if imdb_id in pending and imdb_id not in history]
+    for row in pending_rows(pending, new_ids):
+        history[row['movie']] = row
+
+    return {
+        imdb_id: {
+            'is_in_watchlist': imdb_id in watchlist,
+            'is_favorite': imdb_id in favorites,
+            'watch_history': history.get(imdb_id),
+        }
+        for imdb_id in imdb_ids
+    }
+
+
+def pending_rows(pending, imdb_ids):
+    """
+    History rows shaped like WatchHistorySerializer's (id None) for titles
+    whose only progress is in `pending` (progress.pending_for_user), newest
+    first. One query; titles deleted since are left out.
+    """
+    if not imdb_ids:
+        return []
+    movies = {movie.imdb_id: movie for movie in Movie.objects.filter(imdb_id__in=imdb_ids)}
+    return [
+        {
+            'id': None,
+            'movie': imdb_id,
+            'movie_details': MovieSummarySerializer(movies[imdb_id]).data,
+            **progress.entry_fields(pending[imdb_id]),
+        }
+        for imdb_id in sorted(imdb_ids, key=lambda imdb_id: -pending[imdb_id]['ts'])
+        if imdb_id in movies
+    ]
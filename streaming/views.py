@@ -1,12 +1,11 @@
 # streaming/views.py
 from rest_framework import viewsets, status
-from django.utils import timezone
 from django.core.cache import cache
 
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .pagination import CursorPaginationExample
+from .pagination import CursorPaginationExample, ReviewPagination, RowsThenQuerySet, UserListPagination
 from django.core.management import call_command
 from django.shortcuts import get_object_or_404, render
 from django.http import HttpResponse, JsonResponse
@@ -14,21 +13,23 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.db import models
-from django.db.models import Q, Count
+from django.db.models import Count
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import Movie, StreamingLink, UserWatchlist, UserFavorite, WatchHistory, Review
+from .models import Movie, StreamingLink, UserWatchlist, UserFavorite, WatchHistory, EpisodeProgress, Review, MovieRatingSummary, MovieNeighbors
 from .serializers import (
     MovieSerializer, UserWatchlistSerializer, 
     UserFavoriteSerializer, WatchHistorySerializer,
-    ReviewSerializer
+    ReviewSerializer, RatingSummarySerializer
 )
+from . import embed, extraction, health, hls, home, progress, recommendations, user_state
 
 class UserWatchlistViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = UserWatchlistSerializer
+    pagination_class = UserListPagination
 
     def get_queryset(self):
-        return UserWatchlist.objects.filter(user=self.request.user)
+        return UserWatchlist.objects.filter(user=self.request.user).select_related('movie')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -36,9 +37,10 @@ class UserWatchlistViewSet(viewsets.ModelViewSet):
 class UserFavoriteViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = UserFavoriteSerializer
+    pagination_class = UserListPagination
 
     def get_queryset(self):
-        return UserFavorite.objects.filter(user=self.request.user)
+        return UserFavorite.objects.filter(user=self.request.user).select_related('movie')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -46,46 +48,103 @@ class UserFavoriteViewSet(viewsets.ModelViewSet):
 class WatchHistoryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = WatchHistorySerializer
+    pagination_class = UserListPagination
 
     def get_queryset(self):
-        return WatchHistory.objects.filter(user=self.request.user)
+        return WatchHistory.objects.filter(user=self.request.user).select_related('movie')
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Titles started since the last flush have no row yet - they lead the list
+        pending = progress.pending_for_user(request.user.id)
+        if pending:
+            stored = set(queryset.filter(movie_id__in=pending.keys()).values_list('movie_id', flat=True))
+            fresh = user_state.pending_rows(pending, [movie_id for movie_id in pending if movie_id not in stored])
+            if fresh:
+                queryset = RowsThenQuerySet(fresh, queryset)
+
+        page = self.paginate_queryset(queryset)
+        rows = [row if isinstance(row, dict) else self.get_serializer(row).data for row in (page if page is not None else queryset)]
+        progress.merge_pending(request.user.id, rows)
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+    @action(detail=False, methods=['get'], url_path='continue-watching')
+    def continue_watching(self, request):
+        """Capped, slim list of started-but-unfinished titles for the sidebar"""
+        return Response(progress.continue_watching(request.user.id))
+
+    @action(detail=False, methods=['get'])
+    def episodes(self, request):
+        """Whole per-episode progress map for one series (?movie=<imdb_id>) plus the episode to play next"""
+        movie = get_object_or_404(Movie, imdb_id=request.query_params.get('movie'))
+        ep = progress.episode_progress(request.user.id, movie)
+        next_episode = ep.next_episode()
+        return Response({
+            'movie': movie.imdb_id,
+            'seasons': ep.seasons,
+            'last_season': ep.last_season,
+            'last_episode': ep.last_episode,
+            'next_episode': {'season': next_episode[0], 'episode': next_episode[1]} if next_episode else None,
+        })
+
+    @action(detail=False, methods=['delete'], url_path=r'by-movie/(?P<movie_id>[^/]+)')
+    def remove_movie(self, request, movie_id=None):
+        """Remove one title by IMDb id, including positions not flushed yet (those rows have no id)"""
+        progress.discard(request.user.id, movie_id)
+        EpisodeProgress.objects.filter(user=request.user, movie_id=movie_id).delete()
+        WatchHistory.objects.filter(user=request.user, movie_id=movie_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
+        progress.discard(request.user.id)
         WatchHistory.objects.filter(user=request.user).delete()
+        EpisodeProgress.objects.filter(user=request.user).delete()
         return Response({"message": "Watch history cleared successfully."}, status=status.HTTP_204_NO_CONTENT)
 
     def perform_create(self, serializer):
-        # Update if already exists, else create
-        movie_id = self.request.data.get('movie')
-        WatchHistory.objects.update_or_create(
-            user=self.request.user,
-            movie_id=movie_id,
-            defaults={
-                'progress': self.request.data.get('progress', 0),
-                'current_time': self.request.data.get('current_time', 0),
-                'season': self.request.data.get('season'),
-                'episode': self.request.data.get('episode'),
-                'last_watched': timezone.now()
-            }
+        # Buffered: positions are coalesced in the cache and bulk-upserted by progress.flush()
+        progress.record(
+            self.request.user.id,
+            self.request.data.get('movie'),
+            progress=self.request.data.get('progress', 0),
+            current_time=self.request.data.get('current_time', 0),
+            season=self.request.data.get('season'),
+            episode=self.request.data.get('episode'),
         )
 
+    def perform_destroy(self, instance):
+        progress.discard(instance.user_id, instance.movie_id)
+        EpisodeProgress.objects.filter(user_id=instance.user_id, movie_id=instance.movie_id).delete()
+        instance.delete()
 
 import threading
 import urllib.parse
 import requests
-import re
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
     serializer_class = ReviewSerializer
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
+        queryset = Review.objects.select_related('user')
         movie_id = self.request.query_params.get('movie')
         if movie_id:
-            return Review.objects.filter(movie_id=movie_id)
-        return Review.objects.all()
+            return queryset.filter(movie_id=movie_id)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # With ?movie=, include the star histogram so the page needs one request
+        movie_id = request.query_params.get('movie')
+        if movie_id and isinstance(response.data, dict):
+            summary = MovieRatingSummary.objects.filter(movie_id=movie_id).first() or MovieRatingSummary(movie_id=movie_id)
+            response.data['summary'] = RatingSummarySerializer(summary).data
+        return response
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -166,16 +225,78 @@ class MovieViewSet(viewsets.ReadOnlyModelViewSet):
             })
         
         movie = self.get_object()
-        is_in_watchlist = UserWatchlist.objects.filter(user=request.user, movie=movie).exists()
-        is_favorite = UserFavorite.objects.filter(user=request.user, movie=movie).exists()
-        history = WatchHistory.objects.filter(user=request.user, movie=movie).first()
-        history_data = WatchHistorySerializer(history).data if history else None
+        return Response(user_state.bulk_status(request.user, [movie.imdb_id])[movie.imdb_id])
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, imdb_id=None):
+        """"More like this": one read of the precomputed content neighbor list (see compute_similar)"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            limit = 20
+
+        row = MovieNeighbors.objects.filter(movie_id=imdb_id, kind=MovieNeighbors.KIND_CONTENT).values_list('neighbors', flat=True).first()
+        imdb_ids = [neighbor_id for neighbor_id, _ in (row or [])][:limit]
+        movies = Movie.objects.filter(imdb_id__in=imdb_ids).prefetch_related('links', 'reviews')
+        by_id = {movie.imdb_id: movie for movie in movies}
+        ordered = [by_id[neighbor_id] for neighbor_id in imdb_ids if neighbor_id in by_id]
+        return Response({
+            'count': len(ordered),
+            'next': None,
+            'previous': None,
+            'results': self.get_serializer(ordered, many=True).data
+        })
+
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        """Personalized picks merged from precomputed neighbor lists (see compute_recommendations)"""
+        if not request.user.is_authenticated:
+            return Response({'count': 0, 'next': None, 'previous': None, 'results': []})
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            limit = 20
 
+        imdb_ids = recommendations.recommend_for_user(request.user, limit)
+        movies = Movie.objects.filter(imdb_id__in=imdb_ids).prefetch_related('links', 'reviews')
+        by_id = {movie.imdb_id: movie for movie in movies}
+        ordered = [by_id[imdb_id] for imdb_id in imdb_ids if imdb_id in by_id]
         return Response({
-            "is_in_watchlist": is_in_watchlist,
-            "is_favorite": is_favorite,
-            "watch_history": history_data
+            'count': len(ordered),
+            'next': None,
+            'previous': None,
+            'results': self.get_serializer(ordered, many=True).data
         })
+
+    @action(detail=False, methods=['get', 'post'], url_path='user-status')
+    def user_status_bulk(self, request):
+        """
+        user_status for a whole page of cards.
+        GET ?imdb_ids=tt1,tt2  or  POST {"imdb_ids": [...]}
+        """
+        if request.method == 'POST':
+            imdb_ids = request.data.get('imdb_ids') or []
+        else:
+            imdb_ids = request.query_params.get('imdb_ids', '').split(',')
+
+        if not isinstance(imdb_ids, list):
+            return Response({'error': 'imdb_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+
+        imdb_ids = list(dict.fromkeys(str(i).strip() for i in imdb_ids if str(i).strip()))
+        if len(imdb_ids) > user_state.MAX_BULK_IDS:
+            return Response(
+                {'error': f'At most {user_state.MAX_BULK_IDS} imdb_ids per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not request.user.is_authenticated:
+            return Response({
+                imdb_id: {"is_in_watchlist": False, "is_favorite": False, "watch_history": None}
+                for imdb_id in imdb_ids
+            })
+
+        return Response(user_state.bulk_status(request.user, imdb_ids))
     
     def get_queryset(self):
         queryset = Movie.objects.all().prefetch_related('links', 'reviews')
@@ -188,10 +309,10 @@ class MovieViewSet(viewsets.ReadOnlyModelViewSet):
         # DEFAULT: Exclude upcoming content from main lists unless is_upcoming=true is passed
         if is_upcoming and is_upcoming.lower() == 'true':
             # Include status='Upcoming' OR year >= 2026
-            queryset = queryset.filter(Q(status='Upcoming') | Q(year__gte=2026))
+            queryset = queryset.filter(Movie.UPCOMING)
         else:
             # Exclude status='Upcoming' AND year >= 2026
-            queryset = queryset.exclude(status='Upcoming').exclude(year__gte=2026)
+            queryset = queryset.exclude(Movie.UPCOMING)
 
         if content_type:
             queryset = queryset.filter(content_type=content_type)
@@ -252,6 +373,9 @@ class MovieViewSet(viewsets.ReadOnlyModelViewSet):
                 # Variety is now handled in the list() method via random offset for speed.
                 # For paginated requests (page > 1), we use a stable sort to avoid duplicates.
                 queryset = queryset.order_by('-year', '-imdb_id')
+            elif ordering == 'trending':
+                # Time-decayed views, maintained by the compute_trending command
+                queryset = queryset.order_by('-trending_score', '-year', '-imdb_id')
             else:
                 # Support multiple fields e.g., "-year,-imdb_id"
                 fields = ordering.split(',')
@@ -381,8 +505,10 @@ class MovieWatchView(APIView):
     """Enhanced watch view that marks problematic servers for proxy usage"""
     
     def get(self, request, imdb_id):
-        movie = get_object_or_404(Movie, imdb_id=imdb_id)
+        movie = get_object_or_404(Movie.objects.prefetch_related('links', 'reviews'), imdb_id=imdb_id)
         serializer = MovieSerializer(movie)
+        # Map stream_url -> StreamingLink id from the prefetched links (no per-link queries)
+        link_ids = {l.stream_url: l.id for l in movie.links.all()}
         data = serializer.data
         
         # Domains that MUST use proxy due to X-Frame-Options or other restrictions
@@ -409,14 +535,7 @@ class MovieWatchView(APIView):
             needs_proxy = any(domain in stream_url for domain in PROXY_DOMAINS)
             
             # Get the actual StreamingLink ID for proxy URL
-            try:
-                streaming_link = StreamingLink.objects.filter(
-                    movie=movie, 
-                    stream_url=link['stream_url']
-                ).first()
-                link['link_id'] = streaming_link.id if streaming_link else None
-            except:
-                link['link_id'] = None
+            link['link_id'] = link_ids.get(link['stream_url'])
             
             link['needs_proxy'] = needs_proxy
             
@@ -434,10 +553,28 @@ class MovieWatchView(APIView):
         
         print(f"{'='*60}\n")
 
+        # Best provider first: recent success rate, time-to-first-byte and quality
+        health.rank_links(data.get('links', []))
         
         return Response(data)
 
 
+class HomeView(APIView):
+    """All home page rails in one response, from the cached snapshot (see streaming/home.py)"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(home.get_snapshot())
+
+
+class ProviderHealthView(APIView):
+    """Circuit breaker state and rolling stats per embed provider, for monitoring"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response({'providers': health.snapshot()})
+
+
 
 @xframe_options_exempt
 @require_http_methods(["GET"])
@@ -454,48 +591,16 @@ def player_proxy(request, imdb_id, link_id):
         if not link:
             return HttpResponse("Link not found or inactive", status=404)
         
-        stream_url = link.stream_url
-        
         # Handle TV Show parameters for VidSrc style links
         season = request.GET.get('s')
         episode = request.GET.get('e')
+        stream_url = embed.episode_stream_url(link.stream_url, movie.content_type, season, episode)
         
-        if movie.content_type == 'series' and ('vidsrc' in stream_url.lower() or 'vidplay' in stream_url.lower()):
-            import re
-            # If it's a vidsrc style url: .../tv/{id} or .../tv/{id}/1/1
-            if '/tv/' in stream_url and season and episode:
-                stream_url = re.sub(r'(/tv/[^/]+).*', r'\1/' + f"{season}/{episode}", stream_url)
-            elif '/embed/tv/' in stream_url and season and episode:
-                stream_url = re.sub(r'(/embed/tv/[^/]+).*', r'\1/' + f"{season}/{episode}", stream_url)
-        
-        # Fetch the embed page content
+        # Fetch the embed page content (served from cache when warmed)
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Referer': stream_url,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-            }
-            
-            response = requests.get(stream_url, headers=headers, timeout=15)
-            embed_html = response.text
-            
-            # Detect "Media Unavailable" from provider (e.g. VidSrc)
-            # They might return 200 with an error msg, or 404/403
-            unavailable_markers = [
-                "media is unavailable",
-                "this video is not available",
-                "video not found",
-                "no link found",
-                "not released",
-                "at the moment", # Adding the specific suffix from "This media is unavailable at the moment"
-                "unavailable" # Broad match
-            ]
+            page = embed.fetch_embed_page(stream_url)
             
-            is_error_page = any(marker in embed_html.lower() for marker in unavailable_markers)
-            is_http_error = response.status_code != 200
-            
-            if is_error_page or is_http_error:
+            if page['unavailable']:
                 friendly_message = "opps!!! the movie likely not released or we don't have the link for this movie please visit later for this movie"
                 
                 # Check if it's an upcoming movie - if so, definitely show the friendly message
@@ -530,49 +635,7 @@ def player_proxy(request, imdb_id, link_id):
             parsed_url = urlparse(stream_url)
             base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
             
-            # SELECTIVE SCRIPT REMOVAL - Remove ONLY obvious ad scripts
-            import re
-            
-            cleaned_html = embed_html
-            
-            # Step 1: Remove ONLY external scripts from known aggressive ad domains
-            ad_domains = [
-                'doubleclick', 'googlesyndication', 'adservice', 'adsense',
-                'topworkredbay', 'popads', 'popcash', 'adnxs', 'advertising',
-                'propellerads', 'exoclick', 'onclickads', 'adsterra'
-            ]
-            
-            # Find all script tags with src
-            external_scripts = re.findall(r'<script[^>]*src=["\'][^"\']*["\'][^>]*>.*?</script>', cleaned_html, re.IGNORECASE | re.DOTALL)
-            for script in external_scripts:
-                # Check if it's from an ad domain
-                script_lower = script.lower()
-                if any(ad_domain in script_lower for ad_domain in ad_domains):
-                    cleaned_html = cleaned_html.replace(script, '')
-                    
-            # Step 2: Remove ONLY inline scripts that explicitly call window.open or do redirects
-            # Be very specific to avoid breaking video player scripts
-            inline_scripts = re.findall(r'<script(?![^>]*src)[^>]*>.*?</script>', cleaned_html, re.IGNORECASE | re.DOTALL)
-            for script in inline_scripts:
-                script_content = script.lower()
-                # Only remove if it has BOTH popup/redirect AND is very short (likely just an ad trigger)
-                has_popup = 'window.open(' in script_content or 'window.open (' in script_content
-                has_redirect = 'location.href=' in script_content or 'location.replace(' in script_content
-                is_short = len(script) < 500  # Short scripts are likely just ad triggers
-                
-                if (has_popup or has_redirect) and is_short:
-                    cleaned_html = cleaned_html.replace(script, '')
-            
-            # Step 3: Remove ad iframes (but keep video iframes)
-            cleaned_html = re.sub(
-                r'<iframe[^>]*src=["\'][^"\']*(?:doubleclick|googlesyndication|adservice|popads)[^"\']*["\'][^>]*>.*?</iframe>',
-                '',
-                cleaned_html,
-                flags=re.IGNORECASE | re.DOTALL
-            )
-            
-            # Step 4: Remove meta refresh tags (used for redirects)
-            cleaned_html = re.sub(r'<meta[^>]*http-equiv=["\']refresh["\'][^>]*>', '', cleaned_html, flags=re.IGNORECASE)
+            cleaned_html = page['html']
             
             # Inject our custom HTML wrapper with anti-detection code
             html = f"""
@@ -1103,7 +1166,8 @@ def player_proxy(request, imdb_id, link_id):
 </body>
 </html>
             """
-            return HttpResponse(error_html, status=500)
+            # Open circuits fail fast with 503 instead of waiting on the provider timeout
+            return HttpResponse(error_html, status=503 if isinstance(e, health.CircuitOpenError) else 500)
         
     except Movie.DoesNotExist:
         return HttpResponse("Movie not found", status=404)
@@ -1113,74 +1177,14 @@ def player_proxy(request, imdb_id, link_id):
 
 @require_http_methods(["GET"])
 def extract_video_url(request):
-    """Extract actual video URL from embed services"""
+    """Extract actual video URL from embed services (memoized per embed URL)"""
     embed_url = request.GET.get('url')
     
     if not embed_url:
         return JsonResponse({'error': 'No URL provided'}, status=400)
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            'Referer': 'https://sflix.ps/',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        }
-        
-        response = requests.get(embed_url, headers=headers, timeout=10)
-        html = response.text
-        
-        # Method 1: M3U8 URLs
-        m3u8_pattern = r'(https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*)'
-        m3u8_matches = re.findall(m3u8_pattern, html)
-        
-        if m3u8_matches:
-            return JsonResponse({
-                'success': True,
-                'video_url': m3u8_matches[0],
-                'type': 'm3u8',
-                'message': 'Found HLS stream'
-            })
-        
-        # Method 2: MP4 URLs
-        mp4_pattern = r'(https?://[^\s"\'<>]+\.mp4[^\s"\'<>]*)'
-        mp4_matches = re.findall(mp4_pattern, html)
-        
-        if mp4_matches:
-            return JsonResponse({
-                'success': True,
-                'video_url': mp4_matches[0],
-                'type': 'mp4',
-                'message': 'Found MP4 stream'
-            })
-        
-        # Method 3: Video player configs
-        video_patterns = [
-            r'"file"\s*:\s*"([^"]+)"',
-            r'"src"\s*:\s*"([^"]+)"',
-            r'"url"\s*:\s*"([^"]+)"',
-            r'source\s*:\s*"([^"]+)"',
-        ]
-        
-        for pattern in video_patterns:
-            matches = re.findall(pattern, html)
-            for match in matches:
-                if match and ('m3u8' in match or 'mp4' in match):
-                    return JsonResponse({
-                        'success': True,
-                        'video_url': match,
-                        'type': 'extracted',
-                        'message': 'Found video URL in player config'
-                    })
-        
-        # Fallback
-        return JsonResponse({
-            'success': True,
-            'video_url': embed_url,
-            'type': 'embed',
-            'message': 'Using embed URL (direct extraction failed)',
-            'requires_proxy': True
-        })
-        
+        return JsonResponse(extraction.resolve_video_url(embed_url))
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -1190,22 +1194,54 @@ def extract_video_url(request):
         }, status=500)
 
 
+VIDEO_PROXY_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Referer': 'https://sflix.ps/',
+    'Origin': 'https://sflix.ps',
+}
+
+
+def _fetch_hls_segment(segment_url):
+    response = requests.get(segment_url, headers=VIDEO_PROXY_HEADERS, timeout=10)
+    response.raise_for_status()
+    return response.content
+
+
 @require_http_methods(["GET"])
 def proxy_video(request):
-    """Proxy video streams to avoid CORS"""
+    """
+    Proxy video streams to avoid CORS.
+    HLS playlists are rewritten so variants/segments also go through this proxy,
+    and segments are served from the shared on-disk segment cache.
+    """
     video_url = request.GET.get('url')
     
     if not video_url:
         return HttpResponse('No URL provided', status=400)
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://sflix.ps/',
-            'Origin': 'https://sflix.ps',
-        }
-        
-        response = requests.get(video_url, headers=headers, stream=True, timeout=10)
+        # HLS segments are immutable - serve from disk cache, fetch upstream once
+        if hls.is_segment_url(video_url):
+            data, was_cached = hls.get_segment_cache().get_or_fetch(video_url, _fetch_hls_segment)
+            django_response = HttpResponse(data, content_type=hls.segment_content_type(video_url))
+            django_response['Content-Length'] = len(data)
+            django_response['Cache-Control'] = 'public, max-age=86400, immutable'
+            django_response['X-Segment-Cache'] = 'HIT' if was_cached else 'MISS'
+            return django_response
+
+        response = requests.get(video_url, headers=VIDEO_PROXY_HEADERS, stream=True, timeout=10)
+
+        if hls.is_playlist_response(video_url, response.headers.get('content-type')):
+            # Resolve relative URIs against the final (post-redirect) playlist location
+            playlist = hls.rewrite_playlist(response.text, response.url, request.path)
+            django_response = HttpResponse(
+                playlist,
+                content_type='application/vnd.apple.mpegurl',
+                status=response.status_code
+            )
+            # Live/media playlists change, never let clients cache them
+            django_response['Cache-Control'] = 'no-cache'
+            return django_response
         
         django_response = HttpResponse(
             response.iter_content(chunk_size=8192),
@@ -1219,4 +1255,4 @@ def proxy_video(request):
         return django_response
         
     except Exception as e:
-        return HttpResponse(f'Error proxying video: {str(e)}', status=500)
\ No newline at end of file
+        return HttpResponse(f'Error proxying video: {str(e)}', status=500)